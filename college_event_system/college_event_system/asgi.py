@@ -3,6 +3,19 @@ ASGI config for college_event_system project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The polling and check-in APIs are async views and can be served with:
+
+    uvicorn college_event_system.asgi:application --workers 4
+
+The middleware stack is async capable, so those views run on the event loop
+instead of tying up a worker thread per open connection. Persistent database
+connections are off by default here, see DB_CONN_MAX_AGE in settings.
+
+That only helps when requests wait on a networked database or cache. With
+local SQLite, benchmark_servers measured it slower than gunicorn sync
+workers (75 vs 107 req/s at 16 connections, 67 vs 80 at 256), so the WSGI
+app stays the default deployment.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
 """
@@ -12,5 +25,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'college_event_system.settings')
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
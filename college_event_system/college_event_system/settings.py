@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -42,6 +43,9 @@ INSTALLED_APPS = [
 
 
 MIDDLEWARE = [
+    # Static files are answered before any session, auth or custom middleware runs
+    'core.middleware.StaticFilesMiddleware',
+    'core.instrumentation.InstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -53,16 +57,15 @@ MIDDLEWARE = [
     # Custom middleware
     'core.middleware.SecurityHeadersMiddleware',
     'core.middleware.RoleAccessMiddleware',
+    'core.middleware.ReadYourWritesMiddleware',
     'core.middleware.UserActivityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
-
 ]
 
 ROOT_URLCONF = 'college_event_system.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'core.instrumentation.DjangoTemplates',  # Stock backend plus render timing
         'DIRS': [BASE_DIR / 'templates'],  # Updated to use Path
         'APP_DIRS': True,
         'OPTIONS': {
@@ -81,12 +84,102 @@ WSGI_APPLICATION = 'college_event_system.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
-DATABASES = {
-    'default': {
+# SQLite profile applied by Django to every new connection. 'tuned' (default)
+# uses WAL so readers never block the check-in writers, waits on locks instead
+# of failing, and starts atomic() blocks with BEGIN IMMEDIATE so a transaction
+# never has to upgrade to a write lock halfway through. SQLITE_PROFILE=stock
+# restores the plain Django defaults; the other SQLITE_* variables tune the
+# individual pragmas. Check a profile with: manage.py stress_sqlite
+SQLITE_PROFILE = os.environ.get('SQLITE_PROFILE', 'tuned')
+SQLITE_PRAGMAS = {
+    'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+    'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 20000)),
+    'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 128 * 1024 * 1024)),
+    # Negative values are KiB, so -32000 is about 32 MB of page cache per connection
+    'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE', -32000)),
+    'temp_store': 'MEMORY',
+}
+if SQLITE_PROFILE == 'tuned':
+    SQLITE_OPTIONS = {
+        'init_command': ';'.join(f'PRAGMA {name}={value}' for name, value in SQLITE_PRAGMAS.items()),
+        'transaction_mode': os.environ.get('SQLITE_TRANSACTION_MODE', 'IMMEDIATE'),
+    }
+else:
+    SQLITE_OPTIONS = {}
+
+# Connections are kept open for DB_CONN_MAX_AGE seconds and pinged before
+# reuse, so a gunicorn worker thread opens one connection instead of one per
+# request. asgi.py defaults DB_CONN_MAX_AGE to 0: async requests run their
+# queries on short-lived threads that could never reuse a connection.
+# DB_ENGINE=postgresql uses psycopg's pool (DB_POOL_MIN/DB_POOL_MAX per
+# worker process) instead, and DB_ENGINE=mysql keeps a persistent connection
+# per worker thread. Compare with: manage.py benchmark_connections
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite')
+DB_CONN_MAX_AGE = int(os.environ.get('DB_CONN_MAX_AGE', 600))
+DB_POOL_MIN = int(os.environ.get('DB_POOL_MIN', 2))
+DB_POOL_MAX = int(os.environ.get('DB_POOL_MAX', 10))
+if DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAME', 'college_event_system'),
+            'USER': os.environ.get('DB_USER', ''),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', ''),
+            'PORT': os.environ.get('DB_PORT', ''),
+            # Pooled connections are returned after every request, CONN_MAX_AGE must stay 0
+            'CONN_MAX_AGE': 0,
+            'OPTIONS': {'pool': {'min_size': DB_POOL_MIN, 'max_size': DB_POOL_MAX, 'timeout': 10}},
+        }
+    }
+elif DB_ENGINE == 'mysql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.mysql',
+            'NAME': os.environ.get('DB_NAME', 'college_event_system'),
+            'USER': os.environ.get('DB_USER', ''),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', ''),
+            'PORT': os.environ.get('DB_PORT', ''),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {'charset': 'utf8mb4', 'init_command': "SET sql_mode='STRICT_TRANS_TABLES'"},
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': SQLITE_OPTIONS,
+        }
+    }
+
+# Read replica for dashboards and reports (core.routers). DATABASE_REPLICA is
+# a second SQLite file kept fresh by `manage.py sync_replica`; on PostgreSQL
+# define DATABASES['replica'] as a standby instead. Reads fall back to the
+# primary when the replica is more than REPLICA_MAX_LAG seconds behind, and
+# a browser that just wrote is pinned to the primary for as long.
+DATABASE_REPLICA = os.environ.get('DATABASE_REPLICA')
+if DATABASE_REPLICA:
+    DATABASES['replica'] = {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': DATABASE_REPLICA,
+        # sync_replica swaps the file, a kept-open connection would go on reading the old copy
+        'CONN_MAX_AGE': 0,
+        'OPTIONS': {
+            'init_command': 'PRAGMA query_only=ON;' + ';'.join(
+                f'PRAGMA {name}={SQLITE_PRAGMAS[name]}' for name in ('mmap_size', 'cache_size')
+            ),
+        },
+        'TEST': {'MIRROR': 'default'},
     }
-}
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+REPLICA_MAX_LAG = int(os.environ.get('REPLICA_MAX_LAG', 60))
+REPLICA_SYNC_INTERVAL = 15
 
 
 # Password validation
@@ -145,6 +238,47 @@ LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = 'dashboard'
 LOGOUT_REDIRECT_URL = 'home'
 
+# Cache backend: CACHE_BACKEND=locmem (default), file or redis. LocMemCache
+# is per process, use file (one host) or redis with several workers so
+# logouts, user changes and page invalidations are seen by all of them.
+REDIS_URL = os.environ.get('REDIS_URL')
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'redis' if REDIS_URL else 'locmem')
+if CACHE_BACKEND == 'redis':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL or 'redis://127.0.0.1:6379/1',
+        }
+    }
+elif CACHE_BACKEND == 'file':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('CACHE_LOCATION', str(BASE_DIR / '.cache')),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'college-event-system',
+        }
+    }
+
+# Cached users and sessions need a cache every worker sees, otherwise a
+# logout, deactivation or password change only reaches the worker that
+# handled it. With the per-process LocMemCache both come from the database.
+SHARED_CACHE = CACHE_BACKEND in ('redis', 'file')
+if SHARED_CACHE:
+    # request.user comes from the cache; entries are dropped when a User is saved
+    AUTHENTICATION_BACKENDS = ['core.backends.CachedModelBackend']
+    # Sessions are read from the cache and written through to the database
+    SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+else:
+    AUTHENTICATION_BACKENDS = ['django.contrib.auth.backends.ModelBackend']
+    SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+AUTH_USER_CACHE_TIMEOUT = 300
+
 AUTH_USER_MODEL = 'core.User'
 
 # Password validation
@@ -159,5 +293,73 @@ AUTH_PASSWORD_VALIDATORS = [
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Share of requests timed by core.instrumentation.InstrumentationMiddleware
+INSTRUMENTATION_SAMPLE_RATE = 0.05
+
+# /metrics endpoint (core.metrics), open to admins and to scrapers sending
+# "Authorization: Bearer $METRICS_TOKEN". Point METRICS_MULTIPROC_DIR at a
+# shared, per-deploy directory when running several gunicorn workers.
+METRICS_MULTIPROC_DIR = os.environ.get('METRICS_MULTIPROC_DIR')
+METRICS_FLUSH_INTERVAL = 1.0
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+# Minimum seconds between last_login updates by UserActivityMiddleware
+USER_ACTIVITY_INTERVAL = 60
+
+# Event lifecycle (core.lifecycle), advanced by the run_event_scheduler command
+EVENT_SCHEDULER_INTERVAL = 30
+# Longest a process keeps its index of live events without a rebuild
+LIVE_INDEX_TTL = 30
+# Check-in lookups: event rosters (misses are confirmed in the database) and
+# each student's registered events. Only the worker that saved a registration
+# drops the student's set, the short timeout bounds how long the others
+# list the event as not registered
+EVENT_ROSTER_CACHE_TIMEOUT = 60 * 60 * 12
+STUDENT_EVENTS_CACHE_TIMEOUT = 60
+
+# Event reminders (core.reminders), sent by run_event_scheduler: hours before
+# the start that registrants get one
+REMINDER_LEAD_HOURS = [24, 1]
+
+# Event QR images (core.qr), rendered when an event goes live
+EVENT_QR_CACHE_TIMEOUT = 60 * 60 * 12
+
+# Page caching (core.caching); event fragments are keyed by updated_at
+HOME_CACHE_TIMEOUT = 300
+EVENT_STATS_CACHE_TIMEOUT = 60
+
+# Offline QR scans replayed by the scanner (views.sync_qr_attendance)
+OFFLINE_SYNC_MAX_BATCH = 200
+OFFLINE_SCAN_MAX_AGE_HOURS = 24
+# Minutes after a completed event's end_time that its offline scans are still accepted
+OFFLINE_SYNC_GRACE_MINUTES = 60
+
+# Organizer door kiosks (core.kiosk): scans are checked in memory and committed
+# in batches every KIOSK_FLUSH_INTERVAL seconds
+KIOSK_FLUSH_INTERVAL = 0.25
+KIOSK_FLUSH_BATCH = 200
+KIOSK_DOOR_TTL = 60
+# Busy-database flushes before a check-in is given up and listed by kiosk_status
+KIOSK_FLUSH_RETRIES = 20
+
+# Attendance of completed events and read notifications older than this move
+# to the archive tables (core.archive, archive_history command)
+ARCHIVE_AFTER_DAYS = int(os.environ.get('ARCHIVE_AFTER_DAYS', 180))
+
+# Notification feed (core.notifications): page size and how long read
+# notifications are kept per type before compact_notifications deletes them
+NOTIFICATIONS_PAGE_SIZE = 20
+NOTIFICATION_RETENTION_DAYS = {
+    'event': 180,
+    'attendance': 180,
+    'system': 365,
+    'reminder': 30,
+}
+
+# Analytics beacons are buffered in memory and written in batches (core.analytics)
+ANALYTICS_BUFFER_SIZE = 10000
+ANALYTICS_FLUSH_BATCH = 500
+ANALYTICS_FLUSH_INTERVAL = 5.0
+
 # Add email backend (for password reset)
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'  # For development
\ No newline at end of file
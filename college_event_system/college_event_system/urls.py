@@ -36,6 +36,9 @@ urlpatterns = [
     path('attendance/', views.attendance_view, name='attendance'),
     path('attendance/stats/', views.attendance_stats, name='attendance_stats'),
     path('attendance/mark/qr/', views.mark_qr_attendance, name='mark_qr_attendance'),
+    path('attendance/mark/qr/sync/', views.sync_qr_attendance, name='sync_qr_attendance'),
+    path('attendance/kiosk/<str:event_id>/checkin/', views.kiosk_checkin, name='kiosk_checkin'),
+    path('attendance/kiosk/<str:event_id>/status/', views.kiosk_status, name='kiosk_status'),
     path('attendance/mark/manual/', views.mark_manual_attendance, name='mark_manual_attendance'),
     path('attendance/quick-manual/', views.quick_manual_attendance, name='quick_manual_attendance'),
     path('attendance/test-scan/', views.test_scan, name='test_scan'),
@@ -85,8 +88,12 @@ urlpatterns = [
     # ========== API ENDPOINTS ==========
     path('api/analytics/pageview/', csrf_exempt(views.analytics_pageview), name='analytics_pageview'),
     path('api/analytics/event/', csrf_exempt(views.analytics_event), name='analytics_event'),
+    path('api/analytics/batch/', csrf_exempt(views.analytics_batch), name='analytics_batch'),
     path('api/notifications/', views.get_notifications, name='get_notifications'),
     path('api/attendance/stats/', views.get_attendance_stats, name='get_attendance_stats'),
+    path('api/instrumentation/', views.instrumentation_stats, name='instrumentation_stats'),
+    path('metrics', views.metrics_view, name='metrics'),
+    path('health/', views.health, name='health'),
 ]
 
 # Static and media files in development
@@ -97,5 +104,5 @@ if settings.DEBUG:
 # Favicon
 from django.views.generic.base import RedirectView
 urlpatterns += [
-    path('favicon.ico', RedirectView.as_view(url='/static/favicon.ico', permanent=True)),
+    path('favicon.ico', RedirectView.as_view(url='/static/favicon.ico', permanent=True), name='favicon'),
 ]
\ No newline at end of file
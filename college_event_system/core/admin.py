@@ -1,6 +1,11 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import User, Event, EventRegistration, AttendanceRecord, Notification, Report
+
+from . import counters
+from .models import (
+    User, Event, EventRegistration, AttendanceRecord, Notification, Report, AnalyticsEvent, PageViewRollup,
+    ArchivedAttendanceRecord, ArchivedNotification, Broadcast,
+)
 
 @admin.register(User)
 class CustomUserAdmin(UserAdmin):
@@ -19,13 +24,19 @@ class CustomUserAdmin(UserAdmin):
             'fields': ('username', 'email', 'role', 'student_id', 'password1', 'password2'),
         }),
     )
+    
+    def save_model(self, request, obj, form, change):
+        if change:
+            counters.save_keeping_counters(obj)
+        else:
+            super().save_model(request, obj, form, change)
 
 @admin.register(Event)
 class EventAdmin(admin.ModelAdmin):
     list_display = ('title', 'event_id', 'category', 'date', 'venue', 'organizer', 'status', 'current_participants', 'max_participants')
     list_filter = ('category', 'status', 'date', 'organizer')
     search_fields = ('title', 'event_id', 'venue', 'description')
-    readonly_fields = ('event_id', 'qr_secret', 'created_at', 'updated_at')
+    readonly_fields = ('event_id', 'current_participants', 'qr_secret', 'created_at', 'updated_at')
     fieldsets = (
         ('Basic Info', {'fields': ('event_id', 'title', 'description', 'category', 'venue')}),
         ('Timing', {'fields': ('date', 'start_time', 'end_time')}),
@@ -33,6 +44,12 @@ class EventAdmin(admin.ModelAdmin):
         ('QR Code', {'fields': ('qr_code', 'qr_secret')}),
         ('Metadata', {'fields': ('created_at', 'updated_at')}),
     )
+    
+    def save_model(self, request, obj, form, change):
+        if change:
+            counters.save_keeping_counters(obj)
+        else:
+            super().save_model(request, obj, form, change)
 
 @admin.register(EventRegistration)
 class EventRegistrationAdmin(admin.ModelAdmin):
@@ -55,9 +72,48 @@ class NotificationAdmin(admin.ModelAdmin):
     search_fields = ('title', 'message', 'user__username')
     readonly_fields = ('notification_id', 'created_at')
 
+@admin.register(Broadcast)
+class BroadcastAdmin(admin.ModelAdmin):
+    list_display = ('title', 'notification_type', 'target_event', 'target_department', 'target_role', 'created_at')
+    list_filter = ('notification_type', 'target_role', 'created_at')
+    search_fields = ('title', 'message', 'target_department')
+    readonly_fields = ('broadcast_id', 'created_at')
+    raw_id_fields = ('related_event', 'target_event', 'created_by')
+    
+    def save_model(self, request, obj, form, change):
+        if not change:
+            obj.created_by = request.user
+        super().save_model(request, obj, form, change)
+
 @admin.register(Report)
 class ReportAdmin(admin.ModelAdmin):
     list_display = ('title', 'report_type', 'generated_by', 'period_start', 'period_end', 'created_at')
     list_filter = ('report_type', 'created_at')
     search_fields = ('title', 'description', 'generated_by__username')
-    readonly_fields = ('report_id', 'created_at')
\ No newline at end of file
+    readonly_fields = ('report_id', 'created_at')
+
+@admin.register(AnalyticsEvent)
+class AnalyticsEventAdmin(admin.ModelAdmin):
+    list_display = ('kind', 'name', 'page', 'occurred_at')
+    list_filter = ('kind', 'occurred_at')
+    search_fields = ('name', 'page')
+
+@admin.register(PageViewRollup)
+class PageViewRollupAdmin(admin.ModelAdmin):
+    list_display = ('hour', 'page', 'views')
+    list_filter = ('hour',)
+    search_fields = ('page',)
+
+@admin.register(ArchivedAttendanceRecord)
+class ArchivedAttendanceRecordAdmin(admin.ModelAdmin):
+    list_display = ('attendance_id', 'event', 'student', 'method', 'marked_at', 'archived_at')
+    list_filter = ('method', 'archived_at')
+    search_fields = ('attendance_id', 'event__title', 'student__username')
+    raw_id_fields = ('event', 'student', 'registration')
+
+@admin.register(ArchivedNotification)
+class ArchivedNotificationAdmin(admin.ModelAdmin):
+    list_display = ('title', 'user', 'notification_type', 'created_at', 'archived_at')
+    list_filter = ('notification_type', 'archived_at')
+    search_fields = ('title', 'message', 'user__username')
+    raw_id_fields = ('user', 'related_event')
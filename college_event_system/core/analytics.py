@@ -0,0 +1,204 @@
+# core/analytics.py
+"""
+Buffered analytics ingestion.
+
+Beacons are normalised into unsaved AnalyticsEvent rows and appended to a
+per-process ring buffer; the request returns immediately. A daemon thread
+writes the buffer out with bulk_create every ANALYTICS_FLUSH_INTERVAL
+seconds, or sooner once ANALYTICS_FLUSH_BATCH rows are waiting. When the
+database falls behind the oldest rows are dropped rather than blocking
+workers.
+"""
+import atexit
+import json
+import logging
+import os
+import threading
+from collections import deque
+from datetime import timedelta, timezone as dt_timezone
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Max
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import metrics
+from .models import AnalyticsEvent, PageViewRollup
+
+logger = logging.getLogger(__name__)
+
+MAX_EVENTS_PER_REQUEST = 500
+PAGEVIEW_PROPERTIES = ('referrer', 'userAgent', 'screen')
+# Client timestamps further than this from the server clock are replaced
+CLOCK_SKEW = timedelta(days=1)
+# The newest rolled up hour can be CLOCK_SKEW ahead of the last rollup run
+# and a beacon stored after it CLOCK_SKEW behind, so every run recounts this
+# far back from that hour (the extra hour covers buffering)
+REROLL_WINDOW = 2 * CLOCK_SKEW + timedelta(hours=1)
+
+
+def _clip(value, length):
+    return str(value or '')[:length]
+
+
+def _occurred_at(value, now):
+    """Client timestamp if it is sane, otherwise the time we received it"""
+    parsed = parse_datetime(value) if isinstance(value, str) else None
+    if parsed is None:
+        return now
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed, dt_timezone.utc)
+    if abs(parsed - now) > CLOCK_SKEW:
+        return now
+    return parsed
+
+
+def normalize(item, default_kind, now=None):
+    """Turn one beacon payload into an unsaved AnalyticsEvent, or None if unusable"""
+    if not isinstance(item, dict):
+        return None
+    now = now or timezone.now()
+    kind = item.get('type', default_kind)
+
+    if kind == 'pageview':
+        return AnalyticsEvent(
+            kind='pageview',
+            page=_clip(item.get('page'), 300),
+            properties={key: _clip(item.get(key), 300) for key in PAGEVIEW_PROPERTIES if item.get(key)},
+            occurred_at=_occurred_at(item.get('timestamp'), now),
+        )
+    if kind == 'event' and item.get('event'):
+        properties = item.get('properties')
+        return AnalyticsEvent(
+            kind='event',
+            name=_clip(item.get('event'), 100),
+            page=_clip(urlsplit(str(item.get('url') or '')).path, 300),
+            properties=properties if isinstance(properties, dict) else {},
+            occurred_at=_occurred_at(item.get('timestamp'), now),
+        )
+    return None
+
+
+def parse_beacon(body, default_kind):
+    """
+    Accept a single payload, a JSON array of payloads or {"events": [...]}.
+    With default_kind=None every item must carry its own "type".
+    Raises ValueError for malformed bodies.
+    """
+    data = json.loads(body)
+    if isinstance(data, dict) and isinstance(data.get('events'), list):
+        items = data['events']
+    elif isinstance(data, list):
+        items = data
+    else:
+        items = [data]
+
+    now = timezone.now()
+    events = [normalize(item, default_kind, now) for item in items[:MAX_EVENTS_PER_REQUEST]]
+    return [event for event in events if event is not None]
+
+
+class AnalyticsBuffer:
+    def __init__(self):
+        self._events = deque(maxlen=getattr(settings, 'ANALYTICS_BUFFER_SIZE', 10000))
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._flusher_pid = None
+
+    def __len__(self):
+        return len(self._events)
+
+    def add(self, events):
+        with self._lock:
+            overflow = max(len(self._events) + len(events) - self._events.maxlen, 0)
+            self._events.extend(events)
+            waiting = len(self._events)
+        if overflow:
+            metrics.analytics_dropped.inc(overflow)
+        for event in events:
+            metrics.analytics_events.inc(kind=event.kind)
+
+        self._ensure_flusher()
+        if waiting >= getattr(settings, 'ANALYTICS_FLUSH_BATCH', 500):
+            self._wakeup.set()
+
+    def drain(self):
+        with self._lock:
+            events = list(self._events)
+            self._events.clear()
+        return events
+
+    def flush(self):
+        events = self.drain()
+        if not events:
+            return 0
+        try:
+            AnalyticsEvent.objects.bulk_create(events, batch_size=500)
+        except Exception:
+            logger.exception('Dropping %d analytics events after a failed flush', len(events))
+            metrics.analytics_dropped.inc(len(events))
+            return 0
+        return len(events)
+
+    def _ensure_flusher(self):
+        pid = os.getpid()
+        if self._flusher_pid == pid:
+            return
+        with self._lock:
+            if self._flusher_pid == pid:
+                return
+            self._flusher_pid = pid
+        threading.Thread(target=self._run, name='analytics-flush', daemon=True).start()
+        atexit.register(self.flush)
+
+    def _run(self):
+        interval = getattr(settings, 'ANALYTICS_FLUSH_INTERVAL', 5.0)
+        while True:
+            self._wakeup.wait(interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            finally:
+                # Each flush is its own short unit of work on this thread's connection
+                connection.close()
+
+
+buffer = AnalyticsBuffer()
+
+
+def rollup_pageviews(since=None, full=False):
+    """
+    Recount page views per hour from `since` (default: REROLL_WINDOW before
+    the last rolled up hour, so late beacons are counted) onwards. Safe to
+    re-run: touched hours are recomputed, not added to.
+    """
+    if full:
+        since = None
+    elif since is None:
+        last = PageViewRollup.objects.aggregate(last=Max('hour'))['last']
+        since = last - REROLL_WINDOW if last is not None else None
+
+    pageviews = AnalyticsEvent.objects.filter(kind='pageview')
+    if since is not None:
+        pageviews = pageviews.filter(occurred_at__gte=since)
+
+    rows = (
+        pageviews.annotate(bucket=TruncHour('occurred_at'))
+        .values('bucket', 'page')
+        .annotate(total=Count('id'))
+        .order_by()
+    )
+    rollups = [PageViewRollup(hour=row['bucket'], page=row['page'], views=row['total']) for row in rows]
+
+    with transaction.atomic():
+        PageViewRollup.objects.bulk_create(
+            rollups,
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=['hour', 'page'],
+            update_fields=['views'],
+        )
+    return len(rollups)
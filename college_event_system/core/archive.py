@@ -0,0 +1,105 @@
+# core/archive.py
+"""
+Cold storage for past semesters.
+
+Attendance of completed events older than ARCHIVE_AFTER_DAYS, and read
+notifications older than that, are moved in batches into the archive
+tables so AttendanceRecord and Notification only hold recent rows and
+their indexes stay small. Each batch is copied and deleted in one
+transaction, run by the archive_history command.
+
+Readers that need whole histories go through attendance(),
+attendance_count(), attendance_history() and find_attendance(), which
+cover both stores.
+"""
+import heapq
+from datetime import datetime, time, timedelta
+from operator import attrgetter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from . import counters
+from .models import ArchivedAttendanceRecord, ArchivedNotification, AttendanceRecord, Notification
+from .notifications import read_q
+
+ATTENDANCE_FIELDS = [
+    'attendance_id', 'event_id', 'student_id', 'registration_id', 'method', 'marked_at',
+    'latitude', 'longitude', 'device_info', 'verified',
+]
+NOTIFICATION_FIELDS = [
+    # is_read is left out, only read rows move and the watermark may cover them
+    'notification_id', 'user_id', 'notification_type', 'title', 'message',
+    'related_event_id', 'created_at',
+]
+
+
+def horizon(days=None):
+    """Events dated before this day are archived"""
+    if days is None:
+        days = getattr(settings, 'ARCHIVE_AFTER_DAYS', 180)
+    return timezone.localdate() - timedelta(days=days)
+
+
+def archivable_attendance(before):
+    return AttendanceRecord.objects.filter(event__status='completed', event__date__lt=before)
+
+
+def archivable_notifications(before):
+    # Unread notifications stay hot, the unread badge only reads that table
+    cutoff = timezone.make_aware(datetime.combine(before, time.min))
+    return Notification.objects.filter(read_q()).filter(
+        Q(created_at__lt=cutoff) | Q(related_event__status='completed', related_event__date__lt=before)
+    )
+
+
+def _move(queryset, archive_model, fields, batch_size):
+    moved = 0
+    while True:
+        with transaction.atomic():
+            rows = list(queryset.order_by('pk').values('pk', *fields)[:batch_size])
+            if not rows:
+                return moved
+            pks = [row.pop('pk') for row in rows]
+            archive_model.objects.bulk_create([archive_model(**row) for row in rows])
+            queryset.model.objects.filter(pk__in=pks).delete()
+        moved += len(rows)
+
+
+def archive(before, batch_size=500):
+    """Move everything past the horizon, returns {'attendance': n, 'notifications': n}"""
+    # Archived attendance still counts towards the event and student counters
+    with counters.suspended():
+        attendance = _move(archivable_attendance(before), ArchivedAttendanceRecord, ATTENDANCE_FIELDS, batch_size)
+    notifications = _move(archivable_notifications(before), ArchivedNotification, NOTIFICATION_FIELDS, batch_size)
+    return {'attendance': attendance, 'notifications': notifications}
+
+
+def attendance(**lookup):
+    """Attendance rows matching lookup from both stores, newest first"""
+    hot = AttendanceRecord.objects.filter(**lookup).select_related('event', 'student').order_by('-marked_at')
+    cold = ArchivedAttendanceRecord.objects.filter(**lookup).select_related('event', 'student').order_by('-marked_at')
+    return list(heapq.merge(hot, cold, key=attrgetter('marked_at'), reverse=True))
+
+
+def attendance_count(**lookup):
+    return AttendanceRecord.objects.filter(**lookup).count() + ArchivedAttendanceRecord.objects.filter(**lookup).count()
+
+
+def attendance_history(student):
+    """Every attendance row for a student from both stores, newest first"""
+    return attendance(student=student)
+
+
+def find_attendance(**lookup):
+    """Hot row first, then the archive; raises AttendanceRecord.DoesNotExist"""
+    try:
+        return AttendanceRecord.objects.select_related('event', 'student').get(**lookup)
+    except AttendanceRecord.DoesNotExist:
+        pass
+    try:
+        return ArchivedAttendanceRecord.objects.select_related('event', 'student').get(**lookup)
+    except ArchivedAttendanceRecord.DoesNotExist:
+        raise AttendanceRecord.DoesNotExist(f'No attendance record matches {lookup}') from None
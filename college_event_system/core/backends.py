@@ -0,0 +1,47 @@
+# core/backends.py
+"""
+Authentication backend that serves request.user from the cache.
+
+The user row is loaded with only the fields needed on every request and
+kept in the default cache for AUTH_USER_CACHE_TIMEOUT seconds. Saving or
+deleting a User drops the entry (see core.signals), so role, password and
+is_active changes apply on the next request. Fields left out of the slim
+copy are still loaded on first access.
+
+Only used when settings.SHARED_CACHE is set: with a per-process cache a
+worker would keep serving a user that another worker deactivated.
+"""
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+from .models import User
+
+# Everything AbstractUser checks per request, what base.html renders and
+# what the notification feed resolves (core.notifications)
+SLIM_FIELDS = (
+    'id', 'password', 'last_login', 'is_superuser', 'is_staff', 'is_active',
+    'username', 'first_name', 'last_name', 'email', 'date_joined',
+    'role', 'student_id', 'department', 'profile_picture', 'notifications_read_at',
+)
+
+
+def user_cache_key(user_id):
+    return f'auth:user:v3:{user_id}'
+
+
+def invalidate_user(user_id):
+    cache.delete(user_cache_key(user_id))
+
+
+class CachedModelBackend(ModelBackend):
+    def get_user(self, user_id):
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            try:
+                user = User.objects.only(*SLIM_FIELDS).get(pk=user_id)
+            except User.DoesNotExist:
+                return None
+            cache.set(key, user, getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 300))
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,66 @@
+# core/benchmarks.py
+import json
+import math
+from pathlib import Path
+
+from django.conf import settings
+
+BASELINE_DIR = Path(settings.BASE_DIR) / 'benchmarks'
+
+
+def percentile(sorted_samples, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_samples:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(sorted_samples)) - 1, 0)
+    return sorted_samples[min(rank, len(sorted_samples) - 1)]
+
+
+def summarize(samples_ms):
+    """Latency summary in milliseconds, rounded for stable JSON baselines"""
+    ordered = sorted(samples_ms)
+    count = len(ordered)
+    return {
+        'count': count,
+        'mean_ms': round(sum(ordered) / count, 3) if count else 0.0,
+        'p50_ms': round(percentile(ordered, 50), 3),
+        'p90_ms': round(percentile(ordered, 90), 3),
+        'p99_ms': round(percentile(ordered, 99), 3),
+        'max_ms': round(ordered[-1], 3) if count else 0.0,
+    }
+
+
+def load_baseline(path):
+    path = Path(path)
+    if not path.exists():
+        return None
+    with path.open() as fh:
+        return json.load(fh)
+
+
+def save_baseline(path, data):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open('w') as fh:
+        json.dump(data, fh, indent=2, sort_keys=True)
+        fh.write('\n')
+
+
+def compare_results(baseline, results, tolerance):
+    """Return human readable regressions of results against a saved baseline"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get('views', {}).get(name)
+        if not previous:
+            continue
+        if current['queries'] > previous['queries']:
+            regressions.append(
+                f"{name}: queries {previous['queries']} -> {current['queries']}"
+            )
+        allowed = previous['p50_ms'] * (1 + tolerance)
+        if current['p50_ms'] > allowed:
+            regressions.append(
+                f"{name}: p50 {previous['p50_ms']:.1f}ms -> {current['p50_ms']:.1f}ms "
+                f"(allowed {allowed:.1f}ms)"
+            )
+    return regressions
@@ -0,0 +1,130 @@
+# core/caching.py
+"""
+Page, fragment and conditional GET caching.
+
+Anonymous visitors to home share one cached copy of the page; event cards
+and detail blocks are cached as template fragments keyed by event_id and
+updated_at; per-user registration state comes from
+lifecycle.registered_event_ids. Event and EventRegistration signals drop
+the shared entries (see core.signals).
+
+Polled JSON endpoints answer 304 Not Modified through poll_etag: their
+ETag is built from version counters that signals bump, so a poll costs a
+couple of cache reads when nothing changed.
+"""
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib import messages
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import quote_etag
+from django.views.decorators.http import condition
+
+HOME_KEY = 'pages:home:v1'
+EVENT_STATS_KEY = 'events:stats:v1'
+
+
+def cache_anonymous_page(key, timeout_setting, default_timeout):
+    """
+    Serve one shared copy of the page to anonymous GET requests without a
+    query string or pending messages. Signed in users always get a fresh render.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if (request.method != 'GET' or request.GET or request.user.is_authenticated
+                    or len(messages.get_messages(request))):
+                return view_func(request, *args, **kwargs)
+
+            cached = cache.get(key)
+            if cached is not None:
+                content, content_type = cached
+                response = HttpResponse(content, content_type=content_type)
+            else:
+                response = view_func(request, *args, **kwargs)
+                if response.status_code == 200 and not response.cookies and not response.streaming:
+                    cache.set(key, (response.content, response['Content-Type']),
+                              getattr(settings, timeout_setting, default_timeout))
+            patch_vary_headers(response, ['Cookie'])
+            return response
+        return wrapper
+    return decorator
+
+
+def event_stats(compute):
+    """Counts shown above the events list, computed at most once per timeout"""
+    stats = cache.get(EVENT_STATS_KEY)
+    if stats is None:
+        stats = compute()
+        cache.set(EVENT_STATS_KEY, stats, getattr(settings, 'EVENT_STATS_CACHE_TIMEOUT', 60))
+    return stats
+
+
+def drop_event_pages():
+    cache.delete_many([HOME_KEY, EVENT_STATS_KEY])
+
+
+def _version_key(scope):
+    return f'versions:{scope}'
+
+
+def version(scope):
+    """Current version of a scope such as 'attendance' or 'notifications:42'"""
+    key = _version_key(scope)
+    value = cache.get(key)
+    if value is None:
+        # Start from the clock so a lost counter never repeats an old value
+        cache.add(key, time.time_ns(), None)
+        value = cache.get(key, 0)
+    return value
+
+
+def bump(*scopes):
+    for scope in scopes:
+        key = _version_key(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), None)
+
+
+def poll_etag(etag_func):
+    """
+    ETag and 304 support for polled JSON views. etag_func(request) returns
+    a string, or None to skip. Responses are private and always revalidated.
+    For async views etag_func runs in a worker thread, so it may touch the
+    ORM and request.user.
+    """
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            compute_etag = sync_to_async(etag_func)
+
+            @wraps(view_func)
+            async def async_wrapper(request, *args, **kwargs):
+                etag = None
+                response = None
+                if request.method in ('GET', 'HEAD'):
+                    etag = await compute_etag(request)
+                    etag = quote_etag(etag) if etag is not None else None
+                    response = get_conditional_response(request, etag=etag)
+                if response is None:
+                    response = await view_func(request, *args, **kwargs)
+                    if etag:
+                        response.headers.setdefault('ETag', etag)
+                patch_cache_control(response, private=True, no_cache=True)
+                return response
+            return async_wrapper
+
+        conditional = condition(etag_func=etag_func)(view_func)
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            response = conditional(request, *args, **kwargs)
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,168 @@
+# core/checkins.py
+"""
+Batched check-ins.
+
+commit() writes many check-ins in one transaction: one bulk insert of
+attendance rows keeping their original scan times, one bulk update of
+the registrations, one counter UPDATE per event and per student and one
+bulk insert of notifications. Every check-in is matched against the
+roster core.lifecycle caches per event (confirming misses against the
+database) and deduplicated against the rest of the batch and, inside the
+transaction, against stored attendance. The unique (event, student)
+constraint backs that up across processes, so a client can resend a
+batch whose response it never saw.
+
+The offline QR sync endpoint replays queued scans through it.
+"""
+from collections import Counter, namedtuple
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from . import caching, counters, lifecycle, metrics
+from .models import AttendanceRecord, EventRegistration, Notification, explicit_timestamps
+
+Checkin = namedtuple('Checkin', ['key', 'event', 'student_pk', 'scanned_at'])
+
+MARKED = 'marked'
+DUPLICATE = 'duplicate'
+REJECTED = 'rejected'
+
+
+def within_event(event, scanned_at):
+    """Whether scanned_at falls between the event's start and end time"""
+    local = timezone.localtime(scanned_at)
+    return (
+        event.status in ('ongoing', 'completed')
+        and local.date() == event.date
+        and event.start_time <= local.time() <= event.end_time
+    )
+
+
+def _notifications(records, events, notify_organizer):
+    rows = [
+        Notification(
+            user_id=record.student_id,
+            notification_type='attendance',
+            title='Attendance Marked',
+            message=f'Your attendance has been marked for "{events[record.event_id].title}"',
+            related_event_id=record.event_id,
+        )
+        for record in records
+    ]
+    if notify_organizer:
+        for event_pk, count in Counter(record.event_id for record in records).items():
+            event = events[event_pk]
+            if event.organizer_id:
+                rows.append(Notification(
+                    user_id=event.organizer_id,
+                    notification_type='event',
+                    title='Attendance Recorded',
+                    message=f'{count} check-in{"s" if count != 1 else ""} synced for "{event.title}"',
+                    related_event_id=event_pk,
+                ))
+    return rows
+
+
+def _unstored(accepted):
+    """Split accepted check-ins into (fresh, already stored)"""
+    stored = set(
+        AttendanceRecord.objects.filter(
+            event__in={checkin.event.pk for checkin, _ in accepted},
+            student__in={checkin.student_pk for checkin, _ in accepted},
+        ).values_list('event_id', 'student_id')
+    )
+    fresh, duplicates = [], []
+    for checkin, registration_pk in accepted:
+        if (checkin.event.pk, checkin.student_pk) in stored:
+            duplicates.append(checkin)
+        else:
+            fresh.append((checkin, registration_pk))
+    return fresh, duplicates
+
+
+def _write(fresh, method, device_info, verified, notify_organizer):
+    events = {checkin.event.pk: checkin.event for checkin, _ in fresh}
+    records = [
+        AttendanceRecord(
+            event_id=checkin.event.pk,
+            student_id=checkin.student_pk,
+            registration_id=registration_pk,
+            method=method,
+            marked_at=checkin.scanned_at,
+            device_info=device_info[:200],
+            verified=verified,
+        )
+        for checkin, registration_pk in fresh
+    ]
+    notifications = _notifications(records, events, notify_organizer)
+    with explicit_timestamps(AttendanceRecord._meta.get_field('marked_at')):
+        AttendanceRecord.objects.bulk_create(records)
+    EventRegistration.objects.bulk_update(
+        [
+            EventRegistration(pk=registration_pk, attended=True, attendance_time=checkin.scanned_at)
+            for checkin, registration_pk in fresh
+        ],
+        ['attended', 'attendance_time'],
+    )
+    counters.attendance_batch(records)
+    Notification.objects.bulk_create(notifications)
+    return records, notifications
+
+
+def commit(checkins, method='qr', device_info='', verified=True, notify_organizer=True):
+    """Write a batch of Checkins, returns {key: (status, detail)}"""
+    results = {}
+    accepted = []
+    seen = set()
+    rosters = {}
+    for checkin in checkins:
+        event_pk = checkin.event.pk
+        if event_pk not in rosters:
+            rosters[event_pk] = lifecycle.roster(event_pk)
+        registration_pk = rosters[event_pk].get(checkin.student_pk)
+        if registration_pk is None:
+            registration_pk = lifecycle.registration_of(event_pk, checkin.student_pk)
+        if registration_pk is None:
+            metrics.checkin_rejections.inc(reason='not_registered')
+            results[checkin.key] = (REJECTED, 'Not registered for this event')
+        elif (event_pk, checkin.student_pk) in seen:
+            results[checkin.key] = (DUPLICATE, 'Attendance already marked for this event')
+        else:
+            seen.add((event_pk, checkin.student_pk))
+            accepted.append((checkin, registration_pk))
+    if not accepted:
+        return results
+
+    # The stored rows are read inside the transaction, which SQLite opens with
+    # BEGIN IMMEDIATE; elsewhere a concurrent insert trips the unique
+    # constraint and the batch is read again
+    for attempt in range(3):
+        try:
+            with transaction.atomic():
+                fresh, duplicates = _unstored(accepted)
+                records, notifications = _write(fresh, method, device_info, verified, notify_organizer) if fresh else ([], [])
+            break
+        except IntegrityError:
+            if attempt == 2:
+                raise
+
+    for checkin in duplicates:
+        metrics.checkin_rejections.inc(reason='duplicate')
+        results[checkin.key] = (DUPLICATE, 'Attendance already marked for this event')
+    if not records:
+        return results
+
+    # bulk writes skip the receivers in core.signals
+    caching.bump(
+        'attendance',
+        *{f'attendance:student:{record.student_id}' for record in records},
+        *{f'notifications:{notification.user_id}' for notification in notifications},
+    )
+    metrics.checkins.inc(len(records), method=method)
+    for notification_type, count in Counter(row.notification_type for row in notifications).items():
+        metrics.notifications_created.inc(count, type=notification_type)
+
+    for (checkin, _), record in zip(fresh, records):
+        results[checkin.key] = (MARKED, record.attendance_id)
+    return results
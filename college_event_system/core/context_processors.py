@@ -1,5 +1,5 @@
 # core/context_processors.py
-from .models import Event, User
+from . import counters, notifications
 
 def site_data(request):
     context = {
@@ -8,12 +8,11 @@ def site_data(request):
     }
     
     if request.user.is_authenticated:
-        context['unread_notifications'] = request.user.notifications.filter(is_read=False).count()
+        context['unread_notifications'] = notifications.unread_count(request.user)
         
         if request.user.role == 'student':
             # Student-specific stats
-            registered_events = request.user.event_registrations.count()
-            attended_events = request.user.event_registrations.filter(attended=True).count()
+            registered_events, attended_events = counters.student_counts(request.user.pk)
             attendance_rate = (attended_events / registered_events * 100) if registered_events > 0 else 0
             
             context.update({
@@ -0,0 +1,141 @@
+# core/counters.py
+"""
+Denormalized registration and attendance counters.
+
+Event.current_participants and Event.attended_count, and
+User.registered_count and User.attended_count, follow EventRegistration
+and AttendanceRecord creates and deletes (see core.signals) through F()
+updates, so per-event and per-student rates are single-row reads.
+
+Bulk writes skip signals: wrap them in suspended() and call reconcile()
+afterwards, or run the reconcile_counters command to repair drift. Edits
+of an existing Event or User go through save_keeping_counters() so a
+full-row save cannot overwrite a concurrent increment.
+"""
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .caching import drop_event_pages
+from .models import ArchivedAttendanceRecord, AttendanceRecord, Event, EventRegistration, User
+
+_suspended = ContextVar('counters_suspended', default=False)
+
+
+@contextmanager
+def suspended():
+    """Skip per-row counter updates for a bulk operation, reconcile() afterwards"""
+    token = _suspended.set(True)
+    try:
+        yield
+    finally:
+        _suspended.reset(token)
+
+
+def _shift(field, amount):
+    return Greatest(F(field) + amount, Value(0))
+
+
+def registration_added(registration, amount=1):
+    if _suspended.get():
+        return
+    # updated_at moves with the count, the event card fragments are keyed on it
+    Event.objects.filter(pk=registration.event_id).update(
+        current_participants=_shift('current_participants', amount), updated_at=timezone.now()
+    )
+    User.objects.filter(pk=registration.student_id).update(
+        registered_count=_shift('registered_count', amount)
+    )
+
+
+def attendance_added(record, amount=1):
+    if _suspended.get():
+        return
+    # updated_at stays put here, it keys the event's cached QR code
+    Event.objects.filter(pk=record.event_id).update(attended_count=_shift('attended_count', amount))
+    User.objects.filter(pk=record.student_id).update(attended_count=_shift('attended_count', amount))
+
+
+def attendance_batch(records):
+    """attendance_added() for rows written with bulk_create, one UPDATE per event and per student"""
+    if _suspended.get():
+        return
+    for event_pk, amount in Counter(record.event_id for record in records).items():
+        Event.objects.filter(pk=event_pk).update(attended_count=_shift('attended_count', amount))
+    for student_pk, amount in Counter(record.student_id for record in records).items():
+        User.objects.filter(pk=student_pk).update(attended_count=_shift('attended_count', amount))
+
+
+# Written only through the F() updates above
+COUNTER_FIELDS = {
+    Event: frozenset({'current_participants', 'attended_count'}),
+    User: frozenset({'registered_count', 'attended_count'}),
+}
+
+
+def save_keeping_counters(instance):
+    """Save an edited Event or User without writing back its in-memory counter values"""
+    counted = COUNTER_FIELDS[type(instance)]
+    instance.save(update_fields=[
+        field.name for field in instance._meta.concrete_fields
+        if not field.primary_key and field.name not in counted
+    ])
+
+
+def student_counts(user_pk):
+    """(registered, attended) for one student in a single query"""
+    return User.objects.filter(pk=user_pk).values_list('registered_count', 'attended_count').get()
+
+
+def _count(queryset, field):
+    return Coalesce(Subquery(
+        queryset.filter(**{field: OuterRef('pk')}).order_by().values(field)
+        .annotate(n=Count('pk')).values('n')
+    ), 0)
+
+
+def _attended(field):
+    # Archived attendance (core.archive) still counts
+    return _count(AttendanceRecord.objects, field) + _count(ArchivedAttendanceRecord.objects, field)
+
+
+def reconcile(apply=True, batch_size=500):
+    """Recount every counter from the source rows, returns {'events': n, 'users': n} drifted"""
+    events = list(
+        Event.objects.annotate(
+            actual_registered=_count(EventRegistration.objects, 'event'),
+            actual_attended=_attended('event'),
+        ).filter(
+            ~Q(current_participants=F('actual_registered')) | ~Q(attended_count=F('actual_attended'))
+        ).only('pk', 'current_participants', 'attended_count', 'updated_at')
+    )
+    users = list(
+        User.objects.annotate(
+            actual_registered=_count(EventRegistration.objects, 'student'),
+            actual_attended=_attended('student'),
+        ).filter(
+            ~Q(registered_count=F('actual_registered')) | ~Q(attended_count=F('actual_attended'))
+        ).only('pk', 'registered_count', 'attended_count')
+    )
+
+    if apply and (events or users):
+        now = timezone.now()
+        for event in events:
+            event.current_participants = event.actual_registered
+            event.attended_count = event.actual_attended
+            event.updated_at = now
+        for user in users:
+            user.registered_count = user.actual_registered
+            user.attended_count = user.actual_attended
+        with transaction.atomic():
+            Event.objects.bulk_update(
+                events, ['current_participants', 'attended_count', 'updated_at'], batch_size=batch_size
+            )
+            User.objects.bulk_update(users, ['registered_count', 'attended_count'], batch_size=batch_size)
+        drop_event_pages()
+    return {'events': len(events), 'users': len(users)}
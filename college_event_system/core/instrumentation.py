@@ -0,0 +1,204 @@
+# core/instrumentation.py
+import random
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates as BaseDjangoTemplates, Template, reraise
+
+from . import metrics
+from .permissions import ADMIN, role_of
+
+# Upper bounds in milliseconds, the last bucket catches everything slower
+BUCKETS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float('inf'))
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, float('inf'))
+
+_current = ContextVar('request_timing', default=None)
+
+# Kept in core.metrics so every worker's samples are merged (METRICS_MULTIPROC_DIR)
+view_wall = metrics.registry.histogram(
+    'view_wall_milliseconds', 'Wall time of sampled requests', ['view'], BUCKETS)
+view_db = metrics.registry.histogram(
+    'view_db_milliseconds', 'Database time of sampled requests', ['view'], BUCKETS)
+view_template = metrics.registry.histogram(
+    'view_template_milliseconds', 'Template render time of sampled requests', ['view'], BUCKETS)
+view_queries = metrics.registry.histogram(
+    'view_queries', 'Database queries per sampled request', ['view'], QUERY_BUCKETS)
+TIMED = {'wall_ms': view_wall, 'db_ms': view_db, 'template_ms': view_template, 'queries': view_queries}
+
+
+class RequestTiming:
+    """Per-request counters, fed by timed_execute for every query"""
+
+    __slots__ = ('queries', 'db_ms', 'template_ms')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_ms = 0.0
+        self.template_ms = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_ms += (time.perf_counter() - started) * 1000
+
+
+def timed_execute(execute, sql, params, many, context):
+    # The context variable follows async views into their sync_to_async threads,
+    # where a wrapper entered around the request would never see the queries
+    timing = _current.get()
+    if timing is None:
+        return execute(sql, params, many, context)
+    return timing(execute, sql, params, many, context)
+
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):
+    if timed_execute not in connection.execute_wrappers:
+        connection.execute_wrappers.append(timed_execute)
+
+
+def quantile(buckets, counts, q):
+    """Upper bound of the bucket holding the q-th observation"""
+    count = sum(counts)
+    if not count:
+        return 0.0
+    rank = q * count
+    seen = 0
+    for bound, bucket in zip(buckets, counts):
+        seen += bucket
+        if seen >= rank:
+            return bound
+    return buckets[-1]
+
+
+def summarize(buckets, value):
+    """mean, quantiles and buckets from a core.metrics histogram value"""
+    counts, total, count = value[:len(buckets)], value[-2], value[-1]
+    return {
+        'mean': round(total / count, 3) if count else 0.0,
+        'p50': quantile(buckets, counts, 0.5),
+        'p90': quantile(buckets, counts, 0.9),
+        'p99': quantile(buckets, counts, 0.99),
+        'buckets': {
+            ('+Inf' if bound == float('inf') else str(bound)): bucket
+            for bound, bucket in zip(buckets, counts)
+        },
+    }
+
+
+def record(view_name, timing, wall_ms):
+    view_wall.observe(wall_ms, view=view_name)
+    view_db.observe(timing.db_ms, view=view_name)
+    view_template.observe(timing.template_ms, view=view_name)
+    view_queries.observe(timing.queries, view=view_name)
+
+
+def snapshot():
+    """Per-view summaries, across all workers when core.metrics runs in multiprocess mode"""
+    views = {}
+    for field, histogram in TIMED.items():
+        for key, value in histogram.registry.samples(histogram).items():
+            stats = views.setdefault(dict(key)['view'], {'count': int(value[-1])})
+            stats[field] = summarize(histogram.buckets, value)
+    return dict(sorted(views.items()))
+
+
+class InstrumentedTemplate(Template):
+    def render(self, context=None, request=None):
+        timing = _current.get()
+        if timing is None:
+            return super().render(context, request)
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            timing.template_ms += (time.perf_counter() - started) * 1000
+
+
+class DjangoTemplates(BaseDjangoTemplates):
+    """Stock Django template backend that reports render time to sampled requests"""
+
+    def from_string(self, template_code):
+        return InstrumentedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return InstrumentedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
+
+
+class InstrumentationMiddleware:
+    """
+    Time a sample of requests: wall time, DB queries and time, template
+    render time. Results go into per-view core.metrics histograms, served
+    by the instrumentation_stats view and /metrics, and out as a
+    Server-Timing header when DEBUG is on or an admin made the request.
+    Works in both WSGI and ASGI stacks.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'INSTRUMENTATION_SAMPLE_RATE', 0.05)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def sampled(self):
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+
+        timing = RequestTiming()
+        token = _current.set(timing)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, timing, started)
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+
+        timing = RequestTiming()
+        token = _current.set(timing)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, timing, started)
+
+    def finish(self, request, response, timing, started):
+        wall_ms = (time.perf_counter() - started) * 1000
+
+        match = getattr(request, 'resolver_match', None)
+        view_name = (match.view_name if match else None) or 'unresolved'
+        record(view_name, timing, wall_ms)
+
+        # Query counts and timings are not for anonymous clients
+        user = getattr(request, 'user', None)
+        if not settings.DEBUG and not (user and user.is_authenticated and role_of(user) == ADMIN):
+            return response
+        response['Server-Timing'] = (
+            f'app;dur={wall_ms:.1f}, '
+            f'db;dur={timing.db_ms:.1f};desc="{timing.queries} queries", '
+            f'tpl;dur={timing.template_ms:.1f}'
+        )
+        return response
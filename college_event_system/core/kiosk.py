@@ -0,0 +1,220 @@
+# core/kiosk.py
+"""
+Organizer kiosk check-in.
+
+A kiosk at the door scans the personal QR codes students show
+(generate_personal_qr) and posts each one to kiosk_checkin. The scan is
+checked in memory against this process's copy of the event roster and
+of the students already checked in, answered straight away and queued.
+A daemon thread commits the queue through core.checkins every
+KIOSK_FLUSH_INTERVAL seconds, or sooner once KIOSK_FLUSH_BATCH scans
+are waiting, so a hall checking in tens of students a second costs a few
+transactions instead of one per student.
+
+A door (event, roster, checked-in students) is reloaded after
+KIOSK_DOOR_TTL seconds, and a roster miss is looked up in the database,
+so a student who registers at the door is found on the next scan.
+
+The kiosk answers before the commit, so a check-in that still fails
+(the database stays busy for KIOSK_FLUSH_RETRIES flushes, or the commit
+raises or rejects it) is recorded in the cache under its event.
+kiosk_status lists those students for the organizer to scan again.
+"""
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import OperationalError, connection
+from django.utils import timezone
+
+from . import checkins, lifecycle, metrics
+from .models import AttendanceRecord, Event
+
+logger = logging.getLogger(__name__)
+
+
+def failures_key(event_pk):
+    return f'kiosk:failures:v1:{event_pk}'
+
+
+def failures(event_pk):
+    """{student pk: (scanned_at, message)} for check-ins that did not commit"""
+    return cache.get(failures_key(event_pk), {})
+
+
+def _record_failures(event_pk, failed):
+    entry = failures(event_pk)
+    entry.update(failed)
+    cache.set(failures_key(event_pk), entry, getattr(settings, 'KIOSK_FAILURE_TIMEOUT', 60 * 60 * 12))
+
+
+def _clear_failure(event_pk, student_pk):
+    entry = failures(event_pk)
+    if entry.pop(student_pk, None) is not None:
+        cache.set(failures_key(event_pk), entry, getattr(settings, 'KIOSK_FAILURE_TIMEOUT', 60 * 60 * 12))
+
+
+def identity(qr_data):
+    """User pk from a personal QR payload, or None if it is not one"""
+    try:
+        payload = json.loads(qr_data)
+        if payload.get('type') != 'student_identity':
+            return None
+        return int(payload['user_id'])
+    except (TypeError, ValueError, KeyError, AttributeError):
+        return None
+
+
+class Door:
+    """One event being checked in by this process"""
+
+    def __init__(self, event):
+        self.event = event
+        self.roster = lifecycle.roster(event.pk)
+        self.admitted = set(
+            AttendanceRecord.objects.filter(event=event).values_list('student_id', flat=True)
+        )
+        self.loaded_at = time.monotonic()
+
+
+class KioskBuffer:
+    def __init__(self):
+        self._doors = {}
+        self._pending = []
+        self._attempts = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._flusher_pid = None
+
+    def __len__(self):
+        return len(self._pending)
+
+    def door(self, event_id):
+        """The Door for an event code, or None if there is no such event"""
+        door = self._doors.get(event_id)
+        if door is None or time.monotonic() - door.loaded_at > getattr(settings, 'KIOSK_DOOR_TTL', 60):
+            event = Event.objects.filter(event_id=event_id).first()
+            if event is None:
+                return None
+            fresh = Door(event)
+            with self._lock:
+                # Keep the check-ins still waiting in the queue
+                fresh.admitted.update(checkin.student_pk for checkin in self._pending if checkin.event.pk == event.pk)
+                self._doors[event_id] = door = fresh
+        return door
+
+    def admit(self, door, student_pk, now=None):
+        """Queue a check-in, returns (status, message)"""
+        now = now or timezone.now()
+        if not checkins.within_event(door.event, now):
+            metrics.checkin_rejections.inc(reason='inactive')
+            return checkins.REJECTED, 'Event is not active for attendance'
+        registration_pk = door.roster.get(student_pk)
+        if registration_pk is None:
+            registration_pk = lifecycle.registration_of(door.event.pk, student_pk)
+            if registration_pk is not None:
+                door.roster[student_pk] = registration_pk
+        if registration_pk is None:
+            metrics.checkin_rejections.inc(reason='not_registered')
+            return checkins.REJECTED, 'Not registered for this event'
+
+        with self._lock:
+            if student_pk in door.admitted:
+                duplicate = True
+            else:
+                duplicate = False
+                door.admitted.add(student_pk)
+                self._pending.append(checkins.Checkin((door.event.event_id, student_pk), door.event, student_pk, now))
+            waiting = len(self._pending)
+        if duplicate:
+            metrics.checkin_rejections.inc(reason='duplicate')
+            return checkins.DUPLICATE, 'Already checked in'
+
+        _clear_failure(door.event.pk, student_pk)
+        self._ensure_flusher()
+        if waiting >= getattr(settings, 'KIOSK_FLUSH_BATCH', 200):
+            self._wakeup.set()
+        return checkins.MARKED, 'Checked in'
+
+    def drain(self):
+        with self._lock:
+            pending, self._pending = self._pending, []
+        return pending
+
+    def pending(self, event_pk):
+        with self._lock:
+            return sum(1 for checkin in self._pending if checkin.event.pk == event_pk)
+
+    def _fail(self, failed):
+        """Let the students scan again and report them to kiosk_status"""
+        by_event = {}
+        with self._lock:
+            for checkin, message in failed:
+                self._attempts.pop(checkin.key, None)
+                door = self._doors.get(checkin.event.event_id)
+                if door is not None:
+                    door.admitted.discard(checkin.student_pk)
+                by_event.setdefault(checkin.event.pk, {})[checkin.student_pk] = (checkin.scanned_at, message)
+        for event_pk, entries in by_event.items():
+            metrics.checkin_rejections.inc(len(entries), reason='kiosk_failed')
+            _record_failures(event_pk, entries)
+
+    def flush(self):
+        pending = self.drain()
+        if not pending:
+            return 0
+        try:
+            results = checkins.commit(pending, method='qr', device_info='Organizer kiosk', notify_organizer=False)
+        except OperationalError:
+            limit = getattr(settings, 'KIOSK_FLUSH_RETRIES', 20)
+            retry, failed = [], []
+            with self._lock:
+                for checkin in pending:
+                    self._attempts[checkin.key] = attempts = self._attempts.get(checkin.key, 0) + 1
+                    (retry if attempts < limit else failed).append(checkin)
+                self._pending[:0] = retry
+            logger.warning('Database busy, retrying %d kiosk check-ins, giving up on %d', len(retry), len(failed))
+            self._fail([(checkin, 'Database busy, scan again') for checkin in failed])
+            return 0
+        except Exception:
+            logger.exception('Failed to commit %d kiosk check-ins', len(pending))
+            self._fail([(checkin, 'Check-in failed, scan again') for checkin in pending])
+            return 0
+
+        with self._lock:
+            for checkin in pending:
+                self._attempts.pop(checkin.key, None)
+        self._fail([
+            (checkin, results[checkin.key][1]) for checkin in pending
+            if results[checkin.key][0] == checkins.REJECTED
+        ])
+        return sum(1 for status, _ in results.values() if status == checkins.MARKED)
+
+    def _ensure_flusher(self):
+        pid = os.getpid()
+        if self._flusher_pid == pid:
+            return
+        with self._lock:
+            if self._flusher_pid == pid:
+                return
+            self._flusher_pid = pid
+        threading.Thread(target=self._run, name='kiosk-flush', daemon=True).start()
+        atexit.register(self.flush)
+
+    def _run(self):
+        interval = getattr(settings, 'KIOSK_FLUSH_INTERVAL', 0.25)
+        while True:
+            self._wakeup.wait(interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            finally:
+                connection.close()
+
+
+buffer = KioskBuffer()
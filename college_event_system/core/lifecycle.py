@@ -0,0 +1,224 @@
+# core/lifecycle.py
+"""
+Event lifecycle.
+
+advance() moves upcoming events to ongoing at their start_time and
+upcoming or ongoing events to completed once their end_time has passed.
+Drafts and cancelled events are left alone, and toggle_event_status
+still works as a manual override. The run_event_scheduler command calls
+advance() on a timer.
+
+Which events are open for attendance right now is answered by LiveIndex,
+a per-process sorted array of today's ongoing events, so views check
+membership instead of comparing dates and times in SQL. Per-student
+answers intersect it with a cached set of the student's registered events.
+"""
+import bisect
+import threading
+import time
+from array import array
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .caching import drop_event_pages
+from .models import Event, EventRegistration
+from .qr import event_qr_data_uri
+
+GENERATION_KEY = 'events:live:generation'
+
+
+def _local(now):
+    local = timezone.localtime(now or timezone.now())
+    return local, local.date(), local.time()
+
+
+def roster_key(event_pk):
+    return f'events:roster:v1:{event_pk}'
+
+
+def roster(event_pk):
+    """{student_id: registration pk} for one event"""
+    key = roster_key(event_pk)
+    entry = cache.get(key)
+    if entry is None:
+        entry = dict(
+            EventRegistration.objects.filter(event_id=event_pk).values_list('student_id', 'pk')
+        )
+        cache.set(key, entry, getattr(settings, 'EVENT_ROSTER_CACHE_TIMEOUT', 60 * 60 * 12))
+    return entry
+
+
+def drop_roster(event_pk):
+    cache.delete(roster_key(event_pk))
+
+
+def registration_of(event_pk, student_pk):
+    """
+    The student's registration pk for an event, or None. The cached roster
+    is only dropped by the process that saved a registration, so a miss is
+    checked against the database before the student is turned away.
+    """
+    registration_pk = roster(event_pk).get(student_pk)
+    if registration_pk is None:
+        registration_pk = (
+            EventRegistration.objects.filter(event_id=event_pk, student_id=student_pk)
+            .values_list('pk', flat=True).first()
+        )
+        if registration_pk is not None:
+            drop_roster(event_pk)
+    return registration_pk
+
+
+def _seconds(value):
+    return value.hour * 3600 + value.minute * 60 + value.second
+
+
+class LiveIndex:
+    """
+    Today's ongoing events for this process, sorted by start time in
+    compact arrays. live_at() bisects the starts and keeps the events whose
+    end is still ahead. The index is rebuilt when the day changes, when
+    the generation counter in the cache moves (Event saves and advance()
+    bump it) and at least every LIVE_INDEX_TTL seconds. The counter only
+    reaches other processes through a shared cache, the TTL bounds how long
+    a worker on LocMemCache misses events the scheduler process started.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._day = None
+        self._generation = None
+        self._built_at = 0.0
+        self._starts = array('l')
+        self._ends = array('l')
+        self._pks = array('q')
+
+    def _rebuild(self, today, generation):
+        rows = sorted(
+            (_seconds(start), _seconds(end), pk)
+            for pk, start, end in Event.objects.filter(status='ongoing', date=today)
+            .values_list('pk', 'start_time', 'end_time')
+        )
+        self._starts = array('l', (row[0] for row in rows))
+        self._ends = array('l', (row[1] for row in rows))
+        self._pks = array('q', (row[2] for row in rows))
+        self._day = today
+        self._generation = generation
+        self._built_at = time.monotonic()
+
+    def invalidate(self):
+        self._generation = None
+
+    def live_at(self, today, current):
+        current_generation = generation()
+        with self._lock:
+            if (
+                self._day != today
+                or self._generation != current_generation
+                or time.monotonic() - self._built_at > getattr(settings, 'LIVE_INDEX_TTL', 30)
+            ):
+                self._rebuild(today, current_generation)
+            starts, ends, pks = self._starts, self._ends, self._pks
+        moment = _seconds(current)
+        upto = bisect.bisect_right(starts, moment)
+        return [pks[i] for i in range(upto) if ends[i] >= moment]
+
+    def __len__(self):
+        return len(self._pks)
+
+
+index = LiveIndex()
+
+
+def generation():
+    return cache.get(GENERATION_KEY, 0)
+
+
+def bump_generation():
+    """Tell every process its live index is stale"""
+    index.invalidate()
+    cache.set(GENERATION_KEY, time.time_ns(), None)
+
+
+def live_event_ids(now=None):
+    """pks of events open for attendance right now"""
+    local, today, current = _local(now)
+    return index.live_at(today, current)
+
+
+def is_live(event, now=None):
+    return event.pk in live_event_ids(now)
+
+
+def student_events_key(student_pk):
+    return f'students:events:v1:{student_pk}'
+
+
+def registered_event_ids(student_pk):
+    """frozenset of event pks the student is registered for"""
+    key = student_events_key(student_pk)
+    entry = cache.get(key)
+    if entry is None:
+        entry = frozenset(
+            EventRegistration.objects.filter(student_id=student_pk).values_list('event_id', flat=True)
+        )
+        cache.set(key, entry, getattr(settings, 'STUDENT_EVENTS_CACHE_TIMEOUT', 60))
+    return entry
+
+
+def drop_registered_event_ids(student_pk):
+    cache.delete(student_events_key(student_pk))
+
+
+def is_registered(event_pk, student_pk):
+    """Like registration_of, a miss in the cached set is checked against the database"""
+    if event_pk in registered_event_ids(student_pk):
+        return True
+    if EventRegistration.objects.filter(event_id=event_pk, student_id=student_pk).exists():
+        drop_registered_event_ids(student_pk)
+        return True
+    return False
+
+
+def live_event_ids_for(student_pk, now=None):
+    """Live events the student is registered for"""
+    registered = registered_event_ids(student_pk)
+    return [pk for pk in live_event_ids(now) if pk in registered]
+
+
+def warm(event):
+    """Preload what check-in needs for an event that just went live"""
+    drop_roster(event.pk)
+    roster(event.pk)
+    event_qr_data_uri(event, view='lifecycle_warm')
+
+
+def advance(now=None):
+    """Apply due status transitions, returns {'started': [...], 'completed': n}"""
+    local, today, current = _local(now)
+    started_window = Q(date=today, start_time__lte=current, end_time__gte=current)
+    finished = Q(date__lt=today) | Q(date=today, end_time__lt=current)
+
+    with transaction.atomic():
+        started = list(
+            Event.objects.filter(started_window, status='upcoming').values_list('pk', flat=True)
+        )
+        if started:
+            Event.objects.filter(pk__in=started, status='upcoming').update(
+                status='ongoing', updated_at=local
+            )
+        completed = Event.objects.filter(finished, status__in=['upcoming', 'ongoing']).update(
+            status='completed', updated_at=local
+        )
+
+    if started or completed:
+        bump_generation()
+        drop_event_pages()
+    started_events = list(Event.objects.filter(pk__in=started))
+    for event in started_events:
+        warm(event)
+    return {'started': started_events, 'completed': completed}
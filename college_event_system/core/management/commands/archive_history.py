@@ -0,0 +1,38 @@
+# core/management/commands/archive_history.py
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core import archive
+
+
+class Command(BaseCommand):
+    help = ('Move attendance of completed events and read notifications past the archive '
+            'horizon into the archive tables')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=getattr(settings, 'ARCHIVE_AFTER_DAYS', 180),
+                            help='Archive events dated more than this many days ago')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Count what would move without writing')
+
+    def handle(self, *args, **options):
+        if options['days'] < 1:
+            raise CommandError('--days must be at least 1')
+        before = archive.horizon(options['days'])
+
+        if options['dry_run']:
+            attendance = archive.archivable_attendance(before).count()
+            notifications = archive.archivable_notifications(before).count()
+            self.stdout.write(f'{attendance} attendance records and {notifications} notifications '
+                              f'dated before {before} would be archived')
+            return
+
+        started = time.perf_counter()
+        moved = archive.archive(before, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {moved['attendance']} attendance records and {moved['notifications']} "
+            f'notifications dated before {before} in {time.perf_counter() - started:.1f}s'
+        ))
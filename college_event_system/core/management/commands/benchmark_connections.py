@@ -0,0 +1,98 @@
+# core/management/commands/benchmark_connections.py
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connections
+from django.db.backends.signals import connection_created
+from django.test import Client
+from django.urls import reverse
+
+from core.benchmarks import summarize
+from core.models import User
+
+XHR = {'X-Requested-With': 'XMLHttpRequest'}
+
+
+class Command(BaseCommand):
+    help = ('Measure what opening a database connection per request costs, against '
+            'persistent connections with health checks')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=300)
+        parser.add_argument('--warmup', type=int, default=20)
+        parser.add_argument('--view', action='append', default=[],
+                            help='URL name to request (repeatable, default health and get_notifications)')
+        parser.add_argument('--max-age', type=int, default=600,
+                            help='CONN_MAX_AGE for the persistent run')
+
+    def handle(self, *args, **options):
+        database = connections['default']
+        if database.settings_dict['OPTIONS'].get('pool'):
+            raise CommandError('The default database uses a connection pool, CONN_MAX_AGE does not apply')
+
+        student = User.objects.filter(role='student', is_active=True).first()
+        if student is None:
+            raise CommandError('No students found, run generate_load_data first')
+        client = Client()
+        client.force_login(student)
+
+        original = {key: database.settings_dict[key] for key in ('CONN_MAX_AGE', 'CONN_HEALTH_CHECKS')}
+        modes = [
+            ('per-request', {'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False}),
+            ('persistent', {'CONN_MAX_AGE': options['max_age'], 'CONN_HEALTH_CHECKS': True}),
+        ]
+        opened = [0]
+
+        def count(sender, connection, **kwargs):
+            if connection.alias == 'default':
+                opened[0] += 1
+
+        connection_created.connect(count)
+        try:
+            self.stdout.write(f"connect() alone: {self.connect_cost(database):.3f}ms "
+                              f'({database.vendor}, includes init_command)')
+            results = {}
+            for mode, values in modes:
+                database.close()
+                database.settings_dict.update(values)
+                for name in options['view'] or ['health', 'get_notifications']:
+                    opened[0] = 0
+                    samples = self.run(client, reverse(name), options['iterations'], options['warmup'])
+                    row = summarize(samples)
+                    row['opens'] = opened[0] / (options['iterations'] + options['warmup'])
+                    results[(mode, name)] = row
+                    self.stdout.write(
+                        f"{mode:<12} {name:<20} p50={row['p50_ms']:>7.3f}ms  p99={row['p99_ms']:>7.3f}ms  "
+                        f"connections/request={row['opens']:.2f}"
+                    )
+        finally:
+            connection_created.disconnect(count)
+            database.close()
+            database.settings_dict.update(original)
+
+        for name in options['view'] or ['health', 'get_notifications']:
+            before, after = results[('per-request', name)], results[('persistent', name)]
+            self.stdout.write(f"{name}: {before['p50_ms'] - after['p50_ms']:+.3f}ms p50 saved per request")
+
+    def connect_cost(self, database, rounds=50):
+        samples = []
+        for _ in range(rounds):
+            database.close()
+            started = time.perf_counter()
+            database.connect()
+            samples.append((time.perf_counter() - started) * 1000)
+        database.close()
+        return summarize(samples)['p50_ms']
+
+    def run(self, client, path, iterations, warmup):
+        samples = []
+        for index in range(warmup + iterations):
+            started = time.perf_counter()
+            # A worker calls close_old_connections on request_started and request_finished,
+            # the test client leaves that out
+            close_old_connections()
+            client.get(path, headers=XHR)
+            close_old_connections()
+            if index >= warmup:
+                samples.append((time.perf_counter() - started) * 1000)
+        return samples
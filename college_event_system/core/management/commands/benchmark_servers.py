@@ -0,0 +1,214 @@
+# core/management/commands/benchmark_servers.py
+import asyncio
+import os
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from importlib import import_module
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from core.benchmarks import summarize
+from core.models import User
+
+# Polled endpoints served by async views, see core.views
+ENDPOINTS = ('get_notifications', 'get_ongoing_events', 'get_recent_attendance', 'attendance_stats')
+
+SERVERS = {
+    'asgi': lambda port, workers: [
+        sys.executable, '-m', 'uvicorn', 'college_event_system.asgi:application',
+        '--host', '127.0.0.1', '--port', str(port), '--workers', str(workers),
+        '--no-access-log', '--log-level', 'warning',
+    ],
+    'wsgi': lambda port, workers: [
+        sys.executable, '-m', 'gunicorn', 'college_event_system.wsgi',
+        '--bind', f'127.0.0.1:{port}', '--workers', str(workers),
+        '--worker-class', 'sync', '--log-level', 'warning',
+    ],
+}
+
+
+class HTTPConnection:
+    """One keep-alive HTTP/1.1 connection, reopened when the server closes it"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = self.writer = None
+
+    async def get(self, path, headers):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        lines = [f'GET {path} HTTP/1.1', f'Host: {self.host}:{self.port}']
+        lines += [f'{name}: {value}' for name, value in headers.items()]
+        self.writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        await self.writer.drain()
+
+        head = (await self.reader.readuntil(b'\r\n\r\n')).decode('latin-1').split('\r\n')
+        status = int(head[0].split()[1])
+        fields = dict(
+            (name.strip().lower(), value.strip())
+            for name, _, value in (line.partition(':') for line in head[1:] if line)
+        )
+        if 'content-length' in fields:
+            await self.reader.readexactly(int(fields['content-length']))
+        elif fields.get('transfer-encoding') == 'chunked':
+            while size := int((await self.reader.readline()).strip(), 16):
+                await self.reader.readexactly(size + 2)
+            await self.reader.readline()
+        elif status not in (204, 304):
+            await self.reader.read()
+            fields['connection'] = 'close'
+        if fields.get('connection', '').lower() == 'close':
+            self.close()
+        return status
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+class Command(BaseCommand):
+    help = ('Compare how many concurrent polling connections the ASGI (uvicorn) and '
+            'WSGI (gunicorn sync workers) deployments sustain')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--servers', nargs='+', choices=sorted(SERVERS), default=['wsgi', 'asgi'])
+        parser.add_argument('--workers', type=int, default=2, help='Worker processes per server')
+        parser.add_argument('--connections', type=int, nargs='+', default=[16, 64, 256],
+                            help='Concurrent connection levels to run')
+        parser.add_argument('--duration', type=float, default=10, help='Seconds per level')
+        parser.add_argument('--timeout', type=float, default=10,
+                            help='A request slower than this counts as an error')
+        parser.add_argument('--endpoint', action='append', choices=ENDPOINTS, default=[],
+                            help='Endpoint to poll (repeatable, default all)')
+        parser.add_argument('--students', type=int, default=200,
+                            help='Distinct signed in students behind the connections')
+        parser.add_argument('--port', type=int, default=8101, help='First port to start servers on')
+        parser.add_argument('--url', action='append', default=[], metavar='NAME=URL',
+                            help='Benchmark an already running server instead of starting one')
+
+    def handle(self, *args, **options):
+        paths = [reverse(name) for name in options['endpoint'] or ENDPOINTS]
+        cookies = self.sessions(options['students'])
+        try:
+            results = []
+            for name, url, process in self.targets(options):
+                try:
+                    self.wait_until_ready(url, process)
+                    for connections in options['connections']:
+                        row = asyncio.run(self.run(url, paths, cookies, connections, options))
+                        row.update(server=name, connections=connections)
+                        results.append(row)
+                        self.stdout.write(self.format(row))
+                finally:
+                    if process is not None:
+                        process.terminate()
+                        process.wait(timeout=30)
+        finally:
+            self.end_sessions(cookies)
+
+    def targets(self, options):
+        if options['url']:
+            for entry in options['url']:
+                name, sep, url = entry.partition('=')
+                if not sep:
+                    raise CommandError(f'Expected NAME=URL, got {entry}')
+                yield name, url.rstrip('/'), None
+            return
+
+        for offset, name in enumerate(options['servers']):
+            port = options['port'] + offset
+            command = SERVERS[name](port, options['workers'])
+            self.stdout.write(f"Starting {name}: {' '.join(command[1:])}")
+            process = subprocess.Popen(command, cwd=settings.BASE_DIR, env=os.environ.copy())
+            yield name, f'http://127.0.0.1:{port}', process
+
+    def wait_until_ready(self, url, process, limit=30):
+        deadline = time.monotonic() + limit
+        while time.monotonic() < deadline:
+            if process is not None and process.poll() is not None:
+                raise CommandError(f'Server for {url} exited with {process.returncode}')
+            try:
+                with urllib.request.urlopen(f'{url}{reverse("health")}', timeout=2) as response:
+                    if response.status == 200:
+                        return
+            except (urllib.error.URLError, OSError):
+                pass
+            time.sleep(0.25)
+        raise CommandError(f'{url} did not become healthy within {limit}s')
+
+    def sessions(self, count):
+        """Sign students in by writing sessions directly, like Client.force_login"""
+        students = list(User.objects.filter(role='student', is_active=True).order_by('pk')[:count])
+        if not students:
+            raise CommandError('No students found, run generate_load_data first')
+        engine = import_module(settings.SESSION_ENGINE)
+        cookies = []
+        for student in students:
+            session = engine.SessionStore()
+            session[SESSION_KEY] = student._meta.pk.value_to_string(student)
+            session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+            session[HASH_SESSION_KEY] = student.get_session_auth_hash()
+            session.save()
+            cookies.append(session.session_key)
+        return cookies
+
+    def end_sessions(self, cookies):
+        engine = import_module(settings.SESSION_ENGINE)
+        for key in cookies:
+            engine.SessionStore(key).delete()
+
+    async def run(self, url, paths, cookies, connections, options):
+        parts = urlsplit(url)
+        deadline = time.perf_counter() + options['duration']
+        latencies, statuses, errors = [], {}, [0]
+
+        async def client(index):
+            connection = HTTPConnection(parts.hostname, parts.port or 80)
+            headers = {
+                'Cookie': f'{settings.SESSION_COOKIE_NAME}={cookies[index % len(cookies)]}',
+                'X-Requested-With': 'XMLHttpRequest',
+            }
+            step = index
+            while time.perf_counter() < deadline:
+                path = paths[step % len(paths)]
+                step += 1
+                started = time.perf_counter()
+                try:
+                    status = await asyncio.wait_for(connection.get(path, headers), options['timeout'])
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError, OSError, ValueError):
+                    errors[0] += 1
+                    connection.close()
+                    continue
+                latencies.append((time.perf_counter() - started) * 1000)
+                statuses[status] = statuses.get(status, 0) + 1
+            connection.close()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(client(index) for index in range(connections)))
+        elapsed = time.perf_counter() - started
+        return {
+            'requests': len(latencies),
+            'rps': len(latencies) / elapsed if elapsed else 0.0,
+            'errors': errors[0],
+            'non_200': sum(count for status, count in statuses.items() if status != 200),
+            **summarize(latencies),
+        }
+
+    def format(self, row):
+        line = (
+            f"{row['server']:<6} {row['connections']:>5} conns  {row['rps']:>8.1f} req/s  "
+            f"p50={row['p50_ms']:.1f}ms p99={row['p99_ms']:.1f}ms  "
+            f"errors={row['errors']} non-200={row['non_200']}"
+        )
+        if row['errors'] or row['non_200']:
+            return self.style.WARNING(line)
+        return line
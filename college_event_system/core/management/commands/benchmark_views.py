@@ -0,0 +1,186 @@
+# core/management/commands/benchmark_views.py
+import json
+import time
+from contextlib import nullcontext
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.benchmarks import BASELINE_DIR, summarize, load_baseline, save_baseline, compare_results
+from core.models import User, Event, EventRegistration, AttendanceRecord
+
+XHR = {'X-Requested-With': 'XMLHttpRequest'}
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Measure latency percentiles and query counts for the hot views'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument('--only', action='append', default=[],
+                            help='Benchmark only this view (repeatable)')
+        parser.add_argument('--baseline', default=str(BASELINE_DIR / 'views.json'))
+        parser.add_argument('--save', action='store_true', help='Write results as the new baseline')
+        parser.add_argument('--compare', action='store_true',
+                            help='Fail if results regress against the baseline')
+        parser.add_argument('--tolerance', type=float, default=0.5,
+                            help='Allowed p50 slowdown before --compare fails (0.5 = 50%%)')
+        parser.add_argument('--generate', action='store_true',
+                            help='Rebuild the load dataset before benchmarking')
+        parser.add_argument('--students', type=int, default=5000)
+        parser.add_argument('--events', type=int, default=250)
+
+    def handle(self, *args, **options):
+        if options['generate']:
+            call_command('generate_load_data', students=options['students'],
+                         events=options['events'], clear=True, stdout=self.stdout)
+
+        fixtures = self.fixtures()
+        scenarios = self.scenarios(fixtures)
+        if options['only']:
+            unknown = set(options['only']) - {s['name'] for s in scenarios}
+            if unknown:
+                raise CommandError(f"Unknown view(s): {', '.join(sorted(unknown))}")
+            scenarios = [s for s in scenarios if s['name'] in options['only']]
+
+        results = {}
+        for scenario in scenarios:
+            results[scenario['name']] = self.run(scenario, options['iterations'], options['warmup'])
+            row = results[scenario['name']]
+            self.stdout.write(
+                f"{scenario['name']:<24} {row['status']:>4}  queries={row['queries']:<4} "
+                f"p50={row['p50_ms']:>8.2f}ms  p90={row['p90_ms']:>8.2f}ms  p99={row['p99_ms']:>8.2f}ms"
+            )
+
+        report = {
+            'generated_at': timezone.now().isoformat(),
+            'dataset': {
+                'students': User.objects.filter(role='student').count(),
+                'events': Event.objects.count(),
+                'registrations': EventRegistration.objects.count(),
+                'attendance': AttendanceRecord.objects.count(),
+            },
+            'iterations': options['iterations'],
+            'views': results,
+        }
+
+        if options['compare']:
+            baseline = load_baseline(options['baseline'])
+            if baseline is None:
+                raise CommandError(f"No baseline at {options['baseline']}, run with --save first")
+            regressions = compare_results(baseline, results, options['tolerance'])
+            if regressions:
+                raise CommandError('Regressions found:\n  ' + '\n  '.join(regressions))
+            self.stdout.write(self.style.SUCCESS('No regressions against baseline'))
+
+        if options['save']:
+            save_baseline(options['baseline'], report)
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {options['baseline']}"))
+
+    def fixtures(self):
+        """Pick the users and rows each scenario needs from the existing dataset"""
+        admin, _ = User.objects.get_or_create(
+            username='load_admin',
+            defaults={'role': 'admin', 'is_staff': True, 'email': 'load_admin@college.edu'},
+        )
+
+        today = timezone.localdate()
+        now = timezone.localtime().time()
+        pending = EventRegistration.objects.filter(
+            attended=False,
+            event__status='ongoing',
+            event__date=today,
+            event__start_time__lte=now,
+            event__end_time__gte=now,
+            student__role='student',
+            student__attendance_records__isnull=False,
+        ).select_related('event', 'student').first()
+
+        if pending is None:
+            raise CommandError(
+                'No student with both past attendance and a live event, '
+                'run generate_load_data first or pass --generate'
+            )
+
+        record = AttendanceRecord.objects.filter(student=pending.student).first()
+        return {
+            'admin': admin,
+            'student': pending.student,
+            'live_event': pending.event,
+            'attendance': record,
+        }
+
+    def scenarios(self, fixtures):
+        return [
+            {'name': 'home', 'user': None, 'path': reverse('home')},
+            {'name': 'events_list', 'user': fixtures['student'], 'path': reverse('events')},
+            {'name': 'admin_dashboard', 'user': fixtures['admin'], 'path': reverse('admin_dashboard')},
+            {'name': 'student_dashboard', 'user': fixtures['student'],
+             'path': reverse('student_dashboard')},
+            {'name': 'attendance_view', 'user': fixtures['student'], 'path': reverse('attendance')},
+            {'name': 'mark_qr_attendance', 'user': fixtures['student'], 'method': 'post',
+             'path': reverse('mark_qr_attendance'), 'headers': XHR,
+             'data': json.dumps({'qr_data': fixtures['live_event'].event_id}),
+             'expect': '"success": true'},
+            {'name': 'get_recent_attendance', 'user': fixtures['admin'],
+             'path': reverse('get_recent_attendance'), 'headers': XHR},
+            {'name': 'generate_certificate', 'user': fixtures['student'],
+             'path': reverse('generate_certificate', args=[fixtures['attendance'].attendance_id])},
+        ]
+
+    def request(self, client, scenario):
+        method = getattr(client, scenario.get('method', 'get'))
+        kwargs = {'headers': scenario.get('headers', {})}
+        if 'data' in scenario:
+            kwargs.update(data=scenario['data'], content_type='application/json')
+        return method(scenario['path'], **kwargs)
+
+    def timed(self, client, scenario, capture=False):
+        """One request inside a rolled back transaction so writes never accumulate"""
+        outcome = {}
+        try:
+            with transaction.atomic():
+                with (CaptureQueriesContext(connection) if capture else nullcontext()) as captured:
+                    started = time.perf_counter()
+                    response = self.request(client, scenario)
+                    if response.streaming:
+                        b''.join(response.streaming_content)
+                    else:
+                        response.content
+                    outcome['elapsed'] = (time.perf_counter() - started) * 1000
+                outcome['response'] = response
+                outcome['queries'] = len(captured.captured_queries) if capture else None
+                raise _Rollback
+        except _Rollback:
+            pass
+        return outcome
+
+    def run(self, scenario, iterations, warmup):
+        client = Client()
+        if scenario['user'] is not None:
+            client.force_login(scenario['user'])
+
+        first = self.timed(client, scenario, capture=True)
+        response = first['response']
+        expected = scenario.get('expect')
+        if expected and expected not in response.content.decode():
+            self.stderr.write(f"{scenario['name']}: unexpected response {response.content[:200]!r}")
+
+        for _ in range(warmup):
+            self.timed(client, scenario)
+
+        samples = [self.timed(client, scenario)['elapsed'] for _ in range(iterations)]
+        summary = summarize(samples)
+        summary['queries'] = first['queries']
+        summary['status'] = response.status_code
+        return summary
@@ -0,0 +1,33 @@
+# core/management/commands/compact_notifications.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from core import notifications
+
+
+class Command(BaseCommand):
+    help = ('Delete read notifications and broadcasts older than their type\'s retention '
+            '(NOTIFICATION_RETENTION_DAYS), in batches')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Count expired notifications without deleting')
+
+    def handle(self, *args, **options):
+        retention = notifications.retention()
+        if options['dry_run']:
+            for notification_type, days in retention.items():
+                count = sum(notifications.expired(model, notification_type, days).count()
+                            for model in notifications.COMPACTED)
+                self.stdout.write(f'{notification_type:<12} older than {days} days: {count}')
+            return
+
+        started = time.perf_counter()
+        deleted = notifications.compact(batch_size=options['batch_size'])
+        for notification_type, count in deleted.items():
+            self.stdout.write(f'{notification_type:<12} older than {retention[notification_type]} days: {count} deleted')
+        self.stdout.write(self.style.SUCCESS(
+            f'Compacted {sum(deleted.values())} notifications in {time.perf_counter() - started:.1f}s'
+        ))
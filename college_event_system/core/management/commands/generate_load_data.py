@@ -0,0 +1,263 @@
+# core/management/commands/generate_load_data.py
+import random
+import time
+from datetime import datetime, time as dt_time, timedelta
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from core import counters
+from core.models import User, Event, EventRegistration, AttendanceRecord, explicit_timestamps
+
+LOAD_PREFIX = 'load'
+# '-' never appears in the model default ids, so --clear cannot match real rows
+LOAD_EVENT_PREFIX = 'EV-L'
+DEPARTMENTS = [
+    'Computer Science', 'Electrical Engineering', 'Mechanical Engineering',
+    'Civil Engineering', 'Business Administration',
+]
+VENUES = [
+    'Main Auditorium', 'College Ground', 'Open Air Theater',
+    'Sports Complex', 'Computer Lab A-101', 'Seminar Hall B',
+]
+BASE36 = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+
+
+def _base36(number, width):
+    digits = []
+    while number:
+        number, rem = divmod(number, 36)
+        digits.append(BASE36[rem])
+    return ''.join(reversed(digits)).rjust(width, '0')
+
+
+def load_id(prefix, index):
+    """Deterministic id that cannot collide with the random model defaults"""
+    return f"{prefix}-L{_base36(index, 7)}"
+
+
+class Command(BaseCommand):
+    help = 'Generate a large, deterministic dataset for benchmarking'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=1000)
+        parser.add_argument('--events', type=int, default=100)
+        parser.add_argument('--registrations-per-student', type=int, default=5)
+        parser.add_argument('--attendance-ratio', type=float, default=0.7,
+                            help='Share of registrations for past/ongoing events that were attended')
+        parser.add_argument('--organizers', type=int, default=None,
+                            help='Defaults to one organizer per 50 events')
+        parser.add_argument('--days', type=int, default=60,
+                            help='Events are spread over this many days either side of today')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--password', default='student123')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--clear', action='store_true',
+                            help='Delete previously generated load data first')
+
+    def handle(self, *args, **options):
+        students = options['students']
+        events = options['events']
+        per_student = options['registrations_per_student']
+        ratio = options['attendance_ratio']
+
+        if students < 1 or events < 1:
+            raise CommandError('--students and --events must be positive')
+        if not 0 <= ratio <= 1:
+            raise CommandError('--attendance-ratio must be between 0 and 1')
+        if per_student > events:
+            raise CommandError('--registrations-per-student cannot exceed --events')
+
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        started = time.perf_counter()
+
+        if options['clear']:
+            self.clear()
+        elif User.objects.filter(username__startswith=f'{LOAD_PREFIX}_').exists():
+            raise CommandError('Load data already exists, re-run with --clear')
+
+        # One hash for every generated account instead of one PBKDF2 run per row
+        password = make_password(options['password'])
+        organizers = options['organizers'] or max(1, events // 50)
+
+        with transaction.atomic():
+            organizer_ids = self.create_users('organizer', organizers, password)
+            student_ids = self.create_users('student', students, password)
+            assignments = self.assign_registrations(len(student_ids), events, per_student)
+            event_rows = self.create_events(events, organizer_ids, assignments, options['days'])
+            registrations, attendance = self.create_registrations(
+                student_ids, event_rows, assignments, ratio
+            )
+        # bulk_create skips the signals that keep the counters in step
+        counters.reconcile()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {students} students, {organizers} organizers, {events} events, '
+            f'{registrations} registrations and {attendance} attendance records '
+            f'in {elapsed:.1f}s'
+        ))
+
+    def clear(self):
+        with counters.suspended(), transaction.atomic():
+            AttendanceRecord.objects.filter(event__event_id__startswith=LOAD_EVENT_PREFIX).delete()
+            EventRegistration.objects.filter(event__event_id__startswith=LOAD_EVENT_PREFIX).delete()
+            Event.objects.filter(event_id__startswith=LOAD_EVENT_PREFIX).delete()
+            User.objects.filter(username__startswith=f'{LOAD_PREFIX}_').delete()
+        counters.reconcile()
+        self.stdout.write('Cleared previous load data')
+
+    def create_users(self, role, count, password):
+        joined = timezone.now() - timedelta(days=365)
+        users = []
+        for i in range(count):
+            users.append(User(
+                username=f'{LOAD_PREFIX}_{role}{i}',
+                email=f'{LOAD_PREFIX}_{role}{i}@college.edu',
+                first_name=role.title(),
+                last_name=str(i),
+                role=role,
+                student_id=f'LOAD{i:07d}' if role == 'student' else None,
+                department=self.rng.choice(DEPARTMENTS),
+                password=password,
+                date_joined=joined,
+            ))
+        User.objects.bulk_create(users, batch_size=self.batch_size)
+        return list(
+            User.objects.filter(username__startswith=f'{LOAD_PREFIX}_{role}', role=role)
+            .order_by('id').values_list('id', flat=True)
+        )
+
+    def assign_registrations(self, students, events, per_student):
+        """Pick the events each student registers for, skewed towards popular events"""
+        cum_weights = list(accumulate(1.0 / (rank + 1) ** 0.5 for rank in range(events)))
+        population = list(range(events))
+        assignments = []
+        for _ in range(students):
+            chosen = set()
+            while len(chosen) < per_student:
+                chosen.update(self.rng.choices(population, cum_weights=cum_weights, k=per_student - len(chosen)))
+            assignments.append(sorted(chosen))
+        return assignments
+
+    def create_events(self, count, organizer_ids, assignments, days):
+        participants = [0] * count
+        for chosen in assignments:
+            for index in chosen:
+                participants[index] += 1
+
+        now = timezone.localtime()
+        today = now.date()
+        categories = [choice for choice, _ in Event.CATEGORY_CHOICES]
+        created_field = Event._meta.get_field('created_at')
+
+        events = []
+        for i in range(count):
+            offset = self.rng.randint(-days, days)
+            # Keep a handful of events live right now so attendance paths have work to do
+            if i % 25 == 0:
+                offset = 0
+                start = dt_time(max(now.hour - 1, 0), 0)
+                end = dt_time(23, 59)
+                status = 'ongoing'
+            else:
+                hour = self.rng.randint(8, 18)
+                start = dt_time(hour, 0)
+                end = dt_time(min(hour + self.rng.randint(1, 4), 23), 0)
+                status = 'completed' if offset < 0 else 'upcoming'
+            date = today + timedelta(days=offset)
+            events.append(Event(
+                event_id=load_id('EV', i),
+                title=f'Load Event {i}',
+                description=f'Generated event {i} for benchmarking.',
+                category=self.rng.choice(categories),
+                venue=self.rng.choice(VENUES),
+                date=date,
+                start_time=start,
+                end_time=end,
+                organizer_id=organizer_ids[i % len(organizer_ids)],
+                max_participants=max(participants[i], 50) + self.rng.randint(0, 50),
+                current_participants=participants[i],
+                status=status,
+                created_at=timezone.make_aware(datetime.combine(date, start)) - timedelta(days=30),
+            ))
+
+        with explicit_timestamps(created_field):
+            Event.objects.bulk_create(events, batch_size=self.batch_size)
+
+        rows = Event.objects.filter(event_id__startswith=LOAD_EVENT_PREFIX).order_by('event_id')
+        by_code = {event.event_id: event for event in rows.only(
+            'id', 'event_id', 'date', 'start_time', 'status'
+        )}
+        return [by_code[load_id('EV', i)] for i in range(count)]
+
+    def create_registrations(self, student_ids, event_rows, assignments, ratio):
+        registered_field = EventRegistration._meta.get_field('registration_date')
+        marked_field = AttendanceRecord._meta.get_field('marked_at')
+        today = timezone.localdate()
+
+        # (pk, start datetime, can have attendance) resolved once per event, not per row
+        schedule = [
+            (
+                event.pk,
+                timezone.make_aware(datetime.combine(event.date, event.start_time)),
+                event.date < today or event.status == 'ongoing',
+            )
+            for event in event_rows
+        ]
+
+        registration_count = 0
+        attendance_count = 0
+        pending = []
+        with explicit_timestamps(registered_field, marked_field):
+            for student_index, chosen in enumerate(assignments):
+                student_id = student_ids[student_index]
+                for event_index in chosen:
+                    event_pk, starts, attendable = schedule[event_index]
+                    marked_at = None
+                    if attendable and self.rng.random() < ratio:
+                        marked_at = starts + timedelta(minutes=self.rng.randint(-10, 40))
+                    registration = EventRegistration(
+                        registration_id=load_id('REG', registration_count),
+                        event_id=event_pk,
+                        student_id=student_id,
+                        registration_date=starts - timedelta(days=self.rng.randint(1, 20)),
+                        attended=marked_at is not None,
+                        attendance_time=marked_at,
+                    )
+                    registration_count += 1
+                    pending.append((registration, marked_at))
+
+                if len(pending) >= self.batch_size:
+                    attendance_count += self.flush(pending)
+                    pending = []
+
+            if pending:
+                attendance_count += self.flush(pending)
+
+        return registration_count, attendance_count
+
+    def flush(self, pending):
+        EventRegistration.objects.bulk_create(
+            [registration for registration, _ in pending], batch_size=self.batch_size
+        )
+        records = []
+        for registration, marked_at in pending:
+            if marked_at is None:
+                continue
+            records.append(AttendanceRecord(
+                attendance_id=load_id('ATT', registration.pk),
+                event_id=registration.event_id,
+                student_id=registration.student_id,
+                registration_id=registration.pk,
+                method='qr' if self.rng.random() < 0.85 else 'manual',
+                marked_at=marked_at,
+                device_info='Load generator',
+                verified=True,
+            ))
+        AttendanceRecord.objects.bulk_create(records, batch_size=self.batch_size)
+        return len(records)
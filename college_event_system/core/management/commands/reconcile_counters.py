@@ -0,0 +1,27 @@
+# core/management/commands/reconcile_counters.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from core import counters
+
+
+class Command(BaseCommand):
+    help = ('Recount the denormalized registration and attendance counters on events and '
+            'students, and repair any that drifted')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Report drifted rows without writing')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        drift = counters.reconcile(apply=not options['dry_run'], batch_size=options['batch_size'])
+        elapsed = time.perf_counter() - started
+        verb = 'drifted' if options['dry_run'] else 'repaired'
+        message = f"{drift['events']} events and {drift['users']} users {verb} in {elapsed:.2f}s"
+        if drift['events'] or drift['users']:
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS(message))
@@ -0,0 +1,39 @@
+# core/management/commands/rollup_analytics.py
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core.analytics import REROLL_WINDOW, rollup_pageviews
+from core.models import AnalyticsEvent
+
+
+class Command(BaseCommand):
+    help = 'Roll raw page views up into hourly counts per page'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help='ISO datetime to recount from (default: a window before the last rolled up hour)')
+        parser.add_argument('--full', action='store_true', help='Recount every stored page view')
+        parser.add_argument('--prune-days', type=int,
+                            help='Afterwards delete raw analytics events older than this many days')
+
+    def handle(self, *args, **options):
+        if options['prune_days'] is not None and timedelta(days=options['prune_days']) <= REROLL_WINDOW:
+            # Recounting hours whose raw rows are gone would lower their totals
+            raise CommandError(f'--prune-days must be at least {REROLL_WINDOW.days + 1}, the rollup recounts {REROLL_WINDOW}')
+        since = None
+        if options['since']:
+            since = parse_datetime(options['since'])
+            if since is None:
+                raise CommandError('--since must be an ISO datetime')
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+
+        rows = rollup_pageviews(since, full=options['full'])
+        self.stdout.write(self.style.SUCCESS(f'Updated {rows} hourly page view rows'))
+
+        if options['prune_days'] is not None:
+            cutoff = timezone.now() - timedelta(days=options['prune_days'])
+            deleted, _ = AnalyticsEvent.objects.filter(occurred_at__lt=cutoff).delete()
+            self.stdout.write(f'Pruned {deleted} raw analytics events older than {cutoff:%Y-%m-%d}')
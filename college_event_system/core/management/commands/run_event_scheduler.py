@@ -0,0 +1,51 @@
+# core/management/commands/run_event_scheduler.py
+import logging
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from core import lifecycle, reminders
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = ('Move events between upcoming, ongoing and completed at their start and end times, '
+            'and send the reminders that are due')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float,
+                            default=getattr(settings, 'EVENT_SCHEDULER_INTERVAL', 30),
+                            help='Seconds between passes')
+        parser.add_argument('--once', action='store_true',
+                            help='Run a single pass and exit (for cron)')
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.monotonic()
+            if options['once']:
+                self.tick(options['verbosity'])
+                return
+            try:
+                self.tick(options['verbosity'])
+            except Exception:
+                # A locked database or a bad row must not stop transitions and reminders for good
+                logger.exception('Event scheduler pass failed, retrying next interval')
+            close_old_connections()
+            time.sleep(max(options['interval'] - (time.monotonic() - started), 0))
+
+    def tick(self, verbosity):
+        result = lifecycle.advance()
+        live = lifecycle.live_event_ids()
+        stamp = timezone.localtime().strftime('%H:%M:%S')
+        for event in result['started']:
+            self.stdout.write(f'{stamp} started   {event.event_id} "{event.title}"')
+        if result['completed']:
+            self.stdout.write(f"{stamp} completed {result['completed']} event(s)")
+        for event in reminders.dispatch():
+            self.stdout.write(f'{stamp} reminded  {event.event_id} "{event.title}"')
+        if verbosity > 1:
+            self.stdout.write(f'{stamp} live      {len(live)} event(s)')
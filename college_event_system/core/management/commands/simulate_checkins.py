@@ -0,0 +1,276 @@
+# core/management/commands/simulate_checkins.py
+import http.cookiejar
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, close_old_connections
+from django.db.models import Count, Max, Q
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from core.benchmarks import summarize
+from core.models import Event, EventRegistration, AttendanceRecord, Notification
+
+XHR = {'X-Requested-With': 'XMLHttpRequest'}
+
+
+class LiveSession:
+    """Minimal cookie-aware client for driving a running server"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+        self.cookies = http.cookiejar.CookieJar()
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(self.cookies))
+
+    def csrf_token(self):
+        for cookie in self.cookies:
+            if cookie.name == 'csrftoken':
+                return cookie.value
+        return ''
+
+    def login(self, username, password):
+        self.opener.open(f'{self.base_url}{reverse("login")}?role=student').read()
+        body = urllib.parse.urlencode({
+            'username': username,
+            'password': password,
+            'role': 'student',
+            'csrfmiddlewaretoken': self.csrf_token(),
+        }).encode()
+        request = urllib.request.Request(
+            f'{self.base_url}{reverse("login")}', data=body,
+            headers={'Referer': self.base_url},
+        )
+        self.opener.open(request).read()
+
+    def post_json(self, path, payload):
+        request = urllib.request.Request(
+            f'{self.base_url}{path}', data=json.dumps(payload).encode(),
+            headers={
+                **XHR,
+                'Content-Type': 'application/json',
+                'X-CSRFToken': self.csrf_token(),
+                'Referer': self.base_url,
+            },
+        )
+        try:
+            with self.opener.open(request) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as exc:
+            return exc.code, exc.read()
+
+
+class InProcessSession:
+    """Test client bound to one student, closing connections like a real worker would"""
+
+    def __init__(self, user):
+        self.client = Client()
+        self.client.force_login(user)
+
+    def post_json(self, path, payload):
+        try:
+            response = self.client.post(path, data=json.dumps(payload),
+                                        content_type='application/json', headers=XHR)
+            return response.status_code, response.content
+        finally:
+            close_old_connections()
+
+
+class Command(BaseCommand):
+    help = 'Simulate a burst of students checking in to a live event'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--event', help='event_id to check in to (defaults to the busiest live event)')
+        parser.add_argument('--students', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument('--window', type=float, default=300,
+                            help='Length of the simulated check-in window in seconds')
+        parser.add_argument('--speedup', type=float, default=10,
+                            help='Compress the window by this factor (1 = real time)')
+        parser.add_argument('--arrival', choices=['peak', 'uniform', 'burst'], default='peak',
+                            help='peak: most students just before start, uniform: evenly spread, '
+                                 'burst: everyone at once')
+        parser.add_argument('--manual-ratio', type=float, default=0.2,
+                            help='Share of students using quick manual entry instead of QR')
+        parser.add_argument('--retry-ratio', type=float, default=0.1,
+                            help='Share of students who scan twice (impatient double taps)')
+        parser.add_argument('--url', help='Drive a running server instead of the in-process app')
+        parser.add_argument('--password', default='student123',
+                            help='Student password for --url mode')
+        parser.add_argument('--seed', type=int, default=7)
+        parser.add_argument('--keep', action='store_true',
+                            help='Keep the attendance written by the run instead of resetting it')
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        event = self.pick_event(options['event'])
+        registrations = list(
+            EventRegistration.objects.filter(event=event, attended=False)
+            .select_related('student').order_by('id')[:options['students']]
+        )
+        if not registrations:
+            raise CommandError(f'No unattended registrations for {event.event_id}')
+
+        self.stdout.write(
+            f'Preparing {len(registrations)} students for "{event.title}" ({event.event_id})'
+        )
+        started_at = timezone.now()
+        # Notifications above this pk may be the run's, reset() narrows them down
+        last_notification = Notification.objects.aggregate(last=Max('pk'))['last'] or 0
+        plan = self.plan(registrations, options)
+        sessions = self.sessions(registrations, options)
+
+        results = []
+        results_lock = threading.Lock()
+        scale = max(options['speedup'], 0.001)
+        clock = time.perf_counter()
+
+        def checkin(step):
+            offset, registration, endpoint = step
+            delay = offset / scale - (time.perf_counter() - clock)
+            if delay > 0:
+                time.sleep(delay)
+            outcome = self.attempt(sessions[registration.pk], endpoint, event)
+            with results_lock:
+                results.append(outcome)
+
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            list(pool.map(checkin, plan))
+        elapsed = time.perf_counter() - clock
+
+        self.report(event, results, elapsed, started_at)
+        if not options['keep']:
+            self.reset(event, registrations, started_at, last_notification)
+
+    def pick_event(self, event_id):
+        if event_id:
+            try:
+                return Event.objects.get(event_id=event_id)
+            except Event.DoesNotExist:
+                raise CommandError(f'Event {event_id} not found')
+
+        now = timezone.localtime()
+        event = Event.objects.filter(
+            status='ongoing',
+            date=now.date(),
+            start_time__lte=now.time(),
+            end_time__gte=now.time(),
+        ).annotate(pending=Count('registrations')).order_by('-pending').first()
+        if event is None:
+            raise CommandError('No live event found, pass --event or run generate_load_data')
+        return event
+
+    def plan(self, registrations, options):
+        """(arrival offset in seconds, registration, endpoint) for every request"""
+        window = options['window']
+        steps = []
+        for registration in registrations:
+            if options['arrival'] == 'uniform':
+                offset = self.rng.uniform(0, window)
+            elif options['arrival'] == 'burst':
+                offset = 0.0
+            else:
+                # Crowd forms just before the doors open and tails off afterwards
+                offset = self.rng.triangular(0, window, window * 0.2)
+            endpoint = (
+                'quick_manual_attendance'
+                if self.rng.random() < options['manual_ratio'] else 'mark_qr_attendance'
+            )
+            steps.append((offset, registration, endpoint))
+            if self.rng.random() < options['retry_ratio']:
+                steps.append((offset + self.rng.uniform(0.05, 1.5), registration, endpoint))
+        steps.sort(key=lambda step: step[0])
+        return steps
+
+    def sessions(self, registrations, options):
+        sessions = {}
+        for registration in registrations:
+            if options['url']:
+                session = LiveSession(options['url'])
+                session.login(registration.student.username, options['password'])
+            else:
+                session = InProcessSession(registration.student)
+            sessions[registration.pk] = session
+        return sessions
+
+    def attempt(self, session, endpoint, event):
+        if endpoint == 'quick_manual_attendance':
+            payload = {'event_code': event.event_id}
+        else:
+            payload = {'qr_data': event.event_id}
+
+        started = time.perf_counter()
+        try:
+            status, body = session.post_json(reverse(endpoint), payload)
+            message = ''
+            try:
+                data = json.loads(body)
+                success = bool(data.get('success'))
+                message = data.get('message', '')
+            except ValueError:
+                success = False
+                message = f'HTTP {status}'
+        except OperationalError as exc:
+            success, message = False, str(exc)
+        except Exception as exc:
+            success, message = False, f'{type(exc).__name__}: {exc}'
+        return {
+            'endpoint': endpoint,
+            'elapsed': (time.perf_counter() - started) * 1000,
+            'success': success,
+            'message': message,
+        }
+
+    def report(self, event, results, elapsed, started_at):
+        latency = summarize([r['elapsed'] for r in results])
+        successes = sum(1 for r in results if r['success'])
+        lock_errors = sum(1 for r in results if 'locked' in r['message'].lower())
+        failures = Counter(r['message'] for r in results if not r['success'])
+        duplicates = (
+            AttendanceRecord.objects.filter(event=event, marked_at__gte=started_at)
+            .values('student').annotate(n=Count('id')).filter(n__gt=1).count()
+        )
+
+        self.stdout.write('')
+        self.stdout.write(f'Requests:        {len(results)} in {elapsed:.2f}s '
+                          f'({len(results) / elapsed if elapsed else 0:.1f} req/s)')
+        self.stdout.write(f'Check-ins:       {successes} ({successes / elapsed if elapsed else 0:.1f}/s)')
+        self.stdout.write(f"Latency:         p50={latency['p50_ms']:.1f}ms "
+                          f"p99={latency['p99_ms']:.1f}ms max={latency['max_ms']:.1f}ms")
+        self.stdout.write(f'Lock errors:     {lock_errors}')
+        self.stdout.write(f'Duplicate rows:  {duplicates}')
+        for message, count in failures.most_common(5):
+            self.stdout.write(f'  {count:>5} x {message[:100]}')
+
+        if lock_errors or duplicates:
+            self.stdout.write(self.style.WARNING('Check-in storm produced errors'))
+        else:
+            self.stdout.write(self.style.SUCCESS('Check-in storm completed cleanly'))
+
+    def reset(self, event, registrations, started_at, last_notification):
+        """Undo the run so it can be repeated against the same dataset"""
+        students = [registration.student_id for registration in registrations]
+        AttendanceRecord.objects.filter(
+            event=event, student_id__in=students, marked_at__gte=started_at
+        ).delete()
+        # Only what the check-in views sent for the simulated students, other
+        # notifications about the event written meanwhile stay
+        organizer_messages = [
+            f'{registration.student.get_full_name()} marked attendance for "{event.title}"'
+            for registration in registrations
+        ]
+        Notification.objects.filter(pk__gt=last_notification, related_event=event).filter(
+            Q(user_id__in=students, notification_type='attendance', title='Attendance Marked')
+            | Q(user_id=event.organizer_id, title='Attendance Recorded', message__in=organizer_messages)
+        ).delete()
+        EventRegistration.objects.filter(pk__in=[r.pk for r in registrations]).update(
+            attended=False, attendance_time=None
+        )
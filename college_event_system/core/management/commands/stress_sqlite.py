@@ -0,0 +1,128 @@
+# core/management/commands/stress_sqlite.py
+import copy
+import os
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connections, transaction
+
+from core.benchmarks import summarize
+
+ALIAS = 'stress_sqlite'
+PRAGMAS = ('journal_mode', 'synchronous', 'busy_timeout', 'mmap_size', 'cache_size')
+
+
+class Command(BaseCommand):
+    help = ('Drive concurrent check-in style write transactions at a scratch copy of the '
+            'SQLite profile and fail on any "database is locked" error')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=16)
+        parser.add_argument('--rate', type=float, default=200,
+                            help='Target write transactions per second across all threads')
+        parser.add_argument('--duration', type=float, default=10)
+        parser.add_argument('--stock', action='store_true',
+                            help='Ignore DATABASES OPTIONS to see how plain Django behaves')
+
+    def handle(self, *args, **options):
+        default = connections['default'].settings_dict
+        if default['ENGINE'] != 'django.db.backends.sqlite3':
+            raise CommandError('The default database is not SQLite')
+
+        with tempfile.TemporaryDirectory() as scratch:
+            settings_dict = copy.deepcopy(default)
+            settings_dict['NAME'] = os.path.join(scratch, 'stress.sqlite3')
+            if options['stock']:
+                settings_dict['OPTIONS'] = {}
+            connections.settings[ALIAS] = settings_dict
+            try:
+                total = max(int(options['rate'] * options['duration']), 1)
+                self.prepare(total)
+                self.stdout.write('Profile: ' + ', '.join(
+                    f'{name}={value}' for name, value in self.pragmas().items()
+                ) + f", transaction_mode={settings_dict['OPTIONS'].get('transaction_mode') or 'DEFERRED'}")
+                result = self.run(total, options)
+            finally:
+                connections[ALIAS].close()
+                del connections.settings[ALIAS]
+
+        latency = summarize(result['latencies'])
+        elapsed = result['elapsed']
+        self.stdout.write(f"Writes:       {len(result['latencies'])} of {total} in {elapsed:.2f}s "
+                          f"({len(result['latencies']) / elapsed if elapsed else 0:.1f}/s, "
+                          f"target {options['rate']:.0f}/s)")
+        self.stdout.write(f"Latency:      p50={latency['p50_ms']:.1f}ms p99={latency['p99_ms']:.1f}ms "
+                          f"max={latency['max_ms']:.1f}ms")
+        self.stdout.write(f"Lock errors:  {result['locked']}")
+        if result['locked']:
+            raise CommandError(f"{result['locked']} write(s) failed with database is locked")
+        self.stdout.write(self.style.SUCCESS('No lock errors'))
+
+    def prepare(self, total):
+        with connections[ALIAS].cursor() as cursor:
+            cursor.execute(
+                'CREATE TABLE registration '
+                '(id INTEGER PRIMARY KEY, attended INTEGER NOT NULL DEFAULT 0, attendance_time REAL)'
+            )
+            cursor.execute(
+                'CREATE TABLE attendance '
+                '(id INTEGER PRIMARY KEY AUTOINCREMENT, registration_id INTEGER UNIQUE, marked_at REAL)'
+            )
+            cursor.executemany('INSERT INTO registration (id) VALUES (%s)', [(pk,) for pk in range(total)])
+
+    def pragmas(self):
+        with connections[ALIAS].cursor() as cursor:
+            values = {}
+            for name in PRAGMAS:
+                cursor.execute(f'PRAGMA {name}')
+                values[name] = cursor.fetchone()[0]
+            return values
+
+    def checkin(self, registration_pk):
+        """Same shape as a QR check-in: duplicate check, insert, registration update"""
+        with transaction.atomic(using=ALIAS):
+            with connections[ALIAS].cursor() as cursor:
+                cursor.execute('SELECT 1 FROM attendance WHERE registration_id = %s', [registration_pk])
+                if cursor.fetchone():
+                    return
+                now = time.time()
+                cursor.execute('INSERT INTO attendance (registration_id, marked_at) VALUES (%s, %s)',
+                               [registration_pk, now])
+                cursor.execute('UPDATE registration SET attended = 1, attendance_time = %s WHERE id = %s',
+                               [now, registration_pk])
+
+    def run(self, total, options):
+        threads = max(options['threads'], 1)
+        interval = 1 / options['rate']
+        latencies, locked = [], [0]
+        lock = threading.Lock()
+        clock = time.perf_counter()
+
+        def worker(offset):
+            try:
+                for pk in range(offset, total, threads):
+                    delay = clock + pk * interval - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                    started = time.perf_counter()
+                    try:
+                        self.checkin(pk)
+                    except OperationalError as exc:
+                        if 'locked' not in str(exc):
+                            raise
+                        with lock:
+                            locked[0] += 1
+                        continue
+                    with lock:
+                        latencies.append((time.perf_counter() - started) * 1000)
+            finally:
+                connections[ALIAS].close()
+
+        pool = [threading.Thread(target=worker, args=(offset,)) for offset in range(threads)]
+        for thread in pool:
+            thread.start()
+        for thread in pool:
+            thread.join()
+        return {'latencies': latencies, 'locked': locked[0], 'elapsed': time.perf_counter() - clock}
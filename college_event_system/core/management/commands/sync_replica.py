@@ -0,0 +1,60 @@
+# core/management/commands/sync_replica.py
+import os
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connections
+from django.utils import timezone
+
+from core.routers import REPLICA, replica_configured
+
+
+class Command(BaseCommand):
+    help = 'Refresh the SQLite read replica from the primary with the online backup API'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float,
+                            default=getattr(settings, 'REPLICA_SYNC_INTERVAL', 15),
+                            help='Seconds between copies')
+        parser.add_argument('--once', action='store_true',
+                            help='Copy once and exit (for cron)')
+
+    def handle(self, *args, **options):
+        if not replica_configured():
+            raise CommandError('No replica configured, set DATABASE_REPLICA')
+        if connections['default'].vendor != 'sqlite' or connections[REPLICA].vendor != 'sqlite':
+            raise CommandError('Only SQLite replicas are copied here, other databases replicate themselves')
+
+        while True:
+            started = time.monotonic()
+            self.sync(options['verbosity'] > 1 or options['once'])
+            if options['once']:
+                return
+            close_old_connections()
+            time.sleep(max(options['interval'] - (time.monotonic() - started), 0))
+
+    def sync(self, report):
+        target = connections[REPLICA].settings_dict['NAME']
+        partial = f'{target}.partial'
+        started = time.time()
+
+        connections['default'].ensure_connection()
+        copy = sqlite3.connect(partial)
+        try:
+            # One step, so the copy is a single consistent read of the primary
+            connections['default'].connection.backup(copy)
+            # Readers open the replica query_only, it needs no WAL files beside it
+            copy.execute('PRAGMA journal_mode=DELETE')
+        finally:
+            copy.close()
+        # The replica holds the primary as of the start of the copy, routers read its age from mtime
+        os.utime(partial, (started, started))
+        os.replace(partial, target)
+        connections[REPLICA].close()
+
+        if report:
+            size = os.path.getsize(target) / (1024 * 1024)
+            stamp = timezone.localtime().strftime('%H:%M:%S')
+            self.stdout.write(f'{stamp} replica refreshed ({size:.1f} MB) in {time.time() - started:.2f}s')
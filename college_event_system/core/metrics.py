@@ -0,0 +1,311 @@
+# core/metrics.py
+"""
+Small Prometheus-compatible metrics registry.
+
+Each process keeps its own values in memory behind a short lock. When
+METRICS_MULTIPROC_DIR is set (gunicorn with several workers) a daemon
+thread writes the process' values to <dir>/metrics_<pid>.json about once
+per METRICS_FLUSH_INTERVAL, and a scrape merges every worker's file:
+counters and histograms are summed over all files, gauges over the files
+of live processes. Wipe the directory when the whole service restarts.
+"""
+import atexit
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float('inf'))
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(key, str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n'))
+        for key, value in labels
+    )
+    return '{' + pairs + '}'
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, registry, name, documentation, labelnames=()):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f'{self.name} expects labels {self.labelnames}, got {tuple(labels)}')
+        return tuple((name, str(labels[name])) for name in self.labelnames)
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        self.registry._add(self.name, self._key(labels), amount)
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def __init__(self, registry, name, documentation, labelnames=(), function=None):
+        super().__init__(registry, name, documentation, labelnames)
+        self.function = function
+
+    def set(self, value, **labels):
+        self.registry._set(self.name, self._key(labels), value)
+
+    def inc(self, amount=1, **labels):
+        self.registry._add(self.name, self._key(labels), amount)
+
+    def dec(self, amount=1, **labels):
+        self.registry._add(self.name, self._key(labels), -amount)
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, registry, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(registry, name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        self.registry._observe(self.name, self._key(labels), self.buckets, value)
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._values = {}
+        self._lock = threading.Lock()
+        self._flusher_pid = None
+
+    # ---- declaration ----
+    def _register(self, metric):
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(self, name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=(), function=None):
+        return self._register(Gauge(self, name, documentation, labelnames, function))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(self, name, documentation, labelnames, buckets))
+
+    # ---- updates ----
+    def _add(self, name, key, amount):
+        with self._lock:
+            self._values[(name, key)] = self._values.get((name, key), 0) + amount
+        self._ensure_flusher()
+
+    def _set(self, name, key, value):
+        with self._lock:
+            self._values[(name, key)] = value
+        self._ensure_flusher()
+
+    def _observe(self, name, key, buckets, value):
+        index = bisect.bisect_left(buckets, value)
+        with self._lock:
+            state = self._values.get((name, key))
+            if state is None:
+                state = self._values[(name, key)] = [0] * len(buckets) + [0.0, 0]
+            state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+        self._ensure_flusher()
+
+    # ---- multiprocess mode ----
+    @property
+    def multiproc_dir(self):
+        return getattr(settings, 'METRICS_MULTIPROC_DIR', None)
+
+    def _ensure_flusher(self):
+        pid = os.getpid()
+        if self._flusher_pid == pid or not self.multiproc_dir:
+            return
+        with self._lock:
+            if self._flusher_pid == pid:
+                return
+            self._flusher_pid = pid
+        interval = getattr(settings, 'METRICS_FLUSH_INTERVAL', 1.0)
+
+        def run():
+            while True:
+                time.sleep(interval)
+                self.flush()
+
+        threading.Thread(target=run, name='metrics-flush', daemon=True).start()
+        atexit.register(self.flush)
+
+    def _dump(self):
+        with self._lock:
+            return [
+                [name, [list(pair) for pair in key], value if not isinstance(value, list) else list(value)]
+                for (name, key), value in self._values.items()
+            ]
+
+    def flush(self):
+        directory = self.multiproc_dir
+        if not directory:
+            return
+        Path(directory).mkdir(parents=True, exist_ok=True)
+        path = Path(directory) / f'metrics_{os.getpid()}.json'
+        tmp = path.with_suffix('.tmp')
+        tmp.write_text(json.dumps({'pid': os.getpid(), 'samples': self._dump()}))
+        os.replace(tmp, path)
+
+    @staticmethod
+    def _alive(pid):
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+    def _collect(self):
+        """Merged {(name, key): value} across this process and, in multiprocess mode, all workers"""
+        if not self.multiproc_dir:
+            with self._lock:
+                return {
+                    item: (list(value) if isinstance(value, list) else value)
+                    for item, value in self._values.items()
+                }
+
+        self.flush()
+        merged = {}
+        for path in Path(self.multiproc_dir).glob('metrics_*.json'):
+            try:
+                payload = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            alive = self._alive(payload['pid'])
+            for name, key, value in payload['samples']:
+                metric = self._metrics.get(name)
+                if metric is None or (metric.kind == 'gauge' and not alive):
+                    continue
+                item = (name, tuple(tuple(pair) for pair in key))
+                if isinstance(value, list):
+                    current = merged.setdefault(item, [0] * len(value))
+                    merged[item] = [a + b for a, b in zip(current, value)]
+                else:
+                    merged[item] = merged.get(item, 0) + value
+        return merged
+
+    # ---- exposition ----
+    def samples(self, metric):
+        """{label key: value} for one metric, merged like a scrape"""
+        return {key: value for (name, key), value in self._collect().items() if name == metric.name}
+
+    def render(self):
+        values = self._collect()
+        by_metric = {}
+        for (name, key), value in values.items():
+            by_metric.setdefault(name, []).append((key, value))
+
+        lines = []
+        for name, metric in sorted(self._metrics.items()):
+            samples = by_metric.get(name, [])
+            if metric.kind == 'gauge' and metric.function is not None:
+                try:
+                    samples = [(key, value) for key, value in metric.function()]
+                except Exception:
+                    samples = []
+            lines.append(f'# HELP {name} {metric.documentation}')
+            lines.append(f'# TYPE {name} {metric.kind}')
+            for key, value in sorted(samples):
+                if metric.kind == 'histogram':
+                    cumulative = 0
+                    for bound, count in zip(metric.buckets, value[:len(metric.buckets)]):
+                        cumulative += count
+                        bucket_labels = key + (('le', _format_value(bound)),)
+                        lines.append(f'{name}_bucket{_format_labels(bucket_labels)} {cumulative}')
+                    lines.append(f'{name}_sum{_format_labels(key)} {_format_value(value[-2])}')
+                    lines.append(f'{name}_count{_format_labels(key)} {int(value[-1])}')
+                else:
+                    lines.append(f'{name}{_format_labels(key)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+
+def _unread_notifications():
+    from django.db.models import F
+    from .models import Notification
+    # Rows under the owner's read watermark count as read, see core.notifications
+    unread = Notification.objects.filter(is_read=False).exclude(created_at__lte=F('user__notifications_read_at'))
+    return [((), unread.count())]
+
+
+def _pool_stats():
+    from django.db import connections
+    samples = []
+    for alias in connections:
+        # Only the PostgreSQL backend has a pool, when OPTIONS['pool'] is set
+        pool = getattr(connections[alias], 'pool', None)
+        if pool is not None:
+            samples.extend(((alias, stat), value) for stat, value in sorted(pool.get_stats().items()))
+    return samples
+
+
+def _replica_lag():
+    from .routers import replica_lag
+    lag = replica_lag()
+    return [((), lag)] if lag is not None else []
+
+
+checkins = registry.counter(
+    'attendance_checkins_total', 'Attendance records created', ['method'])
+checkin_rejections = registry.counter(
+    'attendance_checkin_rejections_total', 'Attendance attempts refused', ['reason'])
+registrations = registry.counter(
+    'event_registrations_total', 'Event registration attempts by outcome', ['outcome'])
+notifications_created = registry.counter(
+    'notifications_created_total', 'Notifications created', ['type'])
+notification_backlog = registry.gauge(
+    'notifications_unread', 'Unread notifications across all users', function=_unread_notifications)
+analytics_events = registry.counter(
+    'analytics_events_total', 'Analytics events accepted into the buffer', ['kind'])
+analytics_dropped = registry.counter(
+    'analytics_events_dropped_total', 'Analytics events lost to buffer overflow or failed flushes')
+db_connections_opened = registry.counter(
+    'db_connections_opened_total', 'New database connections, low when connections are reused', ['alias'])
+db_pool = registry.gauge(
+    'db_pool', 'psycopg pool statistics per worker process', ['alias', 'stat'], function=_pool_stats)
+replica_lag = registry.gauge(
+    'db_replica_lag_seconds', 'How far the read replica is behind the primary', function=_replica_lag)
+qr_generation = registry.histogram(
+    'qr_generation_seconds', 'Time spent rendering QR codes', ['view'])
@@ -1,115 +1,139 @@
 # core/middleware.py
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
 from django.shortcuts import redirect
 from django.urls import reverse
 from django.contrib import messages
 from django.utils import timezone
+from django.utils.deprecation import MiddlewareMixin
 from datetime import timedelta
+import time
+from whitenoise.middleware import WhiteNoiseMiddleware
 
-class RoleAccessMiddleware:
+from .backends import invalidate_user
+from .permissions import DENIED, UNCHECKED_PREFIXES, role_of, rule_for
+from .routers import PIN_COOKIE, max_lag, replica_configured
+
+
+def is_lightweight(request):
+    rule = getattr(request, 'route_rule', None)
+    if rule is None:
+        match = getattr(request, 'resolver_match', None)
+        rule = rule_for(match.url_name if match else None)
+    return rule.lightweight
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
     """
-    Middleware to enforce role-based access control.
+    WhiteNoise that can sit at the top of an ASGI stack. Stock WhiteNoise
+    is sync only, which would push every request below it onto a thread.
     """
-    
-    def __init__(self, get_response):
-        self.get_response = get_response
-    
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
     def __call__(self, request):
-        response = self.get_response(request)
-        return response
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = self.find_file(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return await self.get_response(request)
+
+
+class RoleAccessMiddleware(MiddlewareMixin):
+    """
+    Middleware to enforce role-based access control from the route
+    permission registry in core.permissions.
+    """
     
     def process_view(self, request, view_func, view_args, view_kwargs):
         # Skip middleware for admin panel and static files
-        if (request.path.startswith('/admin/') or 
-            request.path.startswith('/static/') or 
-            request.path.startswith('/media/')):
+        if request.path.startswith(UNCHECKED_PREFIXES):
             return None
         
-        # Get current URL name
-        try:
-            current_url_name = request.resolver_match.url_name
-        except:
-            current_url_name = None
-        
-        # Define URL patterns
-        ADMIN_URLS = [
-            'admin_dashboard', 'create_event', 'update_event', 'delete_event',
-            'user_list', 'user_detail', 'update_user', 'delete_user',
-            'attendance_list', 'registration_list', 'generate_qr', 'reports',
-            'registration_detail', 'report_detail'
-        ]
-        
-        STUDENT_URLS = [
-            'student_dashboard', 'register_event', 'attendance_history',
-            'mark_qr_attendance'
-        ]
+        rule = rule_for(request.resolver_match.url_name if request.resolver_match else None)
+        request.route_rule = rule
         
-        PUBLIC_URLS = [
-            'home', 'login', 'register', 'logout', 'events', 'event_detail'
-        ]
+        # Public routes, including lightweight ones, never touch the session from here
+        if rule.public:
+            return None
         
-        # Check if user is authenticated
-        if request.user.is_authenticated:
-            user_role = request.user.role
-            
-            # Admin trying to access student-only pages
-            if (user_role == 'admin' or request.user.is_staff) and current_url_name in STUDENT_URLS:
-                # Allow access to some student pages
-                if current_url_name in ['attendance_history']:
-                    return None
-                messages.error(request, 'Admin access not allowed for student pages.')
-                return redirect('admin_dashboard')
-            
-            # Student trying to access admin-only pages
-            elif user_role == 'student' and current_url_name in ADMIN_URLS:
-                messages.error(request, 'Student access not allowed for admin pages.')
-                return redirect('student_dashboard')
-            
-            # Organizer access control
-            elif user_role == 'organizer':
-                if current_url_name in ['user_list', 'user_detail', 'delete_user']:
-                    messages.error(request, 'Organizers cannot manage users.')
-                    return redirect('events')
+        # Unauthenticated user trying to access protected pages
+        if not request.user.is_authenticated:
+            messages.info(request, 'Please login to access this page.')
+            return redirect(f'{reverse("login")}?next={request.path}')
         
-        else:
-            # Unauthenticated user trying to access protected pages
-            if current_url_name not in PUBLIC_URLS:
-                messages.info(request, 'Please login to access this page.')
-                return redirect(f'{reverse("login")}?next={request.path}')
+        role = role_of(request.user)
+        if rule.allows(role):
+            return None
         
-        return None
+        target, message = DENIED.get(role, ('dashboard', 'You do not have access to that page.'))
+        messages.error(request, message)
+        return redirect(target)
 
 
-class UserActivityMiddleware:
+class UserActivityMiddleware(MiddlewareMixin):
     """
     Middleware to track user activity and update last seen.
+    Writes at most once per USER_ACTIVITY_INTERVAL seconds per user and
+    never for lightweight endpoints.
     """
     
     def __init__(self, get_response):
-        self.get_response = get_response
+        super().__init__(get_response)
+        self.interval = timedelta(seconds=getattr(settings, 'USER_ACTIVITY_INTERVAL', 60))
     
-    def __call__(self, request):
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.path.startswith(UNCHECKED_PREFIXES) or is_lightweight(request):
+            return None
+        
         if request.user.is_authenticated:
-            # Update last activity timestamp
-            from .models import User
-            User.objects.filter(id=request.user.id).update(
-                last_login=timezone.now()
-            )
+            now = timezone.now()
+            last_seen = request.user.last_login
+            if last_seen is None or now - last_seen >= self.interval:
+                # Update last activity timestamp
+                from .models import User
+                User.objects.filter(id=request.user.id).update(last_login=now)
+                request.user.last_login = now
+                # update() skips post_save, refresh the cached copy explicitly
+                invalidate_user(request.user.id)
         
-        response = self.get_response(request)
+        return None
+
+
+class ReadYourWritesMiddleware(MiddlewareMixin):
+    """
+    Pin the browser to the primary database for REPLICA_MAX_LAG seconds
+    after a successful write request, see core.routers.
+    """
+    
+    def process_response(self, request, response):
+        if (replica_configured() and request.method not in ('GET', 'HEAD', 'OPTIONS')
+                and response.status_code < 400):
+            seconds = max_lag()
+            response.set_cookie(PIN_COOKIE, str(int(time.time() + seconds)), max_age=seconds,
+                                httponly=True, samesite='Lax')
         return response
 
 
-class SecurityHeadersMiddleware:
+class SecurityHeadersMiddleware(MiddlewareMixin):
     """
     Add security headers to all responses.
     """
     
-    def __init__(self, get_response):
-        self.get_response = get_response
-    
-    def __call__(self, request):
-        response = self.get_response(request)
-        
+    def process_response(self, request, response):
         # Add security headers
         response['X-Content-Type-Options'] = 'nosniff'
         response['X-Frame-Options'] = 'DENY'
@@ -0,0 +1,40 @@
+# Generated by Django 6.0.1 on 2026-10-19 09:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalyticsEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('pageview', 'Page View'), ('event', 'Tracked Event')], max_length=20)),
+                ('name', models.CharField(blank=True, max_length=100)),
+                ('page', models.CharField(blank=True, max_length=300)),
+                ('properties', models.JSONField(blank=True, default=dict)),
+                ('occurred_at', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'occurred_at'], name='core_analyt_kind_6104b7_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='PageViewRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField()),
+                ('page', models.CharField(max_length=300)),
+                ('views', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-hour', '-views'],
+                'unique_together': {('hour', 'page')},
+            },
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 6.0.1 on 2026-10-19 09:00
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def _count(model, field):
+    return Coalesce(Subquery(
+        model.objects.filter(**{field: OuterRef('pk')}).order_by().values(field)
+        .annotate(n=Count('pk')).values('n')
+    ), 0)
+
+
+def fill_counters(apps, schema_editor):
+    Event = apps.get_model('core', 'Event')
+    User = apps.get_model('core', 'User')
+    EventRegistration = apps.get_model('core', 'EventRegistration')
+    AttendanceRecord = apps.get_model('core', 'AttendanceRecord')
+
+    Event.objects.update(
+        current_participants=_count(EventRegistration, 'event'),
+        attended_count=_count(AttendanceRecord, 'event'),
+    )
+    User.objects.update(
+        registered_count=_count(EventRegistration, 'student'),
+        attended_count=_count(AttendanceRecord, 'student'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_analytics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='attended_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='attended_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='registered_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 6.0.1 on 2026-10-19 09:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_attendance_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedAttendanceRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('attendance_id', models.CharField(max_length=20, unique=True)),
+                ('method', models.CharField(choices=[('qr', 'QR Scan'), ('manual', 'Manual Entry'), ('face', 'Face Recognition'), ('nfc', 'NFC/RFID')], default='qr', max_length=20)),
+                ('marked_at', models.DateTimeField()),
+                ('latitude', models.DecimalField(blank=True, decimal_places=6, max_digits=9, null=True)),
+                ('longitude', models.DecimalField(blank=True, decimal_places=6, max_digits=9, null=True)),
+                ('device_info', models.CharField(blank=True, max_length=200)),
+                ('verified', models.BooleanField(default=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_attendance', to='core.event')),
+                ('registration', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_attendance', to='core.eventregistration')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_attendance', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-marked_at'],
+                'indexes': [models.Index(fields=['student', '-marked_at'], name='core_archiv_student_8fc1d7_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedNotification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('notification_id', models.CharField(max_length=20, unique=True)),
+                ('notification_type', models.CharField(choices=[('event', 'Event Update'), ('attendance', 'Attendance'), ('system', 'System'), ('reminder', 'Reminder')], max_length=20)),
+                ('title', models.CharField(max_length=200)),
+                ('message', models.TextField()),
+                ('is_read', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('related_event', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.event')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_notifications', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['user', '-created_at'], name='core_archiv_user_id_0fa6a6_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 6.0.1 on 2026-10-19 09:00
+
+from django.db import migrations, models
+from django.db.models import Count, F, Min
+
+
+def drop_duplicates(apps, schema_editor):
+    """Keep the first record of every (event, student), uncount the rest"""
+    Event = apps.get_model('core', 'Event')
+    User = apps.get_model('core', 'User')
+    AttendanceRecord = apps.get_model('core', 'AttendanceRecord')
+
+    duplicates = (
+        AttendanceRecord.objects.values('event', 'student')
+        .annotate(n=Count('pk'), first=Min('pk')).filter(n__gt=1).order_by()
+    )
+    for row in duplicates:
+        AttendanceRecord.objects.filter(event=row['event'], student=row['student']).exclude(pk=row['first']).delete()
+        Event.objects.filter(pk=row['event']).update(attended_count=F('attended_count') - (row['n'] - 1))
+        User.objects.filter(pk=row['student']).update(attended_count=F('attended_count') - (row['n'] - 1))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_event_reminders'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='attendancerecord',
+            constraint=models.UniqueConstraint(fields=('event', 'student'), name='unique_attendance_per_event'),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 from django.utils import timezone
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 import uuid
 import random
@@ -19,9 +20,24 @@ def generate_attendance_id():
 def generate_notification_id():
     return f"NOT{''.join(random.choices(string.ascii_uppercase + string.digits, k=8))}"
 
+def generate_broadcast_id():
+    return f"BRD{''.join(random.choices(string.ascii_uppercase + string.digits, k=8))}"
+
 def generate_report_id():
     return f"REP{''.join(random.choices(string.ascii_uppercase + string.digits, k=8))}"
 
+@contextmanager
+def explicit_timestamps(*fields):
+    """Let bulk_create keep the timestamps we set instead of auto_now_add"""
+    saved = [(field, field.auto_now_add) for field in fields]
+    for field, _ in saved:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now_add in saved:
+            field.auto_now_add = auto_now_add
+
 # Custom User Model
 class User(AbstractUser):
     ROLE_CHOICES = (
@@ -36,6 +52,11 @@ class User(AbstractUser):
     phone = models.CharField(max_length=15, blank=True)
     profile_picture = models.ImageField(upload_to='profiles/', blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Kept in step by core.counters
+    registered_count = models.IntegerField(default=0)
+    attended_count = models.IntegerField(default=0)
+    # Notifications created up to here count as read (core.notifications)
+    notifications_read_at = models.DateTimeField(blank=True, null=True)
     
     def __str__(self):
         return f"{self.username} ({self.get_role_display()})"
@@ -74,12 +95,17 @@ class Event(models.Model):
     organizer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='organized_events')
     max_participants = models.IntegerField(default=100)
     current_participants = models.IntegerField(default=0)
+    attended_count = models.IntegerField(default=0)  # Kept in step by core.counters
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='upcoming')
     qr_code = models.ImageField(upload_to='qr_codes/', blank=True, null=True)
     qr_secret = models.CharField(max_length=100, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    class Meta:
+        # Scheduler scans: due status changes and reminders (core.lifecycle, core.reminders)
+        indexes = [models.Index(fields=['status', 'date', 'start_time'])]
+    
     def __str__(self):
         return f"{self.title} - {self.date}"
     
@@ -87,6 +113,12 @@ class Event(models.Model):
     def is_full(self):
         return self.current_participants >= self.max_participants
     
+    @property
+    def attendance_rate(self):
+        if not self.current_participants:
+            return 0
+        return round(self.attended_count / self.current_participants * 100, 1)
+    
     @property
     def can_register(self):
         try:
@@ -114,13 +146,8 @@ class Event(models.Model):
     @property
     def is_active_for_attendance(self):
         """Check if event is active for attendance marking"""
-        from django.utils import timezone
-        current_time = timezone.now().time()
-        today = timezone.now().date()
-        
-        return (self.status == 'ongoing' and 
-                self.date == today and
-                self.start_time <= current_time <= self.end_time)
+        from .lifecycle import is_live
+        return is_live(self)
         
         
         
@@ -166,11 +193,20 @@ class AttendanceRecord(models.Model):
     
     class Meta:
         ordering = ['-marked_at']
+        constraints = [
+            models.UniqueConstraint(fields=['event', 'student'], name='unique_attendance_per_event'),
+        ]
     
     def __str__(self):
         return f"{self.student.username} - {self.event.title} - {self.marked_at}"
     
-
+    @property
+    def status(self):
+        """On time if marked within 15 minutes of the event start"""
+        if not self.marked_at or not self.event.start_time:
+            return 'unknown'
+        starts = timezone.make_aware(datetime.combine(self.event.date, self.event.start_time))
+        return 'on_time' if self.marked_at <= starts + timedelta(minutes=15) else 'late'
     
     @property
     def status_color(self):
@@ -224,6 +260,37 @@ class AttendanceRecord(models.Model):
             return True
         return False
 
+# Archived Attendance Model
+class ArchivedAttendanceRecord(models.Model):
+    """Attendance of completed events past the archive horizon, moved by core.archive"""
+    attendance_id = models.CharField(max_length=20, unique=True)
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='archived_attendance')
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_attendance')
+    registration = models.ForeignKey(EventRegistration, on_delete=models.CASCADE, related_name='archived_attendance')
+    method = models.CharField(max_length=20, choices=AttendanceRecord.METHOD_CHOICES, default='qr')
+    marked_at = models.DateTimeField()
+    latitude = models.DecimalField(max_digits=9, decimal_places=6, blank=True, null=True)
+    longitude = models.DecimalField(max_digits=9, decimal_places=6, blank=True, null=True)
+    device_info = models.CharField(max_length=200, blank=True)
+    verified = models.BooleanField(default=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    # Rendered by the same templates as the hot rows
+    status = AttendanceRecord.status
+    status_color = AttendanceRecord.status_color
+    status_icon = AttendanceRecord.status_icon
+    method_icon = AttendanceRecord.method_icon
+    is_verified = AttendanceRecord.is_verified
+    # Read only, templates hide the edit and verification actions
+    is_archived = True
+    
+    class Meta:
+        ordering = ['-marked_at']
+        indexes = [models.Index(fields=['student', '-marked_at'])]
+    
+    def __str__(self):
+        return f"{self.student.username} - {self.event.title} - {self.marked_at} (archived)"
+
 # Notification Model
 class Notification(models.Model):
     TYPE_CHOICES = (
@@ -244,10 +311,90 @@ class Notification(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id']),
+            models.Index(fields=['notification_type', 'created_at']),
+        ]
     
     def __str__(self):
         return f"{self.title} - {self.user.username}"
 
+# Broadcast Notification Model
+class Broadcast(models.Model):
+    """One notification for everyone its targeting matches, resolved at read time by core.notifications"""
+    broadcast_id = models.CharField(max_length=20, unique=True, default=generate_broadcast_id)
+    notification_type = models.CharField(max_length=20, choices=Notification.TYPE_CHOICES)
+    title = models.CharField(max_length=200)
+    message = models.TextField()
+    related_event = models.ForeignKey(Event, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    # Targeting: every field that is set must match, all blank reaches everyone
+    target_event = models.ForeignKey(Event, on_delete=models.CASCADE, null=True, blank=True,
+                                     related_name='broadcasts', help_text='Only registrants of this event')
+    target_department = models.CharField(max_length=100, blank=True)
+    target_role = models.CharField(max_length=20, choices=User.ROLE_CHOICES, blank=True)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='sent_broadcasts')
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    
+    # Filled in per reader when the feed is resolved
+    is_read = False
+    
+    class Meta:
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.title} (broadcast)"
+    
+    @property
+    def notification_id(self):
+        """Feed templates address rows by notification_id"""
+        return self.broadcast_id
+
+class BroadcastRead(models.Model):
+    """A broadcast one user marked read on its own, the read watermark covers the rest"""
+    broadcast = models.ForeignKey(Broadcast, on_delete=models.CASCADE, related_name='reads')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='broadcast_reads')
+    read_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        unique_together = ['user', 'broadcast']
+    
+    def __str__(self):
+        return f"{self.user.username} read {self.broadcast.broadcast_id}"
+
+class EventReminder(models.Model):
+    """A reminder lead time handled for an event, written by core.reminders"""
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='reminders')
+    lead_hours = models.PositiveIntegerField()
+    # Empty when a shorter lead was already due and went out instead
+    broadcast = models.ForeignKey(Broadcast, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    sent_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        unique_together = ['event', 'lead_hours']
+    
+    def __str__(self):
+        return f"{self.event.event_id} {self.lead_hours}h reminder"
+
+# Archived Notification Model
+class ArchivedNotification(models.Model):
+    """Read notifications past the archive horizon, moved by core.archive"""
+    notification_id = models.CharField(max_length=20, unique=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_notifications')
+    notification_type = models.CharField(max_length=20, choices=Notification.TYPE_CHOICES)
+    title = models.CharField(max_length=200)
+    message = models.TextField()
+    is_read = models.BooleanField(default=True)
+    related_event = models.ForeignKey(Event, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    created_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [models.Index(fields=['user', '-created_at'])]
+    
+    def __str__(self):
+        return f"{self.title} - {self.user.username} (archived)"
+
 # Report Model
 class Report(models.Model):
     REPORT_TYPE_CHOICES = (
@@ -272,4 +419,37 @@ class Report(models.Model):
         ordering = ['-created_at']
     
     def __str__(self):
-        return f"{self.title} - {self.created_at.date()}"
\ No newline at end of file
+        return f"{self.title} - {self.created_at.date()}"
+
+# Analytics Models
+class AnalyticsEvent(models.Model):
+    """Append-only store for page views and tracked events sent by script.js"""
+    KIND_CHOICES = (
+        ('pageview', 'Page View'),
+        ('event', 'Tracked Event'),
+    )
+    
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    name = models.CharField(max_length=100, blank=True)
+    page = models.CharField(max_length=300, blank=True)
+    properties = models.JSONField(default=dict, blank=True)
+    occurred_at = models.DateTimeField()
+    
+    class Meta:
+        indexes = [models.Index(fields=['kind', 'occurred_at'])]
+    
+    def __str__(self):
+        return f"{self.kind}: {self.name or self.page} at {self.occurred_at}"
+
+class PageViewRollup(models.Model):
+    """Page views per page per hour, rebuilt by the rollup_analytics command"""
+    hour = models.DateTimeField()
+    page = models.CharField(max_length=300)
+    views = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        unique_together = ['hour', 'page']
+        ordering = ['-hour', '-views']
+    
+    def __str__(self):
+        return f"{self.page} - {self.hour}: {self.views}"
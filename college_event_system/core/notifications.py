@@ -0,0 +1,187 @@
+# core/notifications.py
+"""
+Notification feed: broadcasts, read watermark, cursor pages and retention.
+
+A user's feed is their own Notification rows merged with the Broadcast
+rows whose targeting (event registrants, department, role) matched them
+when they were sent, so nobody inherits the broadcasts sent before they
+joined or registered.
+A broadcast is written once whatever the audience size and resolved here
+at read time.
+
+User.notifications_read_at is a read watermark. Everything created at or
+before it counts as read whatever its is_read flag says, so "mark all
+read" is one write to the user row instead of an UPDATE over the feed.
+Broadcasts read one at a time get a BroadcastRead row.
+
+Pages are keyed on (created_at, source, pk) instead of OFFSET, so every
+page is one index range scan per source however deep the reader goes.
+
+compact() deletes read notifications and broadcasts older than their
+type's entry in NOTIFICATION_RETENTION_DAYS, from the hot and archive
+tables, in batches, run by the compact_notifications command.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+from itertools import chain
+
+from django.conf import settings
+from django.db.models import Exists, F, OuterRef, Q
+from django.utils import timezone
+
+from .backends import invalidate_user
+from .caching import bump
+from .models import ArchivedNotification, Broadcast, BroadcastRead, EventRegistration, Notification, User
+
+DEFAULT_RETENTION_DAYS = {'event': 180, 'attendance': 180, 'system': 365, 'reminder': 30}
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+# Breaks created_at ties between the two sources in the merged feed
+SOURCES = {Notification: 0, Broadcast: 1}
+COMPACTED = (Notification, ArchivedNotification, Broadcast)
+
+
+def broadcasts_for(user):
+    """Broadcasts whose targeting matched the user when they went out"""
+    registered_before = EventRegistration.objects.filter(
+        student=user, event=OuterRef('target_event'), registration_date__lte=OuterRef('created_at'),
+    )
+    return Broadcast.objects.filter(
+        Q(target_event__isnull=True) | Exists(registered_before),
+        Q(target_department='') | Q(target_department=user.department),
+        Q(target_role='') | Q(target_role=user.role),
+        created_at__gte=user.date_joined,
+    )
+
+
+def unread(user):
+    queryset = Notification.objects.filter(user=user, is_read=False)
+    if user.notifications_read_at:
+        queryset = queryset.filter(created_at__gt=user.notifications_read_at)
+    return queryset
+
+
+def unread_broadcasts(user):
+    queryset = broadcasts_for(user).exclude(reads__user=user)
+    if user.notifications_read_at:
+        queryset = queryset.filter(created_at__gt=user.notifications_read_at)
+    return queryset
+
+
+def unread_count(user):
+    return unread(user).count() + unread_broadcasts(user).count()
+
+
+def feed_count(user):
+    return Notification.objects.filter(user=user).count() + broadcasts_for(user).count()
+
+
+def latest(user):
+    rows = [
+        Notification.objects.filter(user=user).order_by('-created_at').first(),
+        broadcasts_for(user).order_by('-created_at').first(),
+    ]
+    return max((row for row in rows if row), key=_feed_key, default=None)
+
+
+def read_q():
+    """Rows that count as read, for querysets spanning several users"""
+    return Q(is_read=True) | Q(created_at__lte=F('user__notifications_read_at'))
+
+
+def apply_watermark(user, notifications):
+    """Set is_read on loaded feed rows, for the templates"""
+    watermark = user.notifications_read_at
+    broadcast_pks = [row.pk for row in notifications if isinstance(row, Broadcast)]
+    read = set(
+        BroadcastRead.objects.filter(user=user, broadcast__in=broadcast_pks).values_list('broadcast', flat=True)
+    ) if broadcast_pks else set()
+    for notification in notifications:
+        if watermark and notification.created_at <= watermark:
+            notification.is_read = True
+        elif isinstance(notification, Broadcast):
+            notification.is_read = notification.pk in read
+    return notifications
+
+
+def mark_all_read(user):
+    now = timezone.now()
+    User.objects.filter(pk=user.pk).update(notifications_read_at=now)
+    user.notifications_read_at = now
+    invalidate_user(user.pk)
+    bump(f'notifications:{user.pk}')
+
+
+def _feed_key(row):
+    return row.created_at, SOURCES[type(row)], row.pk
+
+
+def encode_cursor(row):
+    # Whole microseconds, a float timestamp can land one off and skip a row
+    delta = row.created_at - EPOCH
+    stamp = (delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds
+    return f'{stamp}.{SOURCES[type(row)]}.{row.pk}'
+
+
+def decode_cursor(value):
+    try:
+        stamp, source, pk = value.split('.')
+        return EPOCH + timedelta(microseconds=int(stamp)), int(source), int(pk)
+    except (AttributeError, ValueError, OverflowError):
+        return None
+
+
+def _after(queryset, position, source):
+    created_at, cursor_source, pk = position
+    # The plain bound lets the index seek, the rest breaks ties
+    queryset = queryset.filter(created_at__lte=created_at)
+    if source < cursor_source:
+        return queryset
+    if source > cursor_source:
+        return queryset.filter(created_at__lt=created_at)
+    return queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk))
+
+
+def page(user, cursor=None, size=None):
+    """(feed rows, next cursor or None) for the page after cursor"""
+    if size is None:
+        size = getattr(settings, 'NOTIFICATIONS_PAGE_SIZE', 20)
+    sources = [
+        Notification.objects.filter(user=user).order_by('-created_at', '-pk'),
+        broadcasts_for(user).order_by('-created_at', '-pk'),
+    ]
+    position = decode_cursor(cursor) if cursor else None
+    if position:
+        sources = [_after(queryset, position, SOURCES[queryset.model]) for queryset in sources]
+    rows = sorted(chain.from_iterable(queryset[:size + 1] for queryset in sources), key=_feed_key, reverse=True)
+    next_cursor = encode_cursor(rows[size - 1]) if len(rows) > size else None
+    return apply_watermark(user, rows[:size]), next_cursor
+
+
+def retention():
+    days = dict(DEFAULT_RETENTION_DAYS)
+    days.update(getattr(settings, 'NOTIFICATION_RETENTION_DAYS', {}))
+    return days
+
+
+def expired(model, notification_type, days, now=None):
+    cutoff = (now or timezone.now()) - timedelta(days=days)
+    queryset = model.objects.filter(notification_type=notification_type, created_at__lt=cutoff)
+    if model is Notification:
+        queryset = queryset.filter(read_q())
+    return queryset
+
+
+def compact(batch_size=1000, now=None):
+    """Delete expired read notifications and broadcasts, returns {type: rows deleted}"""
+    deleted = {}
+    for notification_type, days in retention().items():
+        total = 0
+        for model in COMPACTED:
+            queryset = expired(model, notification_type, days, now)
+            while True:
+                pks = list(queryset.order_by('pk').values_list('pk', flat=True)[:batch_size])
+                if not pks:
+                    break
+                model.objects.filter(pk__in=pks).delete()
+                total += len(pks)
+        deleted[notification_type] = total
+    return deleted
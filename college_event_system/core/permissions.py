@@ -0,0 +1,165 @@
+# core/permissions.py
+"""
+Route permission registry.
+
+Every named route is listed in ROUTES with who may open it. The table is
+compiled into RULES once at import time; RoleAccessMiddleware does a single
+dict lookup per request and views no longer repeat the role checks.
+Object-level checks (organizer owns the event, student owns the record)
+stay in the views.
+"""
+from django.core.exceptions import ImproperlyConfigured
+
+ADMIN = 'admin'
+ORGANIZER = 'organizer'
+STUDENT = 'student'
+
+PUBLIC = 'public'
+AUTHENTICATED = 'authenticated'
+
+ROUTES = {
+    # Authentication and public pages
+    'home': PUBLIC,
+    'login': PUBLIC,
+    'register': PUBLIC,
+    'logout': AUTHENTICATED,
+    'favicon': PUBLIC,
+    'password_change': AUTHENTICATED,
+    'password_change_done': AUTHENTICATED,
+
+    # Dashboards
+    'dashboard': AUTHENTICATED,
+    'admin_dashboard': {ADMIN},
+    'student_dashboard': {STUDENT},
+
+    # Events
+    'events': AUTHENTICATED,
+    'event_detail': AUTHENTICATED,
+    'create_event': {ADMIN},
+    'update_event': {ADMIN},
+    'delete_event': {ADMIN},
+    'toggle_event_status': {ADMIN},
+    'register_event': {STUDENT},
+    'event_attendance': {ADMIN, ORGANIZER},
+
+    # Attendance
+    'attendance': AUTHENTICATED,
+    'attendance_stats': AUTHENTICATED,
+    'mark_qr_attendance': {STUDENT},
+    'sync_qr_attendance': {STUDENT},
+    'kiosk_checkin': {ADMIN, ORGANIZER},
+    'kiosk_status': {ADMIN, ORGANIZER},
+    'mark_manual_attendance': AUTHENTICATED,
+    'quick_manual_attendance': AUTHENTICATED,
+    'test_scan': AUTHENTICATED,
+    'generate_personal_qr': AUTHENTICATED,
+    'attendance_details': AUTHENTICATED,
+    'attendance_history': AUTHENTICATED,
+    'generate_certificate': {STUDENT},
+    'get_ongoing_events': AUTHENTICATED,
+    'get_recent_attendance': AUTHENTICATED,
+
+    # Attendance management
+    'attendance_list': {ADMIN},
+    'toggle_attendance_verification': {ADMIN, ORGANIZER},
+    'update_attendance': {ADMIN},
+    'delete_attendance': {ADMIN},
+    'generate_qr': {ADMIN},
+    'generate_qr_code': {ADMIN, ORGANIZER},
+
+    # Reports
+    'reports': {ADMIN},
+    'report_detail': {ADMIN, ORGANIZER},
+
+    # Profile and notifications
+    'profile': AUTHENTICATED,
+    'notifications': AUTHENTICATED,
+    'mark_notification_read': AUTHENTICATED,
+
+    # User and registration management
+    'user_list': {ADMIN},
+    'user_detail': {ADMIN},
+    'update_user': {ADMIN},
+    'delete_user': {ADMIN},
+    'toggle_user_active': {ADMIN},
+    'registration_list': {ADMIN},
+    'delete_registration': {ADMIN},
+
+    # API endpoints
+    'analytics_pageview': PUBLIC,
+    'analytics_event': PUBLIC,
+    'analytics_batch': PUBLIC,
+    'get_notifications': PUBLIC,
+    'get_attendance_stats': AUTHENTICATED,
+    'instrumentation_stats': {ADMIN},
+    'metrics': PUBLIC,
+    'health': PUBLIC,
+}
+
+# Polled or fire-and-forget endpoints: no role checks, no activity writes.
+# They must be PUBLIC and handle anonymous requests themselves.
+LIGHTWEIGHT = {
+    'health', 'metrics', 'get_notifications',
+    'analytics_pageview', 'analytics_event', 'analytics_batch',
+}
+
+# Paths handled by Django admin or the static file handlers
+UNCHECKED_PREFIXES = ('/admin/', '/static/', '/media/')
+
+# Where a signed in user lands when a route is not for their role
+DENIED = {
+    ADMIN: ('admin_dashboard', 'Admin access not allowed for student pages.'),
+    STUDENT: ('student_dashboard', 'Student access not allowed for admin pages.'),
+    ORGANIZER: ('events', 'Organizers do not have access to that page.'),
+}
+
+
+class Rule:
+    __slots__ = ('public', 'roles', 'lightweight')
+
+    def __init__(self, public=False, roles=None, lightweight=False):
+        self.public = public
+        # None means any signed in user
+        self.roles = roles
+        self.lightweight = lightweight
+
+    def allows(self, role):
+        return self.roles is None or role in self.roles
+
+
+def compile_rules(routes, lightweight):
+    rules = {}
+    for name, access in routes.items():
+        if access == PUBLIC:
+            rule = Rule(public=True)
+        elif access == AUTHENTICATED:
+            rule = Rule()
+        else:
+            unknown = set(access) - set(DENIED)
+            if unknown:
+                raise ImproperlyConfigured(f'Route {name!r} names unknown roles {sorted(unknown)}')
+            rule = Rule(roles=frozenset(access))
+        rule.lightweight = name in lightweight
+        if rule.lightweight and not rule.public:
+            raise ImproperlyConfigured(f'Lightweight route {name!r} must be public')
+        rules[name] = rule
+
+    missing = set(lightweight) - set(routes)
+    if missing:
+        raise ImproperlyConfigured(f'Lightweight routes missing from ROUTES: {sorted(missing)}')
+    return rules
+
+
+RULES = compile_rules(ROUTES, LIGHTWEIGHT)
+
+# Unlisted routes behave like before the registry existed: sign in required
+DEFAULT_RULE = Rule()
+
+
+def rule_for(url_name):
+    return RULES.get(url_name, DEFAULT_RULE)
+
+
+def role_of(user):
+    """The role field alone decides, is_staff only opens the Django admin site"""
+    return user.role
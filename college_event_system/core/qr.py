@@ -0,0 +1,58 @@
+# core/qr.py
+import base64
+import json
+from io import BytesIO
+
+import qrcode
+from django.conf import settings
+from django.core.cache import cache
+
+from . import metrics
+
+
+def qr_png_base64(data):
+    """Render data as a PNG QR code and return it base64 encoded"""
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        box_size=10,
+        border=4,
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+
+    img = qr.make_image(fill_color="black", back_color="white")
+
+    buffer = BytesIO()
+    img.save(buffer, format="PNG")
+    return base64.b64encode(buffer.getvalue()).decode()
+
+
+def event_qr_payload(event):
+    """Attendance QR contents shown on the admin Generate QR page"""
+    return {
+        'event_id': event.id,
+        'event_code': event.event_id,
+        'title': event.title,
+        'date': str(event.date),
+        'start_time': str(event.start_time) if event.start_time else '',
+        'end_time': str(event.end_time) if event.end_time else '',
+        'type': 'attendance',
+        'url': f'http://127.0.0.1:8000/attendance/scan/{event.event_id}/'  # Adjust if needed
+    }
+
+
+def event_qr_key(event):
+    # updated_at is part of the key so edits to the event never serve an old image
+    return f'events:qr:v1:{event.pk}:{event.updated_at.timestamp() if event.updated_at else 0}'
+
+
+def event_qr_data_uri(event, view='generate_qr_code'):
+    """Cached data URI of the event's attendance QR code"""
+    key = event_qr_key(event)
+    data_uri = cache.get(key)
+    if data_uri is None:
+        with metrics.qr_generation.time(view=view):
+            data_uri = f'data:image/png;base64,{qr_png_base64(json.dumps(event_qr_payload(event)))}'
+        cache.set(key, data_uri, getattr(settings, 'EVENT_QR_CACHE_TIMEOUT', 60 * 60 * 12))
+    return data_uri
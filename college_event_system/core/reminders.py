@@ -0,0 +1,100 @@
+# core/reminders.py
+"""
+Event reminders.
+
+dispatch() runs on every run_event_scheduler tick. One query on the
+(status, date, start_time) index finds the upcoming events starting
+within the longest of REMINDER_LEAD_HOURS, and a second reads the leads
+already handled for them. Every event with a new lead due gets one
+reminder Broadcast to its registrants (see core.notifications), so a
+tick costs the same with ten registrations or ten thousand.
+
+EventReminder rows (unique per event and lead) record what went out, so
+reruns skip it. When several leads are due at once, as for an event
+created an hour before it starts, only the shortest one is sent and the
+longer ones are recorded as covered.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .caching import bump
+from .models import Broadcast, Event, EventReminder
+
+
+def lead_hours():
+    return sorted(set(getattr(settings, 'REMINDER_LEAD_HOURS', [24, 1])))
+
+
+def _starting_within(local, hours):
+    """Events whose (date, start_time) falls in (local, local + hours]"""
+    until = local + timedelta(hours=hours)
+    today, current = local.date(), local.time()
+    if until.date() == today:
+        return Q(date=today, start_time__gt=current, start_time__lte=until.time())
+    return (
+        Q(date=today, start_time__gt=current)
+        | Q(date__gt=today, date__lt=until.date())
+        | Q(date=until.date(), start_time__lte=until.time())
+    )
+
+
+def due(now=None):
+    """[(event, lead to send, leads to record)] for events with a new lead due"""
+    leads = lead_hours()
+    if not leads:
+        return []
+    local = timezone.localtime(now or timezone.now())
+    events = list(
+        Event.objects.filter(_starting_within(local, leads[-1]), status='upcoming')
+        .only('pk', 'event_id', 'title', 'venue', 'date', 'start_time')
+    )
+    handled = defaultdict(set)
+    for event_pk, lead in EventReminder.objects.filter(event__in=events).values_list('event_id', 'lead_hours'):
+        handled[event_pk].add(lead)
+
+    pending = []
+    for event in events:
+        starts = timezone.make_aware(datetime.combine(event.date, event.start_time))
+        hours_left = (starts - local).total_seconds() / 3600
+        open_leads = [lead for lead in leads if hours_left <= lead and lead not in handled[event.pk]]
+        # The shortest lead has not gone out yet, longer ones are covered by it
+        if open_leads and open_leads[0] == min(lead for lead in leads if hours_left <= lead):
+            pending.append((event, open_leads[0], open_leads))
+    return pending
+
+
+def message(event):
+    return f'"{event.title}" starts on {event.date:%B %d} at {event.start_time:%I:%M %p}, {event.venue}.'
+
+
+def dispatch(now=None):
+    """Send the reminders that are due, returns the events reminded"""
+    pending = due(now)
+    if not pending:
+        return []
+    broadcasts = [
+        Broadcast(
+            notification_type='reminder',
+            title=f'Starting within {lead} hour{"s" if lead != 1 else ""}',
+            message=message(event),
+            related_event=event,
+            target_event=event,
+        )
+        for event, lead, _ in pending
+    ]
+    with transaction.atomic():
+        Broadcast.objects.bulk_create(broadcasts)
+        EventReminder.objects.bulk_create([
+            EventReminder(event=event, lead_hours=lead, broadcast=broadcast if lead == sent else None)
+            for (event, sent, leads), broadcast in zip(pending, broadcasts)
+            for lead in leads
+        ])
+    # bulk_create skips the post_save receiver that bumps this. Only processes
+    # sharing the cache see the bump, the notification ETag also tracks the newest pk
+    bump('broadcasts')
+    return [event for event, _, _ in pending]
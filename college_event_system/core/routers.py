@@ -0,0 +1,130 @@
+# core/routers.py
+"""
+Read replica routing.
+
+Reads go to the 'replica' database only inside replica_reads views or a
+reading_from_replica() block, and only while the replica is fresher than
+REPLICA_MAX_LAG seconds. Writes always go to the primary. A successful
+POST pins the browser to the primary for REPLICA_MAX_LAG seconds
+(ReadYourWritesMiddleware), so whoever made a change never reads a
+replica that predates it.
+
+Locally the replica is a second SQLite file refreshed by the sync_replica
+command; on PostgreSQL point DATABASES['replica'] at a streaming standby.
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+REPLICA = 'replica'
+PIN_COOKIE = 'db_pin'
+# How long a measured lag is reused before asking the replica again
+LAG_CHECK_INTERVAL = 1.0
+
+_replica_reads = ContextVar('replica_reads', default=False)
+_lag = (0.0, None)
+_lag_lock = threading.Lock()
+
+
+def replica_configured():
+    return REPLICA in settings.DATABASES
+
+
+def max_lag():
+    return getattr(settings, 'REPLICA_MAX_LAG', 60)
+
+
+def _measure_lag():
+    replica = connections[REPLICA]
+    if replica.vendor == 'sqlite':
+        # sync_replica stamps the file with the time the copy started
+        try:
+            return max(time.time() - os.path.getmtime(replica.settings_dict['NAME']), 0.0)
+        except OSError:
+            return None
+    if replica.vendor == 'postgresql':
+        with replica.cursor() as cursor:
+            cursor.execute(
+                'SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 '
+                'ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END'
+            )
+            value = cursor.fetchone()[0]
+        return float(value) if value is not None else 0.0
+    return None
+
+
+def replica_lag():
+    """Seconds the replica is behind the primary, None when it cannot be used"""
+    global _lag
+    if not replica_configured():
+        return None
+    checked_at, lag = _lag
+    now = time.monotonic()
+    if now - checked_at < LAG_CHECK_INTERVAL:
+        return lag
+    with _lag_lock:
+        try:
+            lag = _measure_lag()
+        except DatabaseError:
+            lag = None
+        _lag = (now, lag)
+    return lag
+
+
+def replica_is_fresh():
+    lag = replica_lag()
+    return lag is not None and lag <= max_lag()
+
+
+@contextmanager
+def reading_from_replica():
+    """Send reads in this block to the replica while it is fresh enough (report jobs)"""
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def is_pinned(request):
+    try:
+        return float(request.COOKIES.get(PIN_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def replica_reads(view_func):
+    """Serve GETs of a read-only view from the replica unless the browser is pinned"""
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD') or is_pinned(request):
+            return view_func(request, *args, **kwargs)
+        with reading_from_replica():
+            return view_func(request, *args, **kwargs)
+    return wrapper
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _replica_reads.get() and replica_is_fresh():
+            return REPLICA
+        return None
+
+    def db_for_write(self, model, **hints):
+        # Explicit, or objects loaded from the replica would be saved back to it
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db == REPLICA:
+            return False
+        return None
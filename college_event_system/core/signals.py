@@ -0,0 +1,94 @@
+# core/signals.py
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import caching, counters, lifecycle, metrics
+from .backends import invalidate_user
+from .models import (
+    ArchivedAttendanceRecord, AttendanceRecord, Broadcast, BroadcastRead, Event, EventRegistration, Notification, User,
+)
+
+
+@receiver(connection_created)
+def count_connection(sender, connection, **kwargs):
+    metrics.db_connections_opened.inc(alias=connection.alias)
+
+
+@receiver(post_save, sender=Notification)
+def count_notification(sender, instance, created, **kwargs):
+    if created:
+        metrics.notifications_created.inc(type=instance.notification_type)
+
+
+@receiver(post_save, sender=Notification)
+@receiver(post_delete, sender=Notification)
+def notification_changed(sender, instance, **kwargs):
+    caching.bump(f'notifications:{instance.user_id}')
+
+
+@receiver(post_save, sender=Broadcast)
+@receiver(post_delete, sender=Broadcast)
+def broadcast_changed(sender, instance, **kwargs):
+    # One counter in every feed ETag, not one bump per recipient
+    caching.bump('broadcasts')
+
+
+@receiver(post_save, sender=BroadcastRead)
+def broadcast_read(sender, instance, **kwargs):
+    caching.bump(f'notifications:{instance.user_id}')
+
+
+@receiver(post_save, sender=AttendanceRecord)
+@receiver(post_delete, sender=AttendanceRecord)
+def attendance_changed(sender, instance, **kwargs):
+    caching.bump('attendance', f'attendance:student:{instance.student_id}')
+
+
+@receiver(post_save, sender=AttendanceRecord)
+def count_attendance(sender, instance, created, **kwargs):
+    if created:
+        counters.attendance_added(instance)
+
+
+@receiver(post_delete, sender=AttendanceRecord)
+@receiver(post_delete, sender=ArchivedAttendanceRecord)
+def uncount_attendance(sender, instance, **kwargs):
+    counters.attendance_added(instance, -1)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def drop_cached_user(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def event_changed(sender, instance, **kwargs):
+    lifecycle.bump_generation()
+    caching.drop_event_pages()
+
+
+@receiver(post_save, sender=EventRegistration)
+@receiver(post_delete, sender=EventRegistration)
+def registration_changed(sender, instance, created=True, **kwargs):
+    caching.drop_event_pages()
+    caching.bump(f'attendance:student:{instance.student_id}')
+    # Check-ins save the registration too, only membership changes matter
+    if created:
+        lifecycle.drop_roster(instance.event_id)
+        lifecycle.drop_registered_event_ids(instance.student_id)
+        # Broadcasts to the event's registrants join or leave the feed
+        caching.bump(f'notifications:{instance.student_id}')
+
+
+@receiver(post_save, sender=EventRegistration)
+def count_registration(sender, instance, created, **kwargs):
+    if created:
+        counters.registration_added(instance)
+
+
+@receiver(post_delete, sender=EventRegistration)
+def uncount_registration(sender, instance, **kwargs):
+    counters.registration_added(instance, -1)
@@ -1,3 +1,477 @@
-from django.test import TestCase
+from datetime import date, datetime, time, timedelta
+from io import StringIO
+from unittest import TestCase, mock, skipUnless
 
-# Create your tests here.
+from django import test
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+from django.utils import timezone
+
+from . import analytics, archive, checkins, counters, lifecycle, notifications, reminders, views
+from .forms import EventForm
+from .models import (
+    AnalyticsEvent, AttendanceRecord, Broadcast, Event, EventRegistration, EventReminder, Notification, PageViewRollup,
+    User,
+)
+from .permissions import LIGHTWEIGHT, ROUTES, RULES, UNCHECKED_PREFIXES, role_of
+
+
+def walk_patterns(patterns, prefix=''):
+    """Yield (route, pattern) for every URLPattern, descending into includes"""
+    for entry in patterns:
+        route = prefix + str(entry.pattern)
+        if isinstance(entry, URLResolver):
+            yield from walk_patterns(entry.url_patterns, route)
+        elif isinstance(entry, URLPattern):
+            yield route, entry
+
+
+class RoutePermissionTests(SimpleTestCase):
+    def project_routes(self):
+        for route, pattern in walk_patterns(get_resolver().url_patterns):
+            if ('/' + route).startswith(UNCHECKED_PREFIXES):
+                continue
+            yield route, pattern
+
+    def test_every_route_has_a_permission_rule(self):
+        unnamed = [route for route, pattern in self.project_routes() if not pattern.name]
+        missing = [
+            f'{pattern.name} ({route})' for route, pattern in self.project_routes()
+            if pattern.name and pattern.name not in RULES
+        ]
+        self.assertEqual(unnamed, [], 'Routes need a name to be listed in core.permissions.ROUTES')
+        self.assertEqual(missing, [], 'Add these routes to core.permissions.ROUTES')
+
+    def test_registry_has_no_stale_entries(self):
+        names = {pattern.name for _, pattern in self.project_routes()}
+        self.assertEqual(sorted(set(ROUTES) - names), [])
+
+    def test_lightweight_routes_are_public(self):
+        for name in LIGHTWEIGHT:
+            self.assertTrue(RULES[name].public, name)
+            self.assertTrue(RULES[name].lightweight, name)
+
+    def test_staff_flag_does_not_grant_admin_routes(self):
+        staff = User(username='staff', role='organizer', is_staff=True)
+
+        self.assertEqual(role_of(staff), 'organizer')
+        self.assertFalse(RULES['reports'].allows(role_of(staff)))
+
+
+@skipUnless(getattr(settings, 'SQLITE_PROFILE', None) == 'tuned', 'SQLite profile is switched off')
+class SQLiteProfileTests(TestCase):
+    """stress_sqlite works on its own scratch file, outside the test database"""
+
+    def test_concurrent_checkin_writes_never_lock(self):
+        out = StringIO()
+        # Raises CommandError on any "database is locked" failure
+        call_command('stress_sqlite', threads=16, rate=400, duration=2, stdout=out)
+        self.assertIn('journal_mode=wal', out.getvalue())
+        self.assertIn('transaction_mode=IMMEDIATE', out.getvalue())
+
+
+def make_event(organizer, **fields):
+    defaults = {
+        'title': 'Test Event', 'description': 'Test', 'category': 'technical', 'venue': 'Hall A',
+        'date': date(2026, 3, 10), 'start_time': time(10), 'end_time': time(12), 'status': 'ongoing',
+    }
+    defaults.update(fields)
+    return Event.objects.create(organizer=organizer, **defaults)
+
+
+class CheckinCommitTests(test.TestCase):
+    def setUp(self):
+        cache.clear()
+        self.organizer = User.objects.create_user('organizer', password='x', role='organizer')
+        self.student = User.objects.create_user('student', password='x', role='student', student_id='S1')
+        self.event = make_event(self.organizer)
+        self.registration = EventRegistration.objects.create(event=self.event, student=self.student)
+        self.scanned_at = timezone.make_aware(datetime(2026, 3, 10, 10, 30))
+
+    def checkin(self, key, student=None):
+        return checkins.Checkin(key, self.event, (student or self.student).pk, self.scanned_at)
+
+    def test_resent_batch_marks_once(self):
+        first = checkins.commit([self.checkin('a')])
+        again = checkins.commit([self.checkin('a')])
+
+        self.assertEqual(first['a'][0], checkins.MARKED)
+        self.assertEqual(again['a'][0], checkins.DUPLICATE)
+        self.assertEqual(AttendanceRecord.objects.filter(event=self.event).count(), 1)
+        self.event.refresh_from_db()
+        self.student.refresh_from_db()
+        self.assertEqual((self.event.attended_count, self.student.attended_count), (1, 1))
+
+    def test_duplicate_within_batch(self):
+        results = checkins.commit([self.checkin('a'), self.checkin('b')])
+
+        self.assertEqual([results['a'][0], results['b'][0]], [checkins.MARKED, checkins.DUPLICATE])
+        record = AttendanceRecord.objects.get(event=self.event)
+        self.assertEqual(record.marked_at, self.scanned_at)
+        self.registration.refresh_from_db()
+        self.assertTrue(self.registration.attended)
+
+    def test_roster_miss_is_confirmed_in_the_database(self):
+        late = User.objects.create_user('late', password='x', role='student', student_id='S2')
+        lifecycle.roster(self.event.pk)
+        # Registered through another process, whose drop_roster never reached this cache
+        EventRegistration.objects.bulk_create([EventRegistration(event=self.event, student=late)])
+
+        results = checkins.commit([self.checkin('late', late)])
+
+        self.assertEqual(results['late'][0], checkins.MARKED)
+
+    def test_unregistered_student_is_rejected(self):
+        stranger = User.objects.create_user('stranger', password='x', role='student', student_id='S3')
+
+        results = checkins.commit([self.checkin('x', stranger)])
+
+        self.assertEqual(results['x'][0], checkins.REJECTED)
+        self.assertFalse(AttendanceRecord.objects.filter(student=stranger).exists())
+
+
+class NotificationPageTests(test.TestCase):
+    def setUp(self):
+        cache.clear()
+        self.student = User.objects.create_user('student', password='x', role='student', student_id='S1')
+        self.tied = timezone.make_aware(datetime(2026, 3, 10, 9, 0))
+        User.objects.filter(pk=self.student.pk).update(date_joined=self.tied - timedelta(days=1))
+        self.student.refresh_from_db()
+
+    def notify(self, title, created_at):
+        notification = Notification.objects.create(
+            user=self.student, notification_type='system', title=title, message=title,
+        )
+        Notification.objects.filter(pk=notification.pk).update(created_at=created_at)
+        return notification
+
+    def broadcast(self, title, created_at):
+        broadcast = Broadcast.objects.create(notification_type='system', title=title, message=title)
+        Broadcast.objects.filter(pk=broadcast.pk).update(created_at=created_at)
+        return broadcast
+
+    def read_feed(self, size):
+        rows, cursor, pages = [], None, 0
+        while True:
+            page, cursor = notifications.page(self.student, cursor, size=size)
+            rows.extend((type(row).__name__, row.pk) for row in page)
+            pages += 1
+            if cursor is None:
+                return rows, pages
+
+    def test_cursor_pages_break_created_at_ties(self):
+        newer = self.notify('newer', self.tied + timedelta(minutes=1))
+        tied = [self.notify(f'tied {n}', self.tied) for n in range(3)]
+        broadcasts = [self.broadcast(f'broadcast {n}', self.tied) for n in range(2)]
+        older = self.notify('older', self.tied - timedelta(minutes=1))
+        expected = (
+            [('Notification', newer.pk)]
+            + [('Broadcast', row.pk) for row in reversed(broadcasts)]
+            + [('Notification', row.pk) for row in reversed(tied)]
+            + [('Notification', older.pk)]
+        )
+
+        for size in (1, 2, 3):
+            rows, pages = self.read_feed(size)
+            self.assertEqual(rows, expected, f'size={size}')
+            self.assertEqual(pages, -(-len(expected) // size), f'size={size}')
+
+    def test_broadcasts_sent_before_joining_or_registering_are_left_out(self):
+        organizer = User.objects.create_user('organizer', password='x', role='organizer')
+        event = make_event(organizer)
+        registration = EventRegistration.objects.create(event=event, student=self.student)
+        EventRegistration.objects.filter(pk=registration.pk).update(registration_date=self.tied)
+        self.broadcast('before joining', self.student.date_joined - timedelta(minutes=1))
+        early = Broadcast.objects.create(notification_type='event', title='early', message='early', target_event=event)
+        Broadcast.objects.filter(pk=early.pk).update(created_at=self.tied - timedelta(minutes=1))
+        late = Broadcast.objects.create(notification_type='event', title='late', message='late', target_event=event)
+        Broadcast.objects.filter(pk=late.pk).update(created_at=self.tied + timedelta(minutes=1))
+
+        self.assertEqual(list(notifications.broadcasts_for(self.student)), [late])
+
+
+@override_settings(REMINDER_LEAD_HOURS=[24, 1])
+class ReminderTests(test.TestCase):
+    def setUp(self):
+        cache.clear()
+        self.organizer = User.objects.create_user('organizer', password='x', role='organizer')
+        self.now = timezone.make_aware(datetime(2026, 3, 10, 10, 0))
+
+    def test_only_the_shortest_due_lead_is_sent(self):
+        event = make_event(self.organizer, start_time=time(10, 30), end_time=time(12), status='upcoming')
+
+        self.assertEqual(reminders.due(self.now), [(event, 1, [1, 24])])
+        self.assertEqual(reminders.dispatch(self.now), [event])
+        broadcast = Broadcast.objects.get(target_event=event)
+        self.assertEqual(
+            sorted(EventReminder.objects.filter(event=event).values_list('lead_hours', 'broadcast')),
+            [(1, broadcast.pk), (24, None)],
+        )
+        self.assertEqual(reminders.dispatch(self.now), [])
+
+    def test_longer_lead_goes_out_first(self):
+        event = make_event(self.organizer, start_time=time(15), end_time=time(17), status='upcoming')
+
+        self.assertEqual(reminders.due(self.now), [(event, 24, [24])])
+        reminders.dispatch(self.now)
+        self.assertEqual(reminders.due(self.now), [])
+        self.assertEqual(reminders.due(self.now + timedelta(hours=4, minutes=30)), [(event, 1, [1])])
+
+    def test_events_past_the_longest_lead_are_skipped(self):
+        make_event(self.organizer, date=date(2026, 3, 12), status='upcoming')
+
+        self.assertEqual(reminders.due(self.now), [])
+
+
+class LoadDataTests(test.TestCase):
+    def test_clear_keeps_real_events(self):
+        organizer = User.objects.create_user('organizer', password='x', role='organizer')
+        student = User.objects.create_user('student', password='x', role='student', student_id='S1')
+        # Real ids are EV plus 8 of [A-Z0-9], so some start like the load ids used to
+        event = make_event(organizer, event_id='EVLQ7Z3K2P')
+        EventRegistration.objects.create(event=event, student=student)
+        options = {'students': 4, 'events': 2, 'registrations_per_student': 1, 'stdout': StringIO()}
+
+        call_command('generate_load_data', **options)
+        call_command('generate_load_data', clear=True, **options)
+
+        self.assertTrue(EventRegistration.objects.filter(event__event_id='EVLQ7Z3K2P', student=student).exists())
+        self.assertEqual(Event.objects.count(), 3)
+
+
+class RegisteredEventsTests(test.TestCase):
+    def setUp(self):
+        cache.clear()
+        self.organizer = User.objects.create_user('organizer', password='x', role='organizer')
+        self.student = User.objects.create_user('student', password='x', role='student', student_id='S1')
+        self.event = make_event(self.organizer)
+
+    def test_stale_cached_set_is_confirmed_in_the_database(self):
+        self.assertFalse(lifecycle.is_registered(self.event.pk, self.student.pk))
+        # Registered through another worker, whose cache drop never reached this one
+        EventRegistration.objects.bulk_create([EventRegistration(event=self.event, student=self.student)])
+
+        self.assertTrue(lifecycle.is_registered(self.event.pk, self.student.pk))
+        self.assertIn(self.event.pk, lifecycle.registered_event_ids(self.student.pk))
+
+
+class CounterTests(test.TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user('admin', password='x', role='admin')
+        self.student = User.objects.create_user('student', password='x', role='student', student_id='S1')
+        self.event = make_event(self.admin, status='upcoming')
+
+    def counts(self):
+        self.event.refresh_from_db()
+        self.student.refresh_from_db()
+        return self.event.current_participants, self.student.registered_count
+
+    def test_register_check_in_and_unregister(self):
+        registration = EventRegistration.objects.create(event=self.event, student=self.student)
+        self.assertEqual(self.counts(), (1, 1))
+
+        AttendanceRecord.objects.create(event=self.event, student=self.student, registration=registration, method='qr')
+        self.counts()
+        self.assertEqual((self.event.attended_count, self.student.attended_count), (1, 1))
+        self.assertEqual(counters.student_counts(self.student.pk), (1, 1))
+
+        # Takes the attendance row with it
+        registration.delete()
+        self.assertEqual(self.counts(), (0, 0))
+        self.assertEqual((self.event.attended_count, self.student.attended_count), (0, 0))
+
+    def test_event_edit_keeps_a_concurrent_registration(self):
+        clean = EventForm.clean
+
+        def register_meanwhile(form):
+            # Lands after update_event loaded the event and before it saves it
+            EventRegistration.objects.create(event=self.event, student=self.student)
+            return clean(form)
+
+        self.client.force_login(self.admin)
+        data = {
+            'title': 'Renamed', 'description': 'Test', 'category': 'technical', 'venue': 'Hall A',
+            'date': '2026-03-10', 'start_time': '10:00', 'end_time': '12:00',
+            'max_participants': 100, 'status': 'upcoming',
+        }
+        with mock.patch.object(EventForm, 'clean', register_meanwhile):
+            response = self.client.post(reverse('update_event', args=[self.event.event_id]), data)
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.counts(), (1, 1))
+        self.assertEqual(self.event.title, 'Renamed')
+
+    def test_user_edit_keeps_a_concurrent_registration(self):
+        stale = User.objects.get(pk=self.student.pk)
+        EventRegistration.objects.create(event=self.event, student=self.student)
+
+        stale.department = 'Physics'
+        counters.save_keeping_counters(stale)
+
+        self.assertEqual(self.counts(), (1, 1))
+        self.assertEqual(self.student.department, 'Physics')
+
+
+class PageViewRollupTests(test.TestCase):
+    def pageview(self, page, occurred_at):
+        AnalyticsEvent.objects.create(kind='pageview', page=page, occurred_at=occurred_at)
+
+    def test_late_beacon_for_an_earlier_hour_is_counted(self):
+        ten = timezone.make_aware(datetime(2026, 3, 10, 10, 0))
+        self.pageview('/events/', ten + timedelta(minutes=5))
+        analytics.rollup_pageviews()
+        # Client clock behind the server, stored after the 10:00 rollup
+        self.pageview('/events/', ten - timedelta(hours=3, minutes=30))
+        self.pageview('/events/', ten + timedelta(minutes=20))
+
+        analytics.rollup_pageviews()
+
+        self.assertEqual(
+            list(PageViewRollup.objects.order_by('hour').values_list('hour', 'views')),
+            [(ten - timedelta(hours=4), 1), (ten, 2)],
+        )
+
+
+class AttendanceEndpointAccessTests(test.TestCase):
+    def setUp(self):
+        self.organizer = User.objects.create_user('organizer', password='x', role='organizer')
+        self.student = User.objects.create_user('student', password='x', role='student', student_id='S1')
+        self.event = make_event(self.organizer)
+        self.factory = RequestFactory()
+
+    def post(self, view, user, *args):
+        # Called directly, the view must not lean on RoleAccessMiddleware
+        request = self.factory.post('/', '{}', content_type='application/json')
+        request.user = user
+        return view(request, *args)
+
+    def test_kiosk_refuses_anonymous_and_student_requests(self):
+        for view in (views.kiosk_checkin, views.kiosk_status):
+            response = self.post(view, AnonymousUser(), self.event.event_id)
+            self.assertEqual(response.status_code, 302, view.__name__)
+            response = self.post(view, self.student, self.event.event_id)
+            self.assertEqual(response.status_code, 403, view.__name__)
+
+        response = self.client.post(reverse('kiosk_checkin', args=[self.event.event_id]), {})
+        self.assertIn(response.status_code, (302, 403))
+
+    def test_offline_sync_refuses_anonymous_and_organizer_requests(self):
+        self.assertEqual(self.post(views.sync_qr_attendance, AnonymousUser()).status_code, 302)
+        self.assertEqual(self.post(views.sync_qr_attendance, self.organizer).status_code, 403)
+
+
+class ArchiveTests(test.TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user('admin', password='x', role='admin')
+        self.student = User.objects.create_user('student', password='x', role='student', student_id='S1')
+
+    def attend(self, event, marked_at):
+        registration = EventRegistration.objects.create(event=event, student=self.student)
+        record = AttendanceRecord.objects.create(
+            event=event, student=self.student, registration=registration, method='qr',
+        )
+        AttendanceRecord.objects.filter(pk=record.pk).update(marked_at=marked_at)
+        return record.attendance_id
+
+    def test_history_merges_both_stores_newest_first(self):
+        day = timezone.make_aware(datetime(2025, 1, 10, 10, 0))
+        old = make_event(self.admin, title='Old', date=date(2025, 1, 10), status='completed')
+        recent = make_event(self.admin, title='Recent', date=date(2026, 3, 10), status='completed')
+        # Hot rows on both sides of the archived one
+        newest = self.attend(recent, day + timedelta(days=1))
+        cold = self.attend(old, day)
+        oldest = self.attend(make_event(self.admin, title='Hot', date=date(2026, 3, 11)), day - timedelta(days=1))
+
+        moved = archive.archive(date(2025, 6, 1))
+
+        self.assertEqual(moved['attendance'], 1)
+        history = archive.attendance_history(self.student)
+        self.assertEqual([row.attendance_id for row in history], [newest, cold, oldest])
+        self.assertEqual([getattr(row, 'is_archived', False) for row in history], [False, True, False])
+        self.assertEqual(archive.attendance_count(student=self.student), 3)
+        self.student.refresh_from_db()
+        self.assertEqual(self.student.attended_count, 3)
+
+    def test_archived_rows_are_read_only(self):
+        old = make_event(self.admin, date=date(2025, 1, 10), status='completed')
+        cold = self.attend(old, timezone.make_aware(datetime(2025, 1, 10, 10, 0)))
+        archive.archive(date(2025, 6, 1))
+        self.client.force_login(self.admin)
+
+        page = self.client.get(reverse('event_attendance', args=[old.event_id]))
+        update = self.client.post(reverse('update_attendance', args=[cold]), {'method': 'manual', 'verified': 'on'})
+
+        self.assertContains(page, f"viewDetails('{cold}')")
+        self.assertNotContains(page, f"toggleVerification('{cold}'")
+        self.assertEqual(update.status_code, 404)
+
+
+class LiveIndexTests(test.TestCase):
+    def setUp(self):
+        cache.clear()
+        lifecycle.index.invalidate()
+        self.organizer = User.objects.create_user('organizer', password='x', role='organizer')
+        self.now = timezone.make_aware(datetime(2026, 3, 10, 10, 30))
+
+    def test_rebuilds_when_another_process_bumps_the_generation(self):
+        event = make_event(self.organizer)
+        self.assertEqual(lifecycle.live_event_ids(self.now), [event.pk])
+
+        # Written without signals, as by another process
+        Event.objects.filter(pk=event.pk).update(status='completed')
+        self.assertEqual(lifecycle.live_event_ids(self.now), [event.pk])
+        cache.set(lifecycle.GENERATION_KEY, lifecycle.generation() + 1, None)
+
+        self.assertEqual(lifecycle.live_event_ids(self.now), [])
+
+    def test_saved_events_join_the_index(self):
+        self.assertEqual(lifecycle.live_event_ids(self.now), [])
+        early = make_event(self.organizer, start_time=time(9), end_time=time(10, 15))
+        event = make_event(self.organizer)
+
+        self.assertEqual(lifecycle.live_event_ids(self.now), [event.pk])
+        self.assertFalse(lifecycle.is_live(early, self.now))
+
+
+class PollingETagTests(test.TestCase):
+    def setUp(self):
+        cache.clear()
+        self.organizer = User.objects.create_user('organizer', password='x', role='organizer')
+        self.student = User.objects.create_user('student', password='x', role='student', student_id='S1')
+        self.client.force_login(self.student)
+
+    def poll(self, name, etag=None):
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return self.client.get(reverse(name), **headers)
+
+    def test_notifications_answer_304_until_the_feed_changes(self):
+        first = self.poll('get_notifications')
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('no-cache', first['Cache-Control'])
+        self.assertEqual(self.poll('get_notifications', first['ETag']).status_code, 304)
+
+        Notification.objects.create(user=self.student, notification_type='system', title='Hi', message='Hi')
+        second = self.poll('get_notifications', first['ETag'])
+        self.assertEqual(second.status_code, 200)
+        self.assertEqual(second.json()['unread_count'], 1)
+
+        # bulk_create skips the bump, as in the scheduler process
+        Broadcast.objects.bulk_create([Broadcast(notification_type='reminder', title='Soon', message='Soon')])
+        self.assertEqual(self.poll('get_notifications', second['ETag']).status_code, 200)
+
+    def test_attendance_stats_answer_304_until_a_check_in(self):
+        event = make_event(self.organizer)
+        registration = EventRegistration.objects.create(event=event, student=self.student)
+        first = self.poll('attendance_stats')
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(self.poll('attendance_stats', first['ETag']).status_code, 304)
+
+        AttendanceRecord.objects.create(event=event, student=self.student, registration=registration, method='qr')
+
+        self.assertEqual(self.poll('attendance_stats', first['ETag']).status_code, 200)
@@ -1,14 +1,20 @@
 # views.py - COMPLETE WORKING VERSION
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login, logout, authenticate
-from django.contrib.auth.decorators import login_required, user_passes_test
+from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.http import JsonResponse, HttpResponse
 from django.db.models import Count, Q, Sum, F, Avg, Max, Min, BooleanField
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.crypto import constant_time_compare
+from django.conf import settings
+from django.db import IntegrityError, OperationalError, connection
 from django.views.decorators.csrf import csrf_exempt
 from datetime import datetime, timedelta
 import json
+import logging
 import secrets
 import base64
 import io
@@ -20,20 +26,60 @@ from django.http import FileResponse
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter
 from reportlab.lib import colors
-from .models import User, Event, EventRegistration, AttendanceRecord, Notification, Report
+from reportlab.lib.units import inch
+from .models import User, Event, EventRegistration, AttendanceRecord, Notification, Report, Broadcast, BroadcastRead
+from . import analytics, archive, checkins, counters, instrumentation, kiosk, lifecycle, metrics, notifications
+from .caching import HOME_KEY, cache_anonymous_page, event_stats, poll_etag, version
+from .qr import qr_png_base64, event_qr_data_uri
+from .routers import replica_reads
 from .forms import UserRegistrationForm, UserLoginForm, EventForm, ManualAttendanceForm, ProfileUpdateForm, UserUpdateForm, AttendanceUpdateForm
 
+logger = logging.getLogger(__name__)
+
+# Event edits registrants hear about, as one Broadcast (see core.notifications)
+BROADCAST_FIELDS = ('date', 'start_time', 'end_time', 'venue', 'status')
+
 # ========== UTILITY FUNCTIONS ==========
-def is_admin(user):
-    return user.is_authenticated and (user.role == 'admin' or user.is_staff)
+# Role checks live in core.permissions and are enforced by RoleAccessMiddleware
+
+def _database_busy(exc):
+    """Check-in that outlived the SQLite busy_timeout, the scanner should retry"""
+    metrics.checkin_rejections.inc(reason='database_busy')
+    logger.warning('Attendance write failed: %s', exc)
+    return JsonResponse({'success': False, 'message': 'Database busy, please retry'}, status=503)
 
-def is_student(user):
-    return user.is_authenticated and user.role == 'student'
+# ETags for polled JSON views, see caching.poll_etag
+# The polling and check-in APIs below are async views; they read the user with
+# request.auser() and reach sync helpers (cache backed lifecycle lookups)
+# through sync_to_async, so they run without a thread under ASGI.
+def _attendance_etag(request):
+    if not request.user.is_authenticated:
+        return None
+    if request.user.role == 'student':
+        scope = f'attendance:student:{request.user.pk}'
+    else:
+        scope = 'attendance'
+    return f'{request.user.pk}-{version(scope)}-{timezone.localdate().isoformat()}'
+
+def _notifications_etag(request):
+    if not request.user.is_authenticated:
+        return None
+    # Broadcasts bump one shared counter instead of one per recipient. The
+    # scheduler sends reminders from its own process, whose bump a per-process
+    # cache never shows here, so the newest broadcast pk is part of the tag too.
+    latest_broadcast = Broadcast.objects.aggregate(latest=Max('pk'))['latest']
+    return f'{request.user.pk}-{version(f"notifications:{request.user.pk}")}-{version("broadcasts")}-{latest_broadcast}'
+
+def _ongoing_events_etag(request):
+    if request.user.role == 'student':
+        live_ids = lifecycle.live_event_ids_for(request.user.pk)
+    else:
+        live_ids = lifecycle.live_event_ids()
+    return f'{request.user.pk}-{lifecycle.generation()}-' + '.'.join(map(str, live_ids))
 
-def is_organizer(user):
-    return user.is_authenticated and user.role == 'organizer'
 
 # ========== AUTHENTICATION VIEWS ==========
+@cache_anonymous_page(HOME_KEY, 'HOME_CACHE_TIMEOUT', 300)
 def home(request):
     """Home page view"""
     upcoming_events = Event.objects.filter(
@@ -45,7 +91,7 @@ def home(request):
         'total_events': Event.objects.count(),
         'active_events': Event.objects.filter(status__in=['upcoming', 'ongoing']).count(),
         'total_students': User.objects.filter(role='student').count(),
-        'total_attendance': AttendanceRecord.objects.count(),
+        'total_attendance': archive.attendance_count(),
     }
     
     context = {
@@ -142,7 +188,7 @@ def dashboard(request):
         return redirect('home')
 
 @login_required
-@user_passes_test(is_admin)
+@replica_reads
 def admin_dashboard(request):
     """Admin dashboard view"""
     today = timezone.now().date()
@@ -156,7 +202,8 @@ def admin_dashboard(request):
     today_attendance = AttendanceRecord.objects.filter(marked_at__date=today).count()
     week_attendance = AttendanceRecord.objects.filter(marked_at__date__gte=week_ago).count()
     month_attendance = AttendanceRecord.objects.filter(marked_at__date__gte=month_ago).count()
-    pending_registrations = EventRegistration.objects.filter(attended=False).count()
+    totals = Event.objects.aggregate(registered=Sum('current_participants'), attended=Sum('attended_count'))
+    pending_registrations = (totals['registered'] or 0) - (totals['attended'] or 0)
     
     stats = {
         'total_events': total_events,
@@ -196,14 +243,12 @@ def admin_dashboard(request):
     return render(request, 'admin_dashboard.html', context)
 
 @login_required
-@user_passes_test(is_student)
 def student_dashboard(request):
     """Student dashboard view"""
     student = request.user
     today = timezone.now().date()
     
-    registered_events = EventRegistration.objects.filter(student=student).count()
-    attended_events = EventRegistration.objects.filter(student=student, attended=True).count()
+    registered_events, attended_events = counters.student_counts(student.pk)
     upcoming_registered = EventRegistration.objects.filter(
         student=student,
         event__date__gte=today,
@@ -236,8 +281,7 @@ def student_dashboard(request):
         student=student
     ).select_related('event').order_by('-marked_at')[:5]
     
-    all_notifications = Notification.objects.filter(user=student).order_by('-created_at')
-    unread_count = all_notifications.filter(is_read=False).count()
+    recent_notifications, _ = notifications.page(student, size=5)
     
     context = {
         'student': student,
@@ -245,9 +289,9 @@ def student_dashboard(request):
         'upcoming_events': upcoming_events,
         'recent_attendance': recent_attendance,
         'notifications': {
-            'count': all_notifications.count(),
-            'unread': unread_count,
-            'recent': all_notifications[:5]
+            'count': notifications.feed_count(student),
+            'unread': notifications.unread_count(student),
+            'recent': recent_notifications
         },
     }
     return render(request, 'student_dashboard.html', context)
@@ -291,21 +335,25 @@ def events_list(request):
     else:
         events = events.order_by('-date', '-start_time')
     
-    total_events = Event.objects.count()
-    upcoming_count = Event.objects.filter(status='upcoming').count()
-    ongoing_count = Event.objects.filter(status='ongoing').count()
-    total_participants = EventRegistration.objects.count()
+    stats = event_stats(lambda: {
+        'total_events': Event.objects.count(),
+        'upcoming_count': Event.objects.filter(status='upcoming').count(),
+        'ongoing_count': Event.objects.filter(status='ongoing').count(),
+        'completed_count': Event.objects.filter(status='completed').count(),
+        'total_participants': EventRegistration.objects.count(),
+        'pending_approvals': EventRegistration.objects.filter(attended=False).count(),
+    })
     
     if request.user.role == 'student':
-        user_registered_count = EventRegistration.objects.filter(
-            student=request.user
-        ).count()
+        registered_ids = lifecycle.registered_event_ids(request.user.pk)
+        user_registered_count = len(registered_ids)
     else:
+        registered_ids = frozenset()
         user_registered_count = 0
     
     if request.user.role in ['admin', 'organizer']:
-        completed_count = Event.objects.filter(status='completed').count()
-        pending_approvals = EventRegistration.objects.filter(attended=False).count()
+        completed_count = stats['completed_count']
+        pending_approvals = stats['pending_approvals']
     else:
         completed_count = 0
         pending_approvals = 0
@@ -322,9 +370,7 @@ def events_list(request):
         events_page = paginator.page(paginator.num_pages)
     
     for event in events_page:
-        event.is_registered = EventRegistration.objects.filter(
-            event=event, student=request.user
-        ).exists()
+        event.is_registered = event.pk in registered_ids
         
         if event.max_participants > 0:
             event.participation_percentage = min(
@@ -349,10 +395,10 @@ def events_list(request):
         'events': events_page,
         'categories': Event.CATEGORY_CHOICES,
         'statuses': Event.STATUS_CHOICES,
-        'total_events': total_events,
-        'upcoming_count': upcoming_count,
-        'ongoing_count': ongoing_count,
-        'total_participants': total_participants,
+        'total_events': stats['total_events'],
+        'upcoming_count': stats['upcoming_count'],
+        'ongoing_count': stats['ongoing_count'],
+        'total_participants': stats['total_participants'],
         'user_registered_count': user_registered_count,
         'completed_count': completed_count,
         'pending_approvals': pending_approvals,
@@ -363,12 +409,15 @@ def events_list(request):
 def event_detail(request, event_id):
     """Event detail view"""
     event = get_object_or_404(Event, event_id=event_id)
-    is_registered = EventRegistration.objects.filter(event=event, student=request.user).exists()
-    registration = EventRegistration.objects.filter(event=event, student=request.user).first()
+    is_registered = request.user.role == 'student' and lifecycle.is_registered(event.pk, request.user.pk)
+    registration = (
+        EventRegistration.objects.filter(event=event, student=request.user).first()
+        if is_registered else None
+    )
     
     attendees = EventRegistration.objects.filter(event=event, attended=True).select_related('student')
     
-    can_edit = (request.user.role == 'admin') or (request.user == event.organizer)
+    can_edit = (request.user.role == 'admin') or (request.user.pk == event.organizer_id)
     
     context = {
         'event': event,
@@ -380,7 +429,6 @@ def event_detail(request, event_id):
     return render(request, 'event_detail.html', context)
 
 @login_required
-@user_passes_test(is_admin)
 def create_event(request):
     """Create new event"""
     if request.method == 'POST':
@@ -392,7 +440,7 @@ def create_event(request):
             
             if not event.qr_secret:
                 event.qr_secret = secrets.token_urlsafe(32)
-                event.save()
+                event.save(update_fields=['qr_secret', 'updated_at'])
             
             messages.success(request, f'Event "{event.title}" created successfully!')
             return redirect('event_detail', event_id=event.event_id)
@@ -412,24 +460,28 @@ def register_event(request, event_id):
     event = get_object_or_404(Event, event_id=event_id)
     
     if request.user.role != 'student':
+        metrics.registrations.inc(outcome='not_student')
         messages.error(request, 'Only students can register for events.')
         return redirect('event_detail', event_id=event_id)
     
     if EventRegistration.objects.filter(event=event, student=request.user).exists():
+        metrics.registrations.inc(outcome='duplicate')
         messages.warning(request, 'You are already registered for this event.')
         return redirect('event_detail', event_id=event_id)
     
-    if not event.can_register:
-        messages.error(request, 'Cannot register for this event.')
-        return redirect('event_detail', event_id=event_id)
-    
     if event.is_full:
+        metrics.registrations.inc(outcome='full')
         messages.error(request, 'This event is full. Registration closed.')
         return redirect('event_detail', event_id=event_id)
     
+    if not event.can_register:
+        metrics.registrations.inc(outcome='closed')
+        messages.error(request, 'Cannot register for this event.')
+        return redirect('event_detail', event_id=event_id)
+    
+    # current_participants follows through core.signals
     EventRegistration.objects.create(event=event, student=request.user)
-    event.current_participants += 1
-    event.save()
+    metrics.registrations.inc(outcome='registered')
     
     Notification.objects.create(
         user=request.user,
@@ -448,22 +500,18 @@ def attendance_view(request):
     """Main attendance page - WORKING VERSION"""
     today = timezone.now().date()
     now = timezone.now()
+    live_ids = lifecycle.live_event_ids()
     
     # Get ongoing events
-    ongoing_events = Event.objects.filter(
-        status='ongoing',
-        date=today,
-        start_time__lte=now.time(),
-        end_time__gte=now.time()
-    ).select_related('organizer')
+    ongoing_events = Event.objects.filter(pk__in=live_ids).select_related('organizer')
     
     if request.user.role == 'student':
         # Student specific logic
         my_events = Event.objects.filter(
-            registrations__student=request.user,
+            pk__in=lifecycle.registered_event_ids(request.user.pk),
             date=today,
             status__in=['ongoing', 'upcoming']
-        ).select_related('organizer').distinct()
+        ).select_related('organizer')
         
         for event in my_events:
             event.attendance_marked = AttendanceRecord.objects.filter(
@@ -475,9 +523,8 @@ def attendance_view(request):
                 student=request.user
             ).first()
             event.can_mark_attendance = (
-                event.status == 'ongoing' and 
+                event.pk in live_ids and
                 not event.attendance_marked and
-                event.start_time <= now.time() <= event.end_time and
                 event.registration is not None
             )
     else:
@@ -581,16 +628,7 @@ def mark_manual_attendance(request):
         try:
             event = Event.objects.get(event_id=event_code)
             
-            current_time = timezone.now().time()
-            today = timezone.now().date()
-            
-            is_active = (
-                event.status == 'ongoing' and 
-                event.date == today and
-                event.start_time <= current_time <= event.end_time
-            )
-            
-            if not is_active:
+            if not event.is_active_for_attendance:
                 messages.error(request, 'Event not active for attendance')
                 return redirect('attendance')
             
@@ -611,6 +649,7 @@ def mark_manual_attendance(request):
                 device_info=request.META.get('HTTP_USER_AGENT', 'Unknown')[:200],
                 verified=True
             )
+            metrics.checkins.inc(method='manual')
             
             registration.attended = True
             registration.attendance_time = timezone.now()
@@ -646,7 +685,7 @@ def mark_manual_attendance(request):
     return redirect('attendance')
 
 @login_required
-def mark_qr_attendance(request):
+async def mark_qr_attendance(request):
     """Handle QR code attendance marking"""
     if request.method == 'POST' and request.headers.get('X-Requested-With') == 'XMLHttpRequest':
         try:
@@ -658,82 +697,75 @@ def mark_qr_attendance(request):
             
             try:
                 # Try event ID directly
-                event = Event.objects.get(event_id=qr_data)
+                event = await Event.objects.aget(event_id=qr_data)
             except Event.DoesNotExist:
+                metrics.checkin_rejections.inc(reason='invalid_qr')
                 return JsonResponse({'success': False, 'message': 'Invalid QR code'})
             
             # Check if user is a student
-            if request.user.role != 'student':
+            user = await request.auser()
+            if user.role != 'student':
                 return JsonResponse({
                     'success': False, 
                     'message': 'Only students can mark attendance via QR'
                 })
             
-            current_time = timezone.now().time()
-            today = timezone.now().date()
-            
             # Check if event is active
-            is_active = (
-                event.status == 'ongoing' and 
-                event.date == today and
-                event.start_time <= current_time <= event.end_time
-            )
-            
-            if not is_active:
+            if not await sync_to_async(lifecycle.is_live)(event):
+                metrics.checkin_rejections.inc(reason='inactive')
                 return JsonResponse({
                     'success': False, 
                     'message': 'Event is not active for attendance'
                 })
             
-            # Check if student is registered
-            try:
-                registration = EventRegistration.objects.get(
-                    event=event,
-                    student=request.user
-                )
-            except EventRegistration.DoesNotExist:
+            # Check if student is registered, from the roster warmed when the event went live or the database
+            registration_pk = await sync_to_async(lifecycle.registration_of)(event.pk, user.pk)
+            if registration_pk is None:
+                metrics.checkin_rejections.inc(reason='not_registered')
                 return JsonResponse({
                     'success': False, 
                     'message': 'You are not registered for this event'
                 })
             
             # Check if attendance already marked
-            if AttendanceRecord.objects.filter(event=event, student=request.user).exists():
+            if await AttendanceRecord.objects.filter(event=event, student=user).aexists():
+                metrics.checkin_rejections.inc(reason='duplicate')
                 return JsonResponse({
                     'success': False, 
                     'message': 'Attendance already marked for this event'
                 })
             
             # Mark attendance
-            attendance = AttendanceRecord.objects.create(
+            attendance = await AttendanceRecord.objects.acreate(
                 event=event,
-                student=request.user,
-                registration=registration,
+                student=user,
+                registration_id=registration_pk,
                 method='qr',
                 device_info=request.META.get('HTTP_USER_AGENT', 'Unknown')[:200],
                 verified=True
             )
+            metrics.checkins.inc(method='qr')
             
             # Update registration
-            registration.attended = True
-            registration.attendance_time = timezone.now()
-            registration.save()
+            await EventRegistration.objects.filter(pk=registration_pk).aupdate(
+                attended=True, attendance_time=timezone.now()
+            )
             
             # Send notifications
-            Notification.objects.create(
-                user=request.user,
+            await Notification.objects.acreate(
+                user=user,
                 notification_type='attendance',
                 title='Attendance Marked',
                 message=f'Your attendance has been marked for "{event.title}"',
                 related_event=event
             )
             
-            if event.organizer and event.organizer != request.user:
-                Notification.objects.create(
-                    user=event.organizer,
+            if event.organizer_id and event.organizer_id != user.pk:
+                await Notification.objects.acreate(
+                    user_id=event.organizer_id,
                     notification_type='event',
                     title='Attendance Recorded',
-                    message=f'{request.user.get_full_name()} marked attendance for "{event.title}"',
+                    message=f'{user.get_full_name()} marked attendance for "{event.title}"',
                     related_event=event
                 )
             
@@ -752,11 +784,154 @@ def mark_qr_attendance(request):
             
         except Event.DoesNotExist:
             return JsonResponse({'success': False, 'message': 'Invalid or expired QR code'})
+        except IntegrityError:
+            # Another check-in for the same student won the race
+            metrics.checkin_rejections.inc(reason='duplicate')
+            return JsonResponse({'success': False, 'message': 'Attendance already marked for this event'})
+        except OperationalError as e:
+            return _database_busy(e)
         except Exception as e:
             return JsonResponse({'success': False, 'message': f'Error: {str(e)}'})
     
     return JsonResponse({'success': False, 'message': 'Invalid request method'})
 
+def _offline_scans(scans, student_pk):
+    """Checkins for queued scans that pass the per-scan checks, and {key: rejection} for the rest"""
+    codes = {scan.get('qr_data') for scan in scans if isinstance(scan, dict)}
+    events = {event.event_id: event for event in Event.objects.filter(event_id__in=[c for c in codes if isinstance(c, str)])}
+    now = timezone.now()
+    oldest = now - timedelta(hours=getattr(settings, 'OFFLINE_SCAN_MAX_AGE_HOURS', 24))
+    grace = timedelta(minutes=getattr(settings, 'OFFLINE_SYNC_GRACE_MINUTES', 60))
+    accepted, rejected = [], {}
+    for index, scan in enumerate(scans):
+        if not isinstance(scan, dict):
+            rejected[str(index)] = ('invalid_qr', 'Malformed scan')
+            continue
+        key = str(scan.get('id') or index)
+        event = events.get(scan.get('qr_data'))
+        try:
+            scanned_at = parse_datetime(str(scan.get('scanned_at') or ''))
+        except ValueError:
+            scanned_at = None
+        if event is None:
+            rejected[key] = ('invalid_qr', 'Invalid QR code')
+            continue
+        if scanned_at is None:
+            rejected[key] = ('invalid_time', 'Missing or malformed scan time')
+            continue
+        if timezone.is_naive(scanned_at):
+            scanned_at = timezone.make_aware(scanned_at)
+        # A minute of clock skew either way, and nothing older than the sync window
+        if not oldest <= scanned_at <= now + timedelta(minutes=1):
+            rejected[key] = ('invalid_time', 'Scan time out of range')
+        elif not checkins.within_event(event, min(scanned_at, now)):
+            rejected[key] = ('inactive', 'Event was not active at scan time')
+        # The scan time comes from the client, a finished event only takes scans synced soon after it ends
+        elif event.status == 'completed' and now > timezone.make_aware(
+            datetime.combine(event.date, event.end_time)
+        ) + grace:
+            rejected[key] = ('inactive', 'Event ended too long ago to sync this scan')
+        else:
+            accepted.append(checkins.Checkin(key, event, student_pk, min(scanned_at, now)))
+    return accepted, rejected
+
+@login_required
+@require_POST
+def sync_qr_attendance(request):
+    """Replay QR scans the scanner queued while offline, in one transaction"""
+    if request.user.role != 'student':
+        return JsonResponse({'success': False, 'message': 'Only students can mark attendance via QR'}, status=403)
+    try:
+        scans = json.loads(request.body).get('scans')
+    except (ValueError, AttributeError):
+        scans = None
+    if not isinstance(scans, list) or not scans:
+        return JsonResponse({'success': False, 'message': 'No scans provided'}, status=400)
+    limit = getattr(settings, 'OFFLINE_SYNC_MAX_BATCH', 200)
+    if len(scans) > limit:
+        return JsonResponse({'success': False, 'message': f'At most {limit} scans per sync'}, status=413)
+    
+    accepted, rejected = _offline_scans(scans, request.user.pk)
+    results = {}
+    for key, (reason, message) in rejected.items():
+        metrics.checkin_rejections.inc(reason=reason)
+        results[key] = (checkins.REJECTED, message)
+    try:
+        # Left unverified for the organizer to review, the scan time is the client's word
+        results.update(checkins.commit(
+            accepted, method='qr', verified=False,
+            device_info=f"Offline sync: {request.META.get('HTTP_USER_AGENT', 'Unknown')}",
+        ))
+    except OperationalError as e:
+        return _database_busy(e)
+    
+    # Every scan gets a final answer, the scanner drops them all from its queue
+    body = [
+        {'id': key, 'status': status, 'message': detail}
+        for key, (status, detail) in results.items()
+    ]
+    marked = sum(1 for status, _ in results.values() if status == checkins.MARKED)
+    return JsonResponse({
+        'success': True,
+        'message': f'{marked} of {len(scans)} offline scan{"s" if len(scans) != 1 else ""} marked',
+        'results': body,
+    })
+
+@login_required
+@require_POST
+def kiosk_checkin(request, event_id):
+    """Check in a student from their personal QR at an organizer's door kiosk"""
+    if request.user.role not in ('admin', 'organizer'):
+        return JsonResponse({'success': False, 'message': 'Only organizers can run a kiosk'}, status=403)
+    door = kiosk.buffer.door(event_id)
+    if door is None:
+        return JsonResponse({'success': False, 'message': 'Event not found'}, status=404)
+    if request.user.role == 'organizer' and door.event.organizer_id != request.user.pk:
+        return JsonResponse({'success': False, 'message': 'Permission denied for this event'}, status=403)
+    try:
+        student_pk = kiosk.identity(json.loads(request.body).get('qr_data'))
+    except (ValueError, AttributeError):
+        student_pk = None
+    if student_pk is None:
+        metrics.checkin_rejections.inc(reason='invalid_qr')
+        return JsonResponse({'success': False, 'message': 'Not a student QR code'}, status=400)
+    
+    try:
+        status, message = kiosk.buffer.admit(door, student_pk)
+    except OperationalError as e:
+        return _database_busy(e)
+    # Committed by the kiosk flush thread within KIOSK_FLUSH_INTERVAL
+    return JsonResponse({'success': status == checkins.MARKED, 'status': status, 'message': message})
+
+@login_required
+def kiosk_status(request, event_id):
+    """Check-ins queued by the kiosks and the ones that failed to commit"""
+    if request.user.role not in ('admin', 'organizer'):
+        return JsonResponse({'success': False, 'message': 'Only organizers can run a kiosk'}, status=403)
+    door = kiosk.buffer.door(event_id)
+    if door is None:
+        return JsonResponse({'success': False, 'message': 'Event not found'}, status=404)
+    if request.user.role == 'organizer' and door.event.organizer_id != request.user.pk:
+        return JsonResponse({'success': False, 'message': 'Permission denied for this event'}, status=403)
+    
+    failed = kiosk.failures(door.event.pk)
+    students = User.objects.filter(pk__in=failed).only('pk', 'first_name', 'last_name', 'username', 'student_id').in_bulk()
+    return JsonResponse({
+        'success': True,
+        'checked_in': Event.objects.filter(pk=door.event.pk).values_list('attended_count', flat=True).first(),
+        'pending': kiosk.buffer.pending(door.event.pk),
+        'failed': [
+            {
+                'user_id': student_pk,
+                'student_id': students[student_pk].student_id if student_pk in students else '',
+                'name': students[student_pk].get_full_name() if student_pk in students else '',
+                'scanned_at': scanned_at.isoformat(),
+                'message': message,
+            }
+            for student_pk, (scanned_at, message) in sorted(failed.items(), key=lambda item: item[1][0])
+        ],
+    })
+
 @login_required
 def quick_manual_attendance(request):
     """Quick manual attendance for students"""
@@ -780,16 +955,7 @@ def quick_manual_attendance(request):
                 return JsonResponse({'success': False, 'message': 'Event not found'})
             
             # Check if event is active
-            current_time = timezone.now().time()
-            today = timezone.now().date()
-            
-            is_active = (
-                event.status == 'ongoing' and 
-                event.date == today and
-                event.start_time <= current_time <= event.end_time
-            )
-            
-            if not is_active:
+            if not event.is_active_for_attendance:
                 return JsonResponse({
                     'success': False, 
                     'message': 'Event is not active for attendance'
@@ -823,6 +989,7 @@ def quick_manual_attendance(request):
                 device_info=request.META.get('HTTP_USER_AGENT', 'Unknown')[:200],
                 verified=True
             )
+            metrics.checkins.inc(method='manual')
             
             registration.attended = True
             registration.attendance_time = timezone.now()
@@ -851,6 +1018,8 @@ def quick_manual_attendance(request):
             
         except json.JSONDecodeError:
             return JsonResponse({'success': False, 'message': 'Invalid request data'})
+        except OperationalError as e:
+            return _database_busy(e)
         except Exception as e:
             return JsonResponse({'success': False, 'message': f'Error: {str(e)}'})
     
@@ -878,26 +1047,8 @@ def generate_personal_qr(request):
             }
             
             # Generate QR code
-            import qrcode
-            from io import BytesIO
-            import base64
-            
-            qr = qrcode.QRCode(
-                version=1,
-                error_correction=qrcode.constants.ERROR_CORRECT_L,
-                box_size=10,
-                border=4,
-            )
-            qr.add_data(json.dumps(student_data))
-            qr.make(fit=True)
-            
-            img = qr.make_image(fill_color="black", back_color="white")
-            
-            # Convert to base64
-            buffer = BytesIO()
-            img.save(buffer, format="PNG")
-            buffer.seek(0)
-            qr_base64 = base64.b64encode(buffer.getvalue()).decode()
+            with metrics.qr_generation.time(view='generate_personal_qr'):
+                qr_base64 = qr_png_base64(json.dumps(student_data))
             
             return JsonResponse({
                 'success': True,
@@ -914,7 +1065,7 @@ def generate_personal_qr(request):
 def attendance_details(request, attendance_id):
     """Get detailed attendance information"""
     try:
-        attendance = AttendanceRecord.objects.get(attendance_id=attendance_id)
+        attendance = archive.find_attendance(attendance_id=attendance_id)
         
         if not (request.user.role in ['admin', 'organizer'] or attendance.student == request.user):
             return JsonResponse({'success': False, 'message': 'Permission denied'})
@@ -957,9 +1108,8 @@ def attendance_details(request, attendance_id):
 def attendance_history(request):
     """Return attendance history for modal"""
     student = request.user
-    attendance_records = AttendanceRecord.objects.filter(
-        student=student
-    ).select_related('event').order_by('-marked_at')
+    # Past semesters live in the archive tables
+    attendance_records = archive.attendance_history(student)
     
     from collections import defaultdict
     monthly_data = defaultdict(list)
@@ -971,7 +1121,7 @@ def attendance_history(request):
     context = {
         'attendance_records': attendance_records,
         'monthly_data': dict(monthly_data),
-        'total_count': attendance_records.count(),
+        'total_count': len(attendance_records),
     }
     
     if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
@@ -980,11 +1130,10 @@ def attendance_history(request):
     return render(request, 'student/attendance_history.html', context)
 
 @login_required
-@user_passes_test(is_student)
 def generate_certificate(request, attendance_id):
     """Generate attendance certificate PDF"""
     try:
-        attendance = AttendanceRecord.objects.get(attendance_id=attendance_id)
+        attendance = archive.find_attendance(attendance_id=attendance_id)
         
         # Check permissions
         if not (request.user == attendance.student or request.user.role == 'admin'):
@@ -1069,31 +1218,21 @@ def generate_certificate(request, attendance_id):
         return redirect('attendance')
 
 @login_required
-def get_ongoing_events(request):
+@poll_etag(_ongoing_events_etag)
+async def get_ongoing_events(request):
     """Get ongoing events for attendance page"""
-    today = timezone.now().date()
-    now = timezone.now()
-    
-    if request.user.role == 'student':
+    user = await request.auser()
+    if user.role == 'student':
         # Get events student is registered for
-        ongoing_events = Event.objects.filter(
-            registrations__student=request.user,
-            status='ongoing',
-            date=today,
-            start_time__lte=now.time(),
-            end_time__gte=now.time()
-        ).distinct()
+        live_ids = await sync_to_async(lifecycle.live_event_ids_for)(user.pk)
     else:
         # Admin/Organizer sees all ongoing events
-        ongoing_events = Event.objects.filter(
-            status='ongoing',
-            date=today,
-            start_time__lte=now.time(),
-            end_time__gte=now.time()
-        )
+        live_ids = await sync_to_async(lifecycle.live_event_ids)()
+    
+    ongoing_events = Event.objects.filter(pk__in=live_ids) if live_ids else Event.objects.none()
     
     events_data = []
-    for event in ongoing_events:
+    async for event in ongoing_events:
         events_data.append({
             'id': event.event_id,
             'title': event.title,
@@ -1107,25 +1246,28 @@ def get_ongoing_events(request):
 # In views.py, update the get_recent_attendance function
 # In views.py - FINAL FIXED VERSION of get_recent_attendance
 @login_required
-def get_recent_attendance(request):
+@poll_etag(_attendance_etag)
+async def get_recent_attendance(request):
     """Get recent attendance for AJAX updates - SIMPLIFIED BULLETPROOF VERSION"""
     try:
+        user = await request.auser()
         # Get attendance records based on user role
-        if request.user.role == 'admin':
+        if user.role == 'admin':
             recent = AttendanceRecord.objects.select_related(
                 'event', 'student'
             ).order_by('-marked_at')[:10]
-        elif request.user.role == 'organizer':
+        elif user.role == 'organizer':
             recent = AttendanceRecord.objects.filter(
-                event__organizer=request.user
+                event__organizer=user
             ).select_related('event', 'student').order_by('-marked_at')[:10]
         else:
+            # student is read below, lazy loading it is not allowed in async code
             recent = AttendanceRecord.objects.filter(
-                student=request.user
-            ).select_related('event').order_by('-marked_at')[:10]
+                student=user
+            ).select_related('event', 'student').order_by('-marked_at')[:10]
         
         attendance_data = []
-        for record in recent:
+        async for record in recent:
             # SIMPLE datetime handling - no complex comparisons
             marked_at_str = ""
             date_str = ""
@@ -1173,7 +1315,6 @@ def get_recent_attendance(request):
         
 # ========== MISSING FUNCTIONS FROM URLS ==========
 @login_required
-@user_passes_test(lambda u: u.role in ['admin', 'organizer'])
 def toggle_attendance_verification(request, attendance_id):
     """Toggle attendance verification status"""
     if request.method == 'POST' and request.headers.get('X-Requested-With') == 'XMLHttpRequest':
@@ -1202,7 +1343,6 @@ def toggle_attendance_verification(request, attendance_id):
     return JsonResponse({'success': False, 'message': 'Invalid request'})
 
 @login_required
-@user_passes_test(lambda u: u.role in ['admin', 'organizer'])
 def generate_event_qr(request, event_id):
     """Generate QR code for an event"""
     try:
@@ -1213,25 +1353,12 @@ def generate_event_qr(request, event_id):
         
         if not event.qr_secret:
             event.qr_secret = secrets.token_urlsafe(32)
-            event.save()
+            event.save(update_fields=['qr_secret', 'updated_at'])
         
         qr_data = f"{event.event_id}|{event.qr_secret}"
         
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=4,
-        )
-        qr.add_data(qr_data)
-        qr.make(fit=True)
-        
-        img = qr.make_image(fill_color="black", back_color="white")
-        
-        buffer = io.BytesIO()
-        img.save(buffer, format="PNG")
-        buffer.seek(0)
-        qr_base64 = base64.b64encode(buffer.getvalue()).decode()
+        with metrics.qr_generation.time(view='generate_event_qr'):
+            qr_base64 = qr_png_base64(qr_data)
         
         Notification.objects.create(
             user=request.user,
@@ -1257,7 +1384,6 @@ def generate_event_qr(request, event_id):
         return JsonResponse({'success': False, 'message': str(e)})
 
 @login_required
-@user_passes_test(lambda u: u.role in ['admin', 'organizer'])
 def admin_generate_qr(request):
     """Admin QR code generation page"""
     if request.user.role == 'organizer':
@@ -1272,29 +1398,26 @@ def admin_generate_qr(request):
     return render(request, 'crud/generate_qr.html', context)
 
 @login_required
-@user_passes_test(lambda u: u.role == 'admin' or u.is_staff)
+@replica_reads
 def attendance_list(request):
     """List all attendance records (admin only)"""
-    if not (request.user.role == 'admin' or request.user.is_staff):
-        messages.error(request, 'You do not have permission to view this page.')
-        return redirect('dashboard')
-    
-    attendance_records = AttendanceRecord.objects.all().select_related('event', 'student').order_by('-marked_at')
-    
     # Filters
     event_id = request.GET.get('event')
     student_id = request.GET.get('student')
     method = request.GET.get('method')
     verified = request.GET.get('verified')
     
+    lookup = {}
     if event_id:
-        attendance_records = attendance_records.filter(event__event_id=event_id)
+        lookup['event__event_id'] = event_id
     if student_id:
-        attendance_records = attendance_records.filter(student__student_id=student_id)
+        lookup['student__student_id'] = student_id
     if method:
-        attendance_records = attendance_records.filter(method=method)
+        lookup['method'] = method
     if verified:
-        attendance_records = attendance_records.filter(verified=(verified == 'true'))
+        lookup['verified'] = verified == 'true'
+    # Both the hot table and the archive of past semesters
+    attendance_records = archive.attendance(**lookup)
     
     # Get filter options
     events = Event.objects.all()
@@ -1309,7 +1432,6 @@ def attendance_list(request):
     return render(request, 'crud/attendance_list.html', context)
 
 @login_required
-@user_passes_test(lambda u: u.role == 'admin' or u.is_staff)
 def update_attendance(request, attendance_id):
     """Update attendance record (admin only)"""
     attendance = get_object_or_404(AttendanceRecord, attendance_id=attendance_id)
@@ -1339,7 +1461,6 @@ def update_attendance(request, attendance_id):
     return render(request, 'crud/attendance_form.html', context)
 
 @login_required
-@user_passes_test(lambda u: u.role == 'admin' or u.is_staff)
 def delete_attendance(request, attendance_id):
     """Delete attendance record (admin only)"""
     attendance = get_object_or_404(AttendanceRecord, attendance_id=attendance_id)
@@ -1358,27 +1479,25 @@ def delete_attendance(request, attendance_id):
 
 # ========== OTHER NECESSARY FUNCTIONS ==========
 @login_required
-def attendance_stats(request):
+@poll_etag(_attendance_etag)
+async def attendance_stats(request):
     """Get attendance statistics for AJAX updates - FIXED VERSION"""
-    if request.user.is_authenticated:
-        if request.user.role == 'student':
+    user = await request.auser()
+    if user.is_authenticated:
+        if user.role == 'student':
             # Get actual attendance records count
-            total_attendance = AttendanceRecord.objects.filter(
-                student=request.user
-            ).count()
-            
-            # Calculate on-time count safely
-            from django.db.models import Q, F
-            from datetime import timedelta
+            total_attendance = await AttendanceRecord.objects.filter(
+                student=user
+            ).acount()
             
             on_time_count = 0
             try:
                 # Get all attendance records for student
                 attendances = AttendanceRecord.objects.filter(
-                    student=request.user
+                    student=user
                 ).select_related('event')
                 
-                for attendance in attendances:
+                async for attendance in attendances:
                     if attendance.marked_at and attendance.event.start_time:
                         # Calculate if marked within 15 minutes of start
                         event_start = datetime.combine(
@@ -1401,18 +1520,19 @@ def attendance_stats(request):
             
             # Calculate streak
             today = timezone.now().date()
-            attendance_dates = AttendanceRecord.objects.filter(
-                student=request.user
-            ).dates('marked_at', 'day').order_by('-marked_at')
+            attendance_dates = [
+                att_date async for att_date in AttendanceRecord.objects.filter(
+                    student=user
+                ).dates('marked_at', 'day', order='DESC')
+            ]
             
             streak_count = 0
-            if attendance_dates.exists():
-                current_date = today
-                for i, att_date in enumerate(attendance_dates):
-                    if att_date == current_date - timedelta(days=i):
-                        streak_count += 1
-                    else:
-                        break
+            current_date = today
+            for i, att_date in enumerate(attendance_dates):
+                if att_date == current_date - timedelta(days=i):
+                    streak_count += 1
+                else:
+                    break
             
             return JsonResponse({
                 'success': True,
@@ -1424,10 +1544,10 @@ def attendance_stats(request):
             })
         else:
             # Admin stats - simplified
-            total_attendance = AttendanceRecord.objects.count()
-            today_attendance = AttendanceRecord.objects.filter(
+            total_attendance = await AttendanceRecord.objects.acount()
+            today_attendance = await AttendanceRecord.objects.filter(
                 marked_at__date=timezone.now().date()
-            ).count()
+            ).acount()
             
             return JsonResponse({
                 'success': True,
@@ -1496,7 +1616,7 @@ def profile_view(request):
     if request.method == 'POST':
         form = ProfileUpdateForm(request.POST, request.FILES, instance=request.user)
         if form.is_valid():
-            form.save()
+            counters.save_keeping_counters(form.save(commit=False))
             messages.success(request, 'Profile updated successfully!')
             return redirect('profile')
     else:
@@ -1505,15 +1625,14 @@ def profile_view(request):
     stats = {}
     if request.user.role == 'student':
         try:
-            stats['registered_events'] = EventRegistration.objects.filter(student=request.user).count()
-            stats['attended_events'] = EventRegistration.objects.filter(student=request.user, attended=True).count()
+            stats['registered_events'], stats['attended_events'] = counters.student_counts(request.user.pk)
             if stats['registered_events'] > 0:
                 stats['attendance_rate'] = round((stats['attended_events'] / stats['registered_events']) * 100, 1)
             else:
                 stats['attendance_rate'] = 0
-            stats['notifications'] = Notification.objects.filter(user=request.user, is_read=False).count()
+            stats['notifications'] = notifications.unread_count(request.user)
         except Exception as e:
-            print(f"Error calculating stats: {e}")
+            logger.exception("Error calculating profile stats for %s", request.user.pk)
             stats = {}
     
     context = {'form': form, 'stats': stats}
@@ -1522,19 +1641,21 @@ def profile_view(request):
 @login_required
 def notifications_view(request):
     """Notifications view"""
-    notifications = Notification.objects.filter(user=request.user).order_by('-created_at')
-    
     if request.method == 'POST' and request.POST.get('action') == 'mark_all_read':
-        notifications.update(is_read=True)
+        # Moves the read watermark, one row however long the feed is
+        notifications.mark_all_read(request.user)
         messages.success(request, 'All notifications marked as read.')
         return redirect('notifications')
     
-    context = {'notifications': notifications}
+    cursor = request.GET.get('before')
+    page, next_cursor = notifications.page(request.user, cursor)
+    
+    context = {'notifications': page, 'next_cursor': next_cursor, 'cursor': cursor}
     return render(request, 'notifications.html', context)
 
 # ========== REPORTS VIEWS ==========
 @login_required
-@user_passes_test(is_admin)
+@replica_reads
 def reports_view(request):
     """Reports dashboard"""
     today = timezone.now().date()
@@ -1547,7 +1668,7 @@ def reports_view(request):
     }
     
     overall_stats = {
-        'total_attendance': AttendanceRecord.objects.count(),
+        'total_attendance': archive.attendance_count(),
         'total_events': Event.objects.count(),
         'total_students': User.objects.filter(role='student').count(),
     }
@@ -1563,6 +1684,7 @@ def reports_view(request):
     return render(request, 'reports.html', context)
 
 @login_required
+@replica_reads
 def report_detail(request, report_id):
     """View report details"""
     report = get_object_or_404(Report, report_id=report_id)
@@ -1576,7 +1698,7 @@ def report_detail(request, report_id):
 
 # ========== USER MANAGEMENT ==========
 @login_required
-@user_passes_test(lambda u: u.role == 'admin' or u.is_staff)
+@replica_reads
 def user_list(request):
     """List all users (Admin only)"""
     users = User.objects.all().order_by('-date_joined')
@@ -1598,26 +1720,27 @@ def user_list(request):
     return render(request, 'crud/user_list.html', context)
 
 @login_required
-@user_passes_test(lambda u: u.role == 'admin' or u.is_staff)
 def user_detail(request, user_id):
     """View user details (Admin only)"""
     user = get_object_or_404(User, id=user_id)
     
     stats = {}
     if user.role == 'student':
-        stats['registered_events'] = EventRegistration.objects.filter(student=user).count()
-        stats['attended_events'] = EventRegistration.objects.filter(student=user, attended=True).count()
-        stats['attendance_records'] = AttendanceRecord.objects.filter(student=user).count()
+        stats['registered_events'] = user.registered_count
+        stats['attended_events'] = user.attended_count
+        stats['attendance_records'] = archive.attendance_count(student=user)
     
     context = {'user_profile': user, 'stats': stats}
     return render(request, 'crud/user_detail.html', context)
 
 # ========== API VIEWS ==========
-def get_notifications(request):
+@poll_etag(_notifications_etag)
+async def get_notifications(request):
     """Get user notifications"""
-    if request.user.is_authenticated:
-        unread_count = Notification.objects.filter(user=request.user, is_read=False).count()
-        latest = Notification.objects.filter(user=request.user).order_by('-created_at').first()
+    user = await request.auser()
+    if user.is_authenticated:
+        unread_count = await sync_to_async(notifications.unread_count)(user)
+        latest = await sync_to_async(notifications.latest)(user)
         
         return JsonResponse({
             'unread_count': unread_count,
@@ -1629,16 +1752,12 @@ def get_notifications(request):
         })
     return JsonResponse({'unread_count': 0})
 
+@poll_etag(_attendance_etag)
 def get_attendance_stats(request):
     """Get attendance statistics"""
     if request.user.is_authenticated:
         if request.user.role == 'student':
-            attended_events = EventRegistration.objects.filter(
-                student=request.user, attended=True
-            ).count()
-            total_registered = EventRegistration.objects.filter(
-                student=request.user
-            ).count()
+            total_registered, attended_events = counters.student_counts(request.user.pk)
             attendance_rate = round((attended_events / total_registered) * 100, 1) if total_registered > 0 else 0
             
             return JsonResponse({
@@ -1658,29 +1777,65 @@ def get_attendance_stats(request):
             })
     return JsonResponse({'error': 'Unauthorized'}, status=401)
 
+@login_required
+def instrumentation_stats(request):
+    """Sampled per-view timing histograms, merged across workers like /metrics"""
+    return JsonResponse({
+        'success': True,
+        'sample_rate': getattr(settings, 'INSTRUMENTATION_SAMPLE_RATE', 0.05),
+        'views': instrumentation.snapshot(),
+    })
+
+def metrics_view(request):
+    """Prometheus text format metrics, merged across workers in multiprocess mode"""
+    # Scrapers send METRICS_TOKEN as a bearer token, people need an admin session
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    scraper = token and constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}')
+    if not (scraper or (request.user.is_authenticated and request.user.role == 'admin')):
+        return HttpResponse('Forbidden', status=403, content_type='text/plain')
+    
+    return HttpResponse(
+        metrics.registry.render(),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
+
+def health(request):
+    """Liveness and database check for load balancers, never touches the session"""
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+    except Exception:
+        logger.exception('Health check failed')
+        return JsonResponse({'status': 'error', 'database': 'unavailable'}, status=503)
+    return JsonResponse({'status': 'ok'})
+
+def _ingest_analytics(request, default_kind):
+    """Queue one beacon or a batch of them; storage happens off the request path"""
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+    
+    try:
+        events = analytics.parse_beacon(request.body, default_kind)
+    except ValueError:
+        return JsonResponse({'status': 'error'}, status=400)
+    
+    analytics.buffer.add(events)
+    return JsonResponse({'status': 'success', 'accepted': len(events)})
+
 @csrf_exempt
 def analytics_pageview(request):
     """Handle page view analytics"""
-    if request.method == 'POST':
-        try:
-            data = json.loads(request.body)
-            print(f"Page view: {data.get('page')} at {data.get('timestamp')}")
-            return JsonResponse({'status': 'success'})
-        except:
-            return JsonResponse({'status': 'error'}, status=400)
-    return JsonResponse({'error': 'Method not allowed'}, status=405)
+    return _ingest_analytics(request, 'pageview')
 
 @csrf_exempt
 def analytics_event(request):
     """Handle event tracking"""
-    if request.method == 'POST':
-        try:
-            data = json.loads(request.body)
-            print(f"Event: {data.get('event')} - {data.get('properties')}")
-            return JsonResponse({'status': 'success'})
-        except:
-            return JsonResponse({'status': 'error'}, status=400)
-    return JsonResponse({'error': 'Method not allowed'}, status=405)
+    return _ingest_analytics(request, 'event')
+
+@csrf_exempt
+def analytics_batch(request):
+    """Mixed page views and events queued by script.js, usually sent via sendBeacon"""
+    return _ingest_analytics(request, None)
 
 @login_required
 def event_attendance(request, event_id):
@@ -1693,12 +1848,12 @@ def event_attendance(request, event_id):
         messages.error(request, 'You do not have permission to view this page.')
         return redirect('dashboard')
     
-    attendance_records = AttendanceRecord.objects.filter(event=event).select_related('student')
+    attendance_records = archive.attendance(event=event)
     
     # Get attendance summary
-    total_registered = EventRegistration.objects.filter(event=event).count()
-    total_attended = attendance_records.count()
-    attendance_rate = round((total_attended / total_registered) * 100, 1) if total_registered > 0 else 0
+    total_registered = event.current_participants
+    total_attended = event.attended_count
+    attendance_rate = event.attendance_rate
     
     context = {
         'event': event,
@@ -1712,9 +1867,13 @@ def event_attendance(request, event_id):
 @login_required
 def mark_notification_read(request, notification_id):
     """Mark notification as read"""
-    notification = get_object_or_404(Notification, notification_id=notification_id, user=request.user)
-    notification.is_read = True
-    notification.save()
+    notification = Notification.objects.filter(notification_id=notification_id, user=request.user).first()
+    if notification:
+        notification.is_read = True
+        notification.save()
+    else:
+        broadcast = get_object_or_404(notifications.broadcasts_for(request.user), broadcast_id=notification_id)
+        BroadcastRead.objects.get_or_create(user=request.user, broadcast=broadcast)
     
     if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
         return JsonResponse({'success': True})
@@ -1723,7 +1882,6 @@ def mark_notification_read(request, notification_id):
 
 # ========== OTHER FUNCTIONS ==========
 @login_required
-@user_passes_test(lambda u: u.role == 'admin' or u.is_staff)
 def update_event(request, event_id):
     """Update an existing event"""
     event = get_object_or_404(Event, event_id=event_id)
@@ -1735,7 +1893,19 @@ def update_event(request, event_id):
     if request.method == 'POST':
         form = EventForm(request.POST, instance=event)
         if form.is_valid():
-            form.save()
+            counters.save_keeping_counters(form.save(commit=False))
+            changed = [name for name in BROADCAST_FIELDS if name in form.changed_data]
+            if changed:
+                # One row for every registrant, resolved when they read their feed
+                Broadcast.objects.create(
+                    notification_type='event',
+                    title='Event Updated',
+                    message=f'"{event.title}" changed: {", ".join(form[name].label.lower() for name in changed)}. '
+                            f'It is now on {event.date:%B %d} at {event.start_time:%I:%M %p}, {event.venue}.',
+                    related_event=event,
+                    target_event=event,
+                    created_by=request.user,
+                )
             messages.success(request, f'Event "{event.title}" updated successfully!')
             return redirect('event_detail', event_id=event.event_id)
         else:
@@ -1752,7 +1922,6 @@ def update_event(request, event_id):
     return render(request, 'crud/event_form.html', context)
 
 @login_required
-@user_passes_test(lambda u: u.role == 'admin' or u.is_staff)
 def delete_event(request, event_id):
     """Delete an event"""
     event = get_object_or_404(Event, event_id=event_id)
@@ -1770,7 +1939,6 @@ def delete_event(request, event_id):
     return render(request, 'crud/event_confirm_delete.html', {'event': event})
 
 @login_required
-@user_passes_test(lambda u: u.role == 'admin' or u.is_staff)
 def update_user(request, user_id):
     """Update user information (Admin only)"""
     user = get_object_or_404(User, id=user_id)
@@ -1778,7 +1946,7 @@ def update_user(request, user_id):
     if request.method == 'POST':
         form = UserUpdateForm(request.POST, instance=user)
         if form.is_valid():
-            form.save()
+            counters.save_keeping_counters(form.save(commit=False))
             messages.success(request, f'User "{user.username}" updated successfully!')
             return redirect('user_detail', user_id=user.id)
         else:
@@ -1795,7 +1963,6 @@ def update_user(request, user_id):
     return render(request, 'crud/user_form.html', context)
 
 @login_required
-@user_passes_test(lambda u: u.role == 'admin' or u.is_staff)
 def delete_user(request, user_id):
     """Delete a user (Admin only)"""
     user = get_object_or_404(User, id=user_id)
@@ -1813,7 +1980,7 @@ def delete_user(request, user_id):
     return render(request, 'crud/user_confirm_delete.html', {'user': user})
 
 @login_required
-@user_passes_test(lambda u: u.role == 'admin' or u.is_staff)
+@replica_reads
 def registration_list(request):
     """List all event registrations (Admin only)"""
     registrations = EventRegistration.objects.all().select_related('event', 'student').order_by('-registration_date')
@@ -1833,17 +2000,12 @@ def registration_list(request):
     return render(request, 'crud/registration_list.html', context)
 
 @login_required
-@user_passes_test(lambda u: u.role == 'admin' or u.is_staff)
 def delete_registration(request, registration_id):
     """Delete event registration (Admin only)"""
     registration = get_object_or_404(EventRegistration, registration_id=registration_id)
     
     if request.method == 'POST':
-        event = registration.event
-        if event.current_participants > 0:
-            event.current_participants -= 1
-            event.save()
-        
+        # current_participants follows through core.signals
         registration.delete()
         messages.success(request, 'Registration deleted successfully!')
         return redirect('registration_list')
@@ -1851,13 +2013,12 @@ def delete_registration(request, registration_id):
     return render(request, 'crud/registration_confirm_delete.html', {'registration': registration})
 
 @login_required
-@user_passes_test(lambda u: u.role == 'admin' or u.is_staff)
 def toggle_user_active(request, user_id):
     """Toggle user active status"""
     if request.method == 'POST' and request.headers.get('X-Requested-With') == 'XMLHttpRequest':
         user = get_object_or_404(User, id=user_id)
         user.is_active = not user.is_active
-        user.save()
+        user.save(update_fields=['is_active'])
         
         return JsonResponse({
             'success': True,
@@ -1868,7 +2029,6 @@ def toggle_user_active(request, user_id):
     return JsonResponse({'success': False, 'error': 'Invalid request'})
 
 @login_required
-@user_passes_test(lambda u: u.role == 'admin' or u.is_staff)
 def toggle_event_status(request, event_id):
     """Toggle event status"""
     if request.method == 'POST' and request.headers.get('X-Requested-With') == 'XMLHttpRequest':
@@ -1878,7 +2038,7 @@ def toggle_event_status(request, event_id):
         current_index = status_order.index(event.status) if event.status in status_order else 0
         next_index = (current_index + 1) % len(status_order)
         event.status = status_order[next_index]
-        event.save()
+        event.save(update_fields=['status', 'updated_at'])
         
         return JsonResponse({
             'success': True,
@@ -1906,23 +2066,8 @@ def admin_generate_qr(request, event_id):
         }
         
         # Generate QR code
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=4,
-        )
-        qr.add_data(json.dumps(qr_data))
-        qr.make(fit=True)
-        
-        img = qr.make_image(fill_color="black", back_color="white")
-        
-        # Convert to base64
-        buffer = BytesIO()
-        img.save(buffer, format="PNG")
-        buffer.seek(0)
-        
-        img_str = base64.b64encode(buffer.getvalue()).decode()
+        with metrics.qr_generation.time(view='admin_generate_qr'):
+            img_str = qr_png_base64(json.dumps(qr_data))
         data_uri = f'data:image/png;base64,{img_str}'
         
         return JsonResponse({
@@ -1942,7 +2087,7 @@ def admin_generate_qr(request, event_id):
             'message': 'Event not found'
         }, status=404)
     except Exception as e:
-        print(f"Error generating QR: {e}")  # For debugging
+        logger.exception("Error generating QR for event %s", event_id)
         return JsonResponse({
             'success': False,
             'message': str(e)
@@ -1959,7 +2104,6 @@ from io import BytesIO
 
 # Add these view functions:
 @login_required
-@user_passes_test(is_admin)
 def admin_generate_qr_page(request):
     """Display the QR code generation page"""
     # Get upcoming events - FIXED: Using correct field name
@@ -1985,37 +2129,8 @@ def generate_qr_code(request, event_id=None):
         
         event = Event.objects.get(id=event_id)
         
-        # Create QR code data - FIXED: Using correct field names
-        qr_data = {
-            'event_id': event.id,
-            'event_code': event.event_id,  # Changed from event_code to event_id if that's your field
-            'title': event.title,
-            'date': str(event.date),
-            'start_time': str(event.start_time) if event.start_time else '',
-            'end_time': str(event.end_time) if event.end_time else '',
-            'type': 'attendance',
-            'url': f'http://127.0.0.1:8000/attendance/scan/{event.event_id}/'  # Adjust if needed
-        }
-        
-        # Generate QR code
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=4,
-        )
-        qr.add_data(json.dumps(qr_data))
-        qr.make(fit=True)
-        
-        img = qr.make_image(fill_color="black", back_color="white")
-        
-        # Convert to base64
-        buffer = BytesIO()
-        img.save(buffer, format="PNG")
-        buffer.seek(0)
-        
-        img_str = base64.b64encode(buffer.getvalue()).decode()
-        data_uri = f'data:image/png;base64,{img_str}'
+        # Generate QR code, usually already cached when the event went live
+        data_uri = event_qr_data_uri(event)
         
         # FIXED: Using correct field names for event info
         event_info = {
@@ -2045,7 +2160,7 @@ def generate_qr_code(request, event_id=None):
             'message': 'Event not found'
         }, status=404)
     except Exception as e:
-        print(f"Error generating QR: {e}")
+        logger.exception("Error generating QR for event %s", event_id)
         return JsonResponse({
             'success': False,
             'message': str(e)
@@ -5,6 +5,17 @@ let qrScanner = null;
 let currentCameraId = null;
 let isFlashOn = false;
 let isScannerActive = false;
+let isSyncing = false;
+let syncTimer = null;
+let syncDelay = 0;
+
+// Scans that cannot reach the server wait in IndexedDB until the connection is back
+const OFFLINE_DB = 'qr-scanner';
+const OFFLINE_STORE = 'pending-scans';
+const OFFLINE_BATCH = 200;
+// Venue Wi-Fi often drops without an 'offline' event, so queued scans are retried on a backoff
+const SYNC_RETRY_MIN = 15000;
+const SYNC_RETRY_MAX = 5 * 60 * 1000;
 
 // ========== INITIALIZATION ==========
 document.addEventListener('DOMContentLoaded', function() {
@@ -12,6 +23,10 @@ document.addEventListener('DOMContentLoaded', function() {
     
     // Initialize when page loads
     initializePage();
+    
+    // Replay scans queued offline, now and whenever the connection returns
+    window.addEventListener('online', syncQueuedScans);
+    syncQueuedScans();
 });
 
 function initializePage() {
@@ -240,6 +255,11 @@ function processScannedQR(qrData) {
     const scannerContainer = document.getElementById('scanner-container');
     if (!scannerContainer) return;
     
+    if (!navigator.onLine) {
+        saveOfflineScan(qrData, scannerContainer);
+        return;
+    }
+    
     scannerContainer.innerHTML = `
         <div class="d-flex flex-column align-items-center justify-content-center h-100">
             <div class="spinner-border text-primary mb-3"></div>
@@ -251,11 +271,16 @@ function processScannedQR(qrData) {
         method: 'POST',
         headers: {
             'Content-Type': 'application/json',
-            'X-CSRFToken': getCookie('csrftoken')
+            'X-CSRFToken': getCookie('csrftoken'),
+            'X-Requested-With': 'XMLHttpRequest'
         },
         body: JSON.stringify({ qr_data: qrData })
     })
-    .then(response => response.json())
+    .then(response => {
+        // The server is reachable again, send anything still queued
+        if (response.ok) syncQueuedScans();
+        return response.json();
+    })
     .then(data => {
         if (data.success) {
             scannerContainer.innerHTML = `
@@ -286,7 +311,55 @@ function processScannedQR(qrData) {
         }
     })
     .catch(error => {
+        // The request never got an answer, keep the scan with its time and send it later
         console.error('Network error:', error);
+        saveOfflineScan(qrData, scannerContainer);
+    });
+}
+
+// ========== OFFLINE QUEUE ==========
+
+function openScanQueue() {
+    return new Promise((resolve, reject) => {
+        const request = indexedDB.open(OFFLINE_DB, 1);
+        request.onupgradeneeded = () => request.result.createObjectStore(OFFLINE_STORE, { keyPath: 'id' });
+        request.onsuccess = () => resolve(request.result);
+        request.onerror = () => reject(request.error);
+    });
+}
+
+async function withScanQueue(mode, action) {
+    const db = await openScanQueue();
+    return new Promise((resolve, reject) => {
+        const transaction = db.transaction(OFFLINE_STORE, mode);
+        const result = action(transaction.objectStore(OFFLINE_STORE));
+        transaction.oncomplete = () => { db.close(); resolve(result.result); };
+        transaction.onerror = () => { db.close(); reject(transaction.error); };
+    });
+}
+
+function queueScan(qrData) {
+    const scan = {
+        id: window.crypto?.randomUUID ? crypto.randomUUID() : `${Date.now()}-${Math.random().toString(36).slice(2)}`,
+        qr_data: qrData,
+        scanned_at: new Date().toISOString()
+    };
+    return withScanQueue('readwrite', store => store.put(scan));
+}
+
+async function saveOfflineScan(qrData, scannerContainer) {
+    try {
+        await queueScan(qrData);
+        scheduleSync();
+        scannerContainer.innerHTML = `
+            <div class="d-flex flex-column align-items-center justify-content-center h-100">
+                <i class="fas fa-cloud-upload-alt fa-4x text-warning mb-3"></i>
+                <h4>Saved Offline</h4>
+                <p>Your scan is stored on this device and will be sent when you are back online.</p>
+            </div>
+        `;
+    } catch (error) {
+        console.error('Could not queue scan:', error);
         scannerContainer.innerHTML = `
             <div class="d-flex flex-column align-items-center justify-content-center h-100">
                 <i class="fas fa-wifi-slash fa-4x text-danger mb-3"></i>
@@ -296,7 +369,62 @@ function processScannedQR(qrData) {
                 </button>
             </div>
         `;
-    });
+    }
+}
+
+function scheduleSync(failed = false) {
+    syncDelay = failed ? Math.min(Math.max(syncDelay * 2, SYNC_RETRY_MIN), SYNC_RETRY_MAX) : SYNC_RETRY_MIN;
+    clearTimeout(syncTimer);
+    syncTimer = setTimeout(syncQueuedScans, syncDelay);
+}
+
+async function syncQueuedScans() {
+    if (isSyncing || !window.indexedDB) return;
+    if (!navigator.onLine) {
+        scheduleSync(true);
+        return;
+    }
+    isSyncing = true;
+    clearTimeout(syncTimer);
+    try {
+        const queued = await withScanQueue('readonly', store => store.getAll());
+        const scans = queued.slice(0, OFFLINE_BATCH);
+        if (!scans.length) return;
+        
+        const response = await fetch('/attendance/mark/qr/sync/', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'X-CSRFToken': getCookie('csrftoken'),
+                'X-Requested-With': 'XMLHttpRequest'
+            },
+            body: JSON.stringify({ scans: scans })
+        });
+        // Busy or failing server: leave the queue for the next attempt
+        if (!response.ok) {
+            scheduleSync(true);
+            return;
+        }
+        
+        const data = await response.json();
+        await withScanQueue('readwrite', store => {
+            data.results.forEach(result => store.delete(result.id));
+            return store;
+        });
+        if (data.results.some(result => result.status === 'marked')) {
+            showToast(data.message, 'success');
+        }
+        // More than one batch was waiting
+        if (queued.length > scans.length) {
+            syncDelay = 0;
+            syncTimer = setTimeout(syncQueuedScans, 0);
+        }
+    } catch (error) {
+        console.warn('Offline scan sync failed, will retry:', error);
+        scheduleSync(true);
+    } finally {
+        isSyncing = false;
+    }
 }
 
 function restartScanner() {
@@ -335,4 +463,5 @@ window.startScanner = startScanner;
 window.stopScanner = stopScanner;
 window.toggleFlash = toggleFlash;
 window.restartScanner = restartScanner;
+window.syncQueuedScans = syncQueuedScans;
 window.showToast = showToast;
\ No newline at end of file
@@ -820,6 +820,27 @@ function initializeAnalytics() {
 }
 
 // ===== UTILITY FUNCTIONS =====
+// Last ETag and body per polled URL, so unchanged polls come back as 304
+const pollCache = new Map();
+
+function pollJSON(url, options = {}) {
+    const cached = pollCache.get(url);
+    const headers = { 'X-Requested-With': 'XMLHttpRequest', ...(options.headers || {}) };
+    if (cached) headers['If-None-Match'] = cached.etag;
+    
+    return fetch(url, { ...options, headers })
+        .then(response => {
+            if (response.status === 304 && cached) {
+                return { data: cached.data, changed: false };
+            }
+            return response.json().then(data => {
+                const etag = response.headers.get('ETag');
+                if (etag) pollCache.set(url, { etag, data });
+                return { data, changed: true };
+            });
+        });
+}
+
 function getCookie(name) {
     let cookieValue = null;
     if (document.cookie && document.cookie !== '') {
@@ -1157,14 +1178,9 @@ function updateResponsiveClasses() {
 }
 
 function checkNotifications(url) {
-    fetch(url, {
-        headers: {
-            'X-Requested-With': 'XMLHttpRequest'
-        }
-    })
-    .then(response => response.json())
-    .then(data => {
-        if (data.unread_count > 0) {
+    pollJSON(url)
+    .then(({ data, changed }) => {
+        if (changed && data.unread_count > 0) {
             updateNotificationBadge(data.unread_count);
             
             // Show desktop notification
@@ -1427,46 +1443,102 @@ function playNotificationSound() {
     }
 }
 
+// Analytics are queued and sent together in one beacon instead of one request each.
+// Small queues are carried across page loads in localStorage, so quick navigation
+// costs one request per flush interval rather than one per page.
+const ANALYTICS_ENDPOINT = '/api/analytics/batch/';
+const ANALYTICS_FLUSH_INTERVAL = 30000;
+const ANALYTICS_MAX_BATCH = 50;
+const ANALYTICS_QUEUE_KEY = 'scesAnalyticsQueue';
+const ANALYTICS_SENT_KEY = 'scesAnalyticsSentAt';
+const analyticsQueue = restoreAnalyticsQueue();
+let analyticsTimer = null;
+
+function restoreAnalyticsQueue() {
+    try {
+        const saved = JSON.parse(localStorage.getItem(ANALYTICS_QUEUE_KEY) || '[]');
+        localStorage.removeItem(ANALYTICS_QUEUE_KEY);
+        return Array.isArray(saved) ? saved : [];
+    } catch (e) {
+        return [];
+    }
+}
+
+function queueAnalytics(item) {
+    analyticsQueue.push(item);
+    
+    if (analyticsQueue.length >= ANALYTICS_MAX_BATCH) {
+        flushAnalytics();
+    } else if (!analyticsTimer) {
+        const lastSent = Number(localStorage.getItem(ANALYTICS_SENT_KEY) || 0);
+        const wait = Math.max(ANALYTICS_FLUSH_INTERVAL - (Date.now() - lastSent), 0);
+        analyticsTimer = setTimeout(flushAnalytics, wait);
+    }
+}
+
+function flushAnalytics() {
+    clearTimeout(analyticsTimer);
+    analyticsTimer = null;
+    if (analyticsQueue.length === 0) return;
+    
+    const body = JSON.stringify({ events: analyticsQueue.splice(0, analyticsQueue.length) });
+    localStorage.setItem(ANALYTICS_SENT_KEY, String(Date.now()));
+    
+    // sendBeacon survives page unload and never blocks navigation
+    if (navigator.sendBeacon && navigator.sendBeacon(ANALYTICS_ENDPOINT, new Blob([body], { type: 'application/json' }))) {
+        return;
+    }
+    
+    fetch(ANALYTICS_ENDPOINT, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: body,
+        keepalive: true
+    }).catch(() => {
+        // Silently fail if analytics endpoint is not available
+    });
+}
+
+function stashOrFlushAnalytics() {
+    if (analyticsQueue.length === 0) return;
+    
+    const lastSent = Number(localStorage.getItem(ANALYTICS_SENT_KEY) || 0);
+    if (Date.now() - lastSent < ANALYTICS_FLUSH_INTERVAL && analyticsQueue.length < ANALYTICS_MAX_BATCH) {
+        try {
+            // The next page load picks these up and sends them with its own events
+            localStorage.setItem(ANALYTICS_QUEUE_KEY, JSON.stringify(analyticsQueue));
+            analyticsQueue.length = 0;
+            return;
+        } catch (e) {
+            // Storage full or disabled, fall through to sending now
+        }
+    }
+    flushAnalytics();
+}
+
+document.addEventListener('visibilitychange', () => {
+    if (document.visibilityState === 'hidden') stashOrFlushAnalytics();
+});
+window.addEventListener('pagehide', stashOrFlushAnalytics);
+
 function trackPageView() {
-    const data = {
+    queueAnalytics({
+        type: 'pageview',
         page: window.location.pathname,
         referrer: document.referrer,
         timestamp: new Date().toISOString(),
         userAgent: navigator.userAgent,
         screen: `${window.screen.width}x${window.screen.height}`
-    };
-    
-    // Send to analytics endpoint
-    fetch('/api/analytics/pageview/', {
-        method: 'POST',
-        headers: {
-            'Content-Type': 'application/json',
-            'X-CSRFToken': getCookie('csrftoken')
-        },
-        body: JSON.stringify(data)
-    }).catch(() => {
-        // Silently fail if analytics endpoint is not available
     });
 }
 
 function trackEvent(eventName, properties = {}) {
-    const data = {
+    queueAnalytics({
+        type: 'event',
         event: eventName,
         properties: properties,
         timestamp: new Date().toISOString(),
         url: window.location.href
-    };
-    
-    // Send to analytics endpoint
-    fetch('/api/analytics/event/', {
-        method: 'POST',
-        headers: {
-            'Content-Type': 'application/json',
-            'X-CSRFToken': getCookie('csrftoken')
-        },
-        body: JSON.stringify(data)
-    }).catch(() => {
-        // Silently fail if analytics endpoint is not available
     });
 }
 
@@ -1475,9 +1547,10 @@ function updateAttendanceStats() {
     const attendanceStats = document.querySelector('[data-attendance-stats]');
     if (attendanceStats) {
         const url = attendanceStats.dataset.attendanceStats;
-        fetch(url)
-            .then(response => response.json())
-            .then(data => {
+        pollJSON(url)
+            .then(({ data, changed }) => {
+                if (!changed) return;
+                
                 // Update DOM with new stats
                 if (data.attended_events !== undefined) {
                     const element = document.querySelector('[data-stat="attended-events"]');
@@ -1503,6 +1576,7 @@ window.SCES = {
     showToast,
     startQRScanner,
     getCookie,
+    pollJSON,
     
     // Utility functions
     debounce,
@@ -1519,6 +1593,7 @@ window.SCES = {
     
     // Analytics functions
     trackEvent,
+    flushAnalytics,
     
     // Version
     version: '2.0.0'